@@ -0,0 +1,99 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+# -------------------------
+# Asset Loading
+# -------------------------
+class AssetLoader:
+    # Decodes and scales images (and loads sounds) on a small thread pool, so
+    # startup overlaps disk I/O and PNG/JPEG decoding with opening the camera and
+    # building the hand model. Each (path, size) is only loaded once: asking for
+    # the same picture twice, like the menu icons that reuse the fruit sprites,
+    # returns the same Surface.
+    #
+    # image() only queues the work; get() waits for it and converts the result to
+    # the display's pixel format (convert_alpha() for pictures with transparency,
+    # convert() otherwise) the first time, so blits never convert per frame.
+    # Conversion needs the display mode, so call get() after set_mode().
+    #
+    # With `cache_dir` set, scaled pixels are also written there as raw bytes and
+    # later runs skip decoding and scaling. Entries are keyed by the source's path,
+    # size and modification time, so editing an image invalidates its entry.
+    def __init__(self, workers=4, cache_dir=None):
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="assets")
+        self._loading = {}  # (path, size) -> Future of the unconverted Surface
+        self._ready = {}  # (path, size) -> converted Surface
+        self.cache_hits = 0
+
+    def submit(self, fn, *args):
+        # Run any other slow startup call (camera, model) on the pool.
+        return self._pool.submit(fn, *args)
+
+    def __len__(self):
+        # Distinct images loaded or queued.
+        return len(self._loading)
+
+    def image(self, path, size):
+        key = (path, tuple(size))
+        future = self._loading.get(key)
+        if future is None:
+            future = self._loading[key] = self._pool.submit(self._load, path, key[1])
+        return future
+
+    def preload(self, images):
+        for path, size in images:
+            self.image(path, size)
+
+    def sound(self, path):
+        return self._pool.submit(_load_sound, path)
+
+    def get(self, path, size):
+        key = (path, tuple(size))
+        surface = self._ready.get(key)
+        if surface is None:
+            surface = self.image(path, size).result()
+            surface = surface.convert_alpha() if surface.get_flags() & pygame.SRCALPHA else surface.convert()
+            self._ready[key] = surface
+        return surface
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+    def _cache_path(self, path, size):
+        stamp = f"{os.path.abspath(path)}|{size}|{os.path.getmtime(path)}"
+        return os.path.join(self.cache_dir, hashlib.sha1(stamp.encode()).hexdigest() + ".raw")
+
+    def _load(self, path, size):
+        try:
+            cached = self._cache_path(path, size) if self.cache_dir else None
+            if cached and os.path.exists(cached):
+                with open(cached, "rb") as f:
+                    data = f.read()
+                self.cache_hits += 1
+                fmt = "RGBA" if len(data) == size[0] * size[1] * 4 else "RGB"
+                return pygame.image.frombuffer(data, size, fmt)
+            surface = pygame.transform.scale(pygame.image.load(path), size)
+            if cached:
+                fmt = "RGBA" if surface.get_flags() & pygame.SRCALPHA else "RGB"
+                tmp = f"{cached}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(pygame.image.tobytes(surface, fmt))
+                os.replace(tmp, cached)
+            return surface
+        except Exception as e:
+            print(f"Error loading image {path}: {e}")
+            return pygame.Surface(size)  # Return a blank surface if error occurs
+
+
+def _load_sound(path):
+    try:
+        return pygame.mixer.Sound(path)
+    except Exception as e:
+        print(f"Error loading sound {path}: {e}")
+        return None
@@ -0,0 +1,112 @@
+import time
+
+import pygame
+
+# Mixer settings applied before pygame.init(). pygame's default buffer of 512
+# samples adds ~12 ms before a sound is heard; 256 halves it, small enough to
+# feel attached to the slash and large enough not to crackle on a busy frame.
+MIXER_FREQUENCY = 44100
+MIXER_BUFFER = 256
+
+# Channels reserved per sound category. A category only ever plays on its own
+# channels, so a burst of slashes can never cut off a bomb or the end jingle.
+CATEGORIES = {"slash": 4, "bomb": 2, "ui": 2}
+
+
+def configure_mixer(frequency=MIXER_FREQUENCY, buffer=MIXER_BUFFER):
+    # Must run before pygame.init() / pygame.mixer.init() to take effect.
+    pygame.mixer.pre_init(frequency=frequency, size=-16, channels=2, buffer=buffer)
+
+
+# -------------------------
+# Audio Engine
+# -------------------------
+class _Category:
+    def __init__(self, channels):
+        self.channels = channels  # pygame.mixer.Channel objects
+        self.started = [0.0] * len(channels)
+        self.ends = [0.0] * len(channels)
+        self.played = 0
+        self.stolen = 0
+
+
+class AudioEngine:
+    # Sounds are registered under a name and a category, and play() only
+    # queues a trigger; flush(), once per frame, starts every distinct sound
+    # queued since the last flush exactly once, however many fruits a swipe
+    # cut. Each category owns a block of reserved mixer channels (see
+    # pygame.mixer.set_reserved(), so Sound.play() elsewhere can't take them).
+    # A trigger goes to a channel of its category that has finished playing,
+    # or, when all of them are still busy, steals the one that started first.
+    #
+    # Whether a channel is busy is worked out from each sound's length rather
+    # than asked of the mixer, so the engine behaves the same on SDL's dummy
+    # audio driver as on a sound card.
+    def __init__(self, categories=CATEGORIES, clock=time.perf_counter):
+        self.clock = clock
+        self.enabled = pygame.mixer.get_init() is not None
+        self._sounds = {}  # name -> (Sound, category name, length in seconds)
+        self._pending = []
+        self._queued = set()
+        self.triggers = 0
+        self.deduped = 0
+        self.categories = {}
+        total = sum(categories.values())
+        if self.enabled:
+            pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), total))
+            pygame.mixer.set_reserved(total)
+        first = 0
+        for name, count in categories.items():
+            channels = [pygame.mixer.Channel(i) for i in range(first, first + count)] if self.enabled else []
+            self.categories[name] = _Category(channels)
+            first += count
+
+    def add(self, name, sound, category, volume=1.0):
+        # `sound` may be None (failed to load); its triggers are then ignored.
+        if sound is None:
+            return
+        sound.set_volume(volume)
+        self._sounds[name] = (sound, category, sound.get_length())
+
+    def play(self, name):
+        self.triggers += 1
+        if name in self._queued:
+            self.deduped += 1
+            return
+        self._queued.add(name)
+        self._pending.append(name)
+
+    def flush(self):
+        if not self._pending:
+            return
+        now = self.clock()
+        for name in self._pending:
+            entry = self._sounds.get(name)
+            if entry is None or not self.enabled:
+                continue
+            sound, category, length = entry
+            cat = self.categories[category]
+            free = [i for i, end in enumerate(cat.ends) if end <= now]
+            if free:
+                i = free[0]
+            else:
+                i = min(range(len(cat.started)), key=cat.started.__getitem__)
+                cat.channels[i].stop()
+                cat.stolen += 1
+            cat.channels[i].play(sound)
+            cat.started[i] = now
+            cat.ends[i] = now + length
+            cat.played += 1
+        self._pending.clear()
+        self._queued.clear()
+
+    def stop(self):
+        for cat in self.categories.values():
+            for channel in cat.channels:
+                channel.stop()
+            cat.ends = [0.0] * len(cat.ends)
+
+    def stats(self):
+        return {"triggers": self.triggers, "deduped": self.deduped,
+                "categories": {name: {"channels": len(cat.channels), "played": cat.played, "stolen": cat.stolen}
+                               for name, cat in self.categories.items()}}
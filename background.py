@@ -0,0 +1,45 @@
+import pygame
+
+# -------------------------
+# Camera Background Upload
+# -------------------------
+class BackgroundUploader:
+    # Puts RGB camera frames on screen without the per-frame allocations of the
+    # old cvtColor -> rot90 -> flipud -> make_surface -> scale chain.
+    #
+    # The camera frame is wrapped with pygame.image.frombuffer (row-major RGB is
+    # exactly what it expects, so no transpose and no copy), converted once into
+    # a preallocated display-format surface at capture resolution, and then
+    # scaled a single time straight into the target surface (normally `win`).
+    def __init__(self, size):
+        self.size = size
+        self._native = None
+        # Reused when no target is given to upload().
+        self.surface = pygame.Surface(size).convert()
+
+    def _native_surface(self, frame_size):
+        if self._native is None or self._native.get_size() != frame_size:
+            self._native = pygame.Surface(frame_size).convert()
+        return self._native
+
+    def upload(self, rgb_frame, target=None):
+        # `rgb_frame` must be a C-contiguous (h, w, 3) uint8 array. `target` should
+        # be a display-format surface such as the window; the frame is drawn at
+        # (0, 0) with size self.size.
+        if target is None:
+            target = self.surface
+        h, w = rgb_frame.shape[:2]
+        src = pygame.image.frombuffer(rgb_frame, (w, h), "RGB")
+        if (w, h) == self.size:
+            target.blit(src, (0, 0))
+            return target
+        native = self._native_surface((w, h))
+        native.blit(src, (0, 0))
+        if target.get_size() == self.size and target.get_bitsize() == native.get_bitsize():
+            pygame.transform.scale(native, self.size, target)
+        else:
+            # The window came up at another size (e.g. a different fullscreen
+            # mode), so go through our own surface and blit it like before.
+            pygame.transform.scale(native, self.size, self.surface)
+            target.blit(self.surface, (0, 0))
+        return target
@@ -0,0 +1,1179 @@
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+# Benchmarks run without a camera or a real window.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import cv2
+import numpy as np
+import pygame
+
+win_width, win_height = 1280, 720
+
+
+# -------------------------
+# Helpers
+# -------------------------
+def init_display(size=(win_width, win_height)):
+    pygame.init()
+    return pygame.display.set_mode(size)
+
+
+def surface_bytes(surface):
+    return surface.get_pitch() * surface.get_height()
+
+
+def fake_camera_frame(i, size=(640, 480)):
+    w, h = size
+    frame = np.empty((h, w, 3), np.uint8)
+    frame[:] = (i * 7) % 255
+    frame[:, : w // 2, 0] = 200
+    return frame
+
+
+def frenzy_events(frames, objects):
+    # Per-step (kind, x, y, sprite) event lists of a multi-player game with
+    # 4 hands sweeping the screen and objects // 10 times the normal spawns.
+    from gameplay import Game
+
+    sprites = [pygame.Surface((80, 80))] * 10
+    game = Game(sprites, (win_width, win_height), max(1, objects // 10))
+    game.reset("multi-player", seed=1)
+    steps = []
+    for step in range(frames):
+        t = step / 30
+        game.lives_mp = 1 << 30  # never end the session
+        game.add_hands([(640 + 560 * np.sin(4.2 * t + k), 360 + 300 * np.sin(6.6 * t + 2 * k)) for k in range(4)])
+        game.step(1 / 30)
+        events = game.events
+        n = events.count
+        steps.append(list(zip(events.kind[:n].tolist(), events.x[:n].tolist(), events.y[:n].tolist(),
+                              events.sprite[:n].tolist())))
+        events.clear()
+    return steps
+
+
+def new_buffer_bytes(fn, frames):
+    # Bytes of new pixel buffers fn() makes per frame, counted the same way
+    # for every path: arrays and surfaces returned by the numpy, OpenCV and
+    # pygame calls below count unless they are views, the destination that
+    # was passed in, or a surface wrapping an argument's memory. Runs apart
+    # from timed() so the bookkeeping doesn't show up in the timings.
+    calls = [(np, "rot90"), (np, "flipud"), (cv2, "cvtColor"), (pygame.surfarray, "make_surface"),
+             (pygame.image, "frombuffer"), (pygame.transform, "scale")]
+    originals = [(module, name, getattr(module, name)) for module, name in calls]
+    total = 0
+
+    def counting(original):
+        def call(*args):
+            nonlocal total
+            result = original(*args)
+            if isinstance(result, np.ndarray):
+                total += result.nbytes if result.base is None else 0
+            elif isinstance(result, pygame.Surface) and not any(result is arg for arg in args):
+                borrowed = any(isinstance(arg, np.ndarray) and result._pixels_address == arg.ctypes.data
+                               for arg in args)
+                total += 0 if borrowed else surface_bytes(result)
+            return result
+        return call
+
+    fn(0)  # warm-up: one-off buffers such as the uploader's native surface
+    for module, name, original in originals:
+        setattr(module, name, counting(original))
+    try:
+        for i in range(frames):
+            fn(i)
+    finally:
+        for module, name, original in originals:
+            setattr(module, name, original)
+    return total / frames
+
+
+def timed(fn, frames):
+    # Returns (ms per frame, peak numpy bytes as seen by tracemalloc).
+    fn(0)  # warm-up
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(frames):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000 / frames, peak
+
+
+# -------------------------
+# Camera Background Upload
+# -------------------------
+def bench_upload(args):
+    from background import BackgroundUploader
+
+    win = init_display()
+    frames = [fake_camera_frame(i) for i in range(8)]
+
+    def legacy(i):
+        # The original main-loop path: BGR frame -> RGB -> rot90 -> flipud ->
+        # make_surface -> scale -> blit.
+        frame = cv2.cvtColor(frames[i % len(frames)], cv2.COLOR_BGR2RGB)
+        frame = np.rot90(frame)
+        frame = np.flipud(frame)
+        surface = pygame.surfarray.make_surface(frame)
+        scaled = pygame.transform.scale(surface, (win_width, win_height))
+        win.blit(scaled, (0, 0))
+
+    uploader = BackgroundUploader((win_width, win_height))
+    rgb_frames = [cv2.cvtColor(f, cv2.COLOR_BGR2RGB) for f in frames]
+
+    def upload(i):
+        uploader.upload(rgb_frames[i % len(rgb_frames)], win)
+
+    for name, fn in (("legacy", legacy), ("uploader", upload)):
+        ms, peak = timed(fn, args.frames)
+        per_frame = new_buffer_bytes(fn, min(args.frames, 50))
+        print(f"{name:>9}: {ms:7.3f} ms/frame  {per_frame / 1024:9.1f} KiB allocated/frame  "
+              f"(numpy peak {peak / 1024:.1f} KiB)")
+
+
+# -------------------------
+# Sprite Rotation
+# -------------------------
+def bench_rotation(args):
+    from sprites import RotationCache
+
+    win = init_display()
+    sprites = [pygame.Surface((80, 80), pygame.SRCALPHA) for _ in range(13)]
+    for i, sprite in enumerate(sprites):
+        pygame.draw.circle(sprite, (20 * i, 200, 100, 255), (40, 40), 38)
+    positions = [((i * 53) % (win_width - 80), (i * 97) % (win_height - 80)) for i in range(args.objects)]
+
+    def per_frame_rotate(frame):
+        angle = frame % 360
+        for i, (x, y) in enumerate(positions):
+            win.blit(pygame.transform.rotate(sprites[i % len(sprites)], angle), (x, y))
+
+    cache = RotationCache()
+
+    def cached(frame):
+        angle = frame % 360
+        for i, (x, y) in enumerate(positions):
+            cache.blit(win, sprites[i % len(sprites)], angle, x, y)
+
+    for name, fn in (("rotate", per_frame_rotate), ("cache", cached)):
+        ms, _ = timed(fn, args.frames)
+        print(f"{name:>7}: {ms:7.3f} ms/frame for {args.objects} sprites")
+    print(f"cache: {len(cache)} entries, {cache.nbytes / 1024:.0f} KiB, "
+          f"{cache.hits} hits / {cache.misses} misses")
+
+
+# -------------------------
+# Menu Text
+# -------------------------
+def bench_menu(args):
+    from hud import StaticLayer
+
+    win = init_display()
+    myfont = pygame.font.SysFont("monospace", 24)
+    title_font = pygame.font.SysFont("monospace", 48, bold=True)
+    intro_font = pygame.font.SysFont("monospace", 28)
+    icon = pygame.Surface((80, 80), pygame.SRCALPHA)
+    pygame.draw.circle(icon, (200, 40, 40, 255), (40, 40), 38)
+    white = (255, 255, 255)
+    lines = [
+        (title_font, "AR FRUITNINJA", (0, 0, 0), 60),
+        (intro_font, "Welcome to AR Fruit Ninja!", white, 110),
+        (intro_font, "Use your hand to slice fruits in mid-air while avoiding bombs.", white, 150),
+        (intro_font, "Slice a fruit to select a mode!", white, 190),
+    ]
+    labels = [("Classic Mode", 420, 320), ("Dual Mode", 620, 320), ("Multi-Player Mode", 820, 320),
+              ("Quit Game", 620, 420)]
+
+    # Same structure as the mode-selection screen in game.py.
+    def compose(surface):
+        for font, text, color, y in lines:
+            rendered = font.render(text, True, color)
+            surface.blit(rendered, (win_width // 2 - rendered.get_width() // 2, y))
+        for text, x, y in labels:
+            surface.blit(icon, (x, y))
+            rendered = myfont.render(text, True, white)
+            surface.blit(rendered, (x + (80 - rendered.get_width()) // 2, y + 90))
+
+    background = pygame.Surface((win_width, win_height)).convert()
+    background.fill((40, 90, 40))
+    layer = StaticLayer((win_width, win_height), compose)
+
+    def per_frame_render(i):
+        win.blit(background, (0, 0))
+        compose(win)
+
+    def static_layer(i):
+        win.blit(background, (0, 0))
+        layer.draw(win)
+
+    def background_only(i):
+        win.blit(background, (0, 0))
+
+    base, _ = timed(background_only, args.frames)
+    for name, fn in (("render", per_frame_render), ("layer", static_layer)):
+        ms, _ = timed(fn, args.frames)
+        print(f"{name:>7}: {ms:7.3f} ms/frame, {ms - base:6.3f} ms of it for the menu overlay")
+        if name == "render":
+            reference = pygame.surfarray.array3d(win)
+    diff = np.abs(pygame.surfarray.array3d(win).astype(int) - reference).max()
+    print(f"max pixel difference between the two paths: {diff}")
+
+
+# -------------------------
+# Entity Update
+# -------------------------
+def bench_entities(args):
+    from random import randint, seed, uniform
+
+    from entities import CLAMP, EntityStore
+
+    seed(1)
+    sprite = pygame.Surface((80, 80))
+    store = EntityStore([sprite])
+
+    class Img:
+        # The pre-EntityStore fruit object, minus drawing.
+        def __init__(self, x, y, u):
+            self.x, self.y, self.u, self.vx, self.g = x, y, u, uniform(-2, 2), 0.4
+
+        def update(self):
+            self.x += self.vx
+            self.y -= self.u
+            self.u -= self.g
+            if self.x < 0:
+                self.x = 0
+                self.vx = -self.vx
+            elif self.x + sprite.get_width() > win_width:
+                self.x = win_width - sprite.get_width()
+                self.vx = -self.vx
+
+    objects = []
+    # Keep roughly args.objects entities alive: fruits live ~100 frames.
+    per_frame = max(1, args.objects // 100)
+
+    def legacy(i):
+        for _ in range(per_frame):
+            objects.append(Img(randint(50, win_width - 80), win_height, randint(15, 25)))
+        remove_list = []
+        for obj in objects:
+            obj.update()
+            if obj.y >= win_height:
+                remove_list.append(obj)
+        for item in remove_list:
+            if item in objects:
+                objects.remove(item)
+
+    def array_backed(i):
+        for _ in range(per_frame):
+            store.spawn(randint(50, win_width - 80), win_height, 0, u=randint(15, 25), flags=CLAMP,
+                        lo=0, hi=win_width)
+        store.update()
+        store.release(store.below(win_height))
+
+    for name, fn, live in (("Img list", legacy, lambda: len(objects)), ("store", array_backed, lambda: len(store))):
+        ms, _ = timed(fn, args.frames)
+        print(f"{name:>9}: {ms:7.3f} ms/frame (update + cull, {live()} live entities)")
+
+
+# -------------------------
+# Swept Blade Collision
+# -------------------------
+def bench_collision(args):
+    from collision import SweptCollider, segment_circle_hits
+    from entities import EntityStore
+
+    rng = np.random.default_rng(7)
+    sprite = pygame.Surface((80, 80))
+    collider = SweptCollider()
+    hands = 4
+    trials = max(1, args.frames)
+
+    def random_store():
+        store = EntityStore([sprite])
+        for x, y in zip(rng.uniform(0, win_width - 80, args.objects), rng.uniform(0, win_height - 80, args.objects)):
+            store.spawn(x, y, 0, vx=0)
+        return store
+
+    def random_swipes():
+        # Fast swipes: 40-600px per camera frame in a random direction.
+        start = rng.uniform((0, 0), (win_width, win_height), (hands, 2))
+        angle = rng.uniform(0, 2 * np.pi, hands)
+        length = rng.uniform(40, 600, hands)
+        end = start + np.stack([np.cos(angle), np.sin(angle)], axis=1) * length[:, None]
+        return [(tuple(a), tuple(b)) for a, b in zip(start.tolist(), end.tolist())]
+
+    def ground_truth(store, segments):
+        # Dense sampling along each swipe, one point every quarter pixel.
+        n = store.count
+        cx, cy = store.x[:n] + 40, store.y[:n] + 40
+        radius = 40 + collider.blade_radius
+        hit = np.zeros(n, bool)
+        for (x0, y0), (x1, y1) in segments:
+            steps = int(np.hypot(x1 - x0, y1 - y0) * 4) + 1
+            for t in np.linspace(0, 1, steps):
+                px, py = x0 + t * (x1 - x0), y0 + t * (y1 - y0)
+                hit |= (cx - px) ** 2 + (cy - py) ** 2 <= radius * radius
+        return hit
+
+    def legacy_hits(store, segments):
+        # The old test: fruit rect vs. a 40x40 box at the current fingertip only.
+        n = store.count
+        x, y = store.x[:n], store.y[:n]
+        hit = np.zeros(n, bool)
+        for _, (cx, cy) in segments:
+            hit |= (x < cx + 40) & (x + 80 > cx) & (y < cy + 40) & (y + 80 > cy)
+        return hit
+
+    def brute_force(store, segments):
+        n = store.count
+        hit = np.zeros(n, bool)
+        for (x0, y0), (x1, y1) in segments:
+            touching, _ = segment_circle_hits(x0, y0, x1, y1, store.x[:n] + 40, store.y[:n] + 40,
+                                              40 + collider.blade_radius)
+            hit |= touching
+        return hit
+
+    expected = legacy_found = swept_found = 0
+    mismatches = 0
+    cases = [(random_store(), random_swipes()) for _ in range(min(trials, 50))]
+    for store, segments in cases:
+        truth = ground_truth(store, segments)
+        hit_by, _ = collider.hits(store, segments)
+        swept = hit_by >= 0
+        expected += int(truth.sum())
+        legacy_found += int((legacy_hits(store, segments) & truth).sum())
+        swept_found += int((swept & truth).sum())
+        mismatches += int((swept != brute_force(store, segments)).sum())
+        mismatches += int((swept & ~truth).sum())  # tangent misses of the sampling are allowed
+    print(f"{len(cases)} synthetic frames, {hands} swipes x {args.objects} fruits, {expected} true hits")
+    print(f"  legacy endpoint box: {legacy_found / max(1, expected):6.1%} of true hits")
+    print(f"  swept capsule:       {swept_found / max(1, expected):6.1%} of true hits")
+
+    for name, fn in (("legacy endpoint box", legacy_hits), ("swept capsule", collider.hits)):
+        start = time.perf_counter()
+        for i in range(trials):
+            fn(*cases[i % len(cases)])
+        print(f"  {name:>20}: {(time.perf_counter() - start) * 1000 / trials:7.3f} ms/frame")
+
+    if mismatches or swept_found < expected:
+        raise SystemExit(f"swept collision disagrees with the reference on {mismatches} entities")
+
+
+# -------------------------
+# Adaptive Hand Inference
+# -------------------------
+def load_footage(path, frames):
+    # Mirrored RGB frames of a recorded video, as the capture pipeline sees them.
+    video = cv2.VideoCapture(path)
+    fps = video.get(cv2.CAP_PROP_FPS) or 30.0
+    footage = []
+    while len(footage) < frames:
+        ret, frame = video.read()
+        if not ret:
+            break
+        footage.append(cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB))
+    video.release()
+    return footage, fps
+
+
+def bench_inference(args):
+    import mediapipe as mp
+    from inference import AdaptiveInference
+
+    if not args.video:
+        raise SystemExit("inference needs recorded footage with hands in it: --video PATH")
+    footage, fps = load_footage(args.video, args.frames)
+    if not footage:
+        raise SystemExit(f"could not read any frames from {args.video}")
+    mp_hands = mp.solutions.hands
+
+    def make_hands(max_num_hands, static_image_mode=False):
+        return mp_hands.Hands(static_image_mode=static_image_mode, max_num_hands=max_num_hands,
+                              min_detection_confidence=0.7, min_tracking_confidence=0.7)
+
+    def run(**knobs):
+        inference = AdaptiveInference(make_hands, mp_hands.HandLandmark.INDEX_FINGER_TIP, **knobs)
+        inference.preload(args.max_hands)  # load the models outside the timing
+        times, tips = [], []
+        for i, frame in enumerate(footage):
+            start = time.perf_counter()
+            _, found = inference.process(frame, i / fps, args.max_hands)
+            times.append(time.perf_counter() - start)
+            tips.append(np.array(found).reshape(-1, 2) * (win_width, win_height))
+        inference.close()
+        return np.array(times) * 1000, tips, inference.stats()
+
+    configs = [
+        ("full frame", {}),
+        ("scale 0.5", dict(scale=0.5)),
+        ("roi", dict(roi=True)),
+        ("roi + scale 0.5", dict(roi=True, scale=0.5)),
+        ("every 2, velocity", dict(every=2)),
+        ("every 2, hold", dict(every=2, predict="hold")),
+        ("every 3, velocity", dict(every=3)),
+        ("roi + 0.5 + every 2", dict(roi=True, scale=0.5, every=2)),
+    ]
+    print(f"{len(footage)} frames of {footage[0].shape[1]}x{footage[0].shape[0]} footage, "
+          f"max {args.max_hands} hands; errors in {win_width}x{win_height} window pixels vs. full frame")
+    print(f"{'':>20} {'mean ms':>8} {'p95 ms':>8} {'inferred':>9} {'same count':>11} {'err mean':>9} {'err p95':>8}")
+    reference = None
+    for name, knobs in configs:
+        ms, tips, stats = run(**knobs)
+        if reference is None:
+            reference = tips
+        same = np.mean([len(a) == len(b) for a, b in zip(tips, reference)])
+        # Each reference fingertip against the nearest fingertip found.
+        errors = [np.sqrt(((ref[:, None] - got[None]) ** 2).sum(-1)).min(1)
+                  for got, ref in zip(tips, reference) if len(got) and len(ref)]
+        errors = np.concatenate(errors) if errors else np.zeros(0)
+        err = f"{errors.mean():9.1f} {np.percentile(errors, 95):8.1f}" if len(errors) else f"{'-':>9} {'-':>8}"
+        print(f"{name:>20} {ms.mean():8.2f} {np.percentile(ms, 95):8.2f} "
+              f"{stats['inferences'] / stats['frames']:9.0%} {same:11.0%} {err}")
+
+
+# -------------------------
+# Hand Tracking
+# -------------------------
+def bench_tracker(args):
+    from gameplay import is_slashing
+    from tracker import HandTracker
+
+    rng = np.random.default_rng(3)
+    hands, fps = 4, 30
+    frames = max(2, args.frames)
+    # Four fingertips sweeping on separate Lissajous paths, seen with 2px of
+    # jitter, in a random order every frame, and each missed 5% of the time.
+    t = np.arange(frames)[:, None] / fps
+    phase = np.arange(hands)[None] * np.pi / 2
+    truth = np.stack([640 + 500 * np.sin(4.2 * t + phase), 360 + 280 * np.sin(6.6 * t + 2 * phase)], axis=-1)
+    snapshots = []
+    for f in range(frames):
+        visible = np.flatnonzero(rng.random(hands) > 0.05)
+        rng.shuffle(visible)
+        noisy = truth[f, visible] + rng.normal(0, 2, (len(visible), 2))
+        snapshots.append((visible, [tuple(p) for p in noisy.tolist()]))
+
+    def score(pairs_per_frame):
+        # Segments joining two different hands are phantoms; true slashes of a
+        # hand seen in both frames that produced no segment are missed.
+        phantom = missed = real = 0
+        for f, pairs in enumerate(pairs_per_frame, start=1):
+            found = set()
+            for a, b, (p, q) in pairs:
+                if a != b:
+                    phantom += is_slashing(p, q)
+                elif is_slashing(p, q):
+                    found.add(a)
+            both = set(snapshots[f - 1][0].tolist()) & set(snapshots[f][0].tolist())
+            for h in both:
+                if is_slashing(truth[f - 1, h], truth[f, h]):
+                    real += 1
+                    missed += h not in found
+        return phantom, missed, real
+
+    legacy = []
+    for (prev_ids, prev), (ids, curr) in zip(snapshots, snapshots[1:]):
+        legacy.append([(a, b, (p, q)) for a, b, p, q in zip(prev_ids.tolist(), ids.tolist(), prev, curr)])
+
+    tracker = HandTracker()
+    tracked = []
+    last_hand = {}  # track id -> true hand it was matched to last time
+    switches = 0
+    start = time.perf_counter()
+    updates = []
+    for f, (ids, curr) in enumerate(snapshots):
+        t0 = time.perf_counter()
+        tracks = tracker.update(curr, f / fps)
+        updates.append(time.perf_counter() - t0)
+        pairs = []
+        for h, track in zip(ids.tolist(), tracks):
+            before = last_hand.setdefault(track.id, h)
+            switches += before != h
+            last_hand[track.id] = h
+            if track.seen > 1:
+                pairs.append((before, h, (track.previous, track.position)))
+        if f:
+            tracked.append(pairs)
+    elapsed = time.perf_counter() - start
+
+    print(f"{frames} frames, {hands} hands, shuffled detection order, 5% dropouts")
+    for name, pairs in (("zip(prev, curr)", legacy), ("HandTracker", tracked)):
+        phantom, missed, real = score(pairs)
+        print(f"  {name:>16}: {phantom:5d} phantom slashes, {missed:5d} of {real} real slashes missed")
+    print(f"  tracker: {tracker._next_id - 1} IDs for {hands} hands, {switches} ID switches, "
+          f"{np.mean(updates) * 1e6:.1f} us/update (p99 {np.percentile(updates, 99) * 1e6:.1f} us), "
+          f"{elapsed * 1000 / frames:.3f} ms/frame total")
+
+
+# -------------------------
+# Object Pools
+# -------------------------
+def bench_pools(args):
+    import gc
+
+    from gameplay import Game
+    from pools import ArrayPool
+
+    steps = args.frames * 10
+    multiplier = max(1, args.objects // 10)
+    sprites = [pygame.Surface((80, 80))] * 10
+
+    class Unpooled:
+        # ArrayPool without the pooling, mixed in ahead of a pool's own class:
+        # every acquire builds new arrays one record longer and every release
+        # builds new arrays of the survivors, like np.append() / boolean
+        # indexing on plain arrays would. Records and their order come out
+        # exactly as with the pool, so the game plays out the same.
+        def acquire(self, **values):
+            self._grow(self.count + 1)
+            return super().acquire(**values)
+
+        def acquire_many(self, n, **values):
+            self._grow(self.count + n)
+            return super().acquire_many(n, **values)
+
+        def release(self, mask):
+            n = self.count
+            keep = n - int(np.count_nonzero(mask))
+            if keep == n:
+                return
+            # Survivors in the order ArrayPool.release() leaves them.
+            order = np.arange(n)
+            holes = np.flatnonzero(mask[:keep])
+            order[holes] = np.flatnonzero(~mask[keep:n]) + keep
+            for dtype, block in self._blocks.items():
+                self._blocks[dtype] = block[:, order[:keep]]
+            self._bind()
+            arrays[0] += len(self._blocks)
+            self.count = self.capacity = keep
+            self.released += n - keep
+
+        def clear(self):
+            self.released += self.count
+            self.count = 0
+            self._grow(0)
+
+    # NumPy arrays made by the pools, counted by wrapping ArrayPool._grow();
+    # tracemalloc can only see the high-water mark of such short-lived arrays.
+    arrays = [0]
+    grow = ArrayPool._grow
+
+    def counted_grow(self, capacity):
+        arrays[0] += len(self._blocks)
+        grow(self, capacity)
+
+    def session(pooled, trace=False):
+        # The real Game, 4 hands sweeping; returns (result, per-step bytes
+        # allocated above the step's starting level, when traced).
+        game = Game(sprites, (win_width, win_height), multiplier)
+        if not pooled:
+            for name in ("fruits", "sliced_fruits", "explosions", "events"):
+                pool = getattr(game, name)
+                pool.__class__ = type(f"Unpooled{type(pool).__name__}", (Unpooled, type(pool)), {})
+        game.reset("multi-player", seed=1)
+        arrays[0] = 0
+        churn = np.zeros(steps)
+        for step in range(steps):
+            if trace:
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+            t = step / 30
+            game.lives_mp = 1 << 30  # never end the session
+            game.add_hands([(640 + 560 * np.sin(4.2 * t + k), 360 + 300 * np.sin(6.6 * t + 2 * k))
+                            for k in range(4)])
+            game.step(1 / 30)
+            game.events.clear()
+            if trace:
+                churn[step] = tracemalloc.get_traced_memory()[1] - before
+        return game.result(), churn, game
+
+    pauses = []
+    started = []
+
+    def on_gc(phase, info):
+        if phase == "start":
+            started.append(time.perf_counter())
+        elif started:
+            pauses.append((info["generation"], time.perf_counter() - started.pop()))
+
+    print(f"{steps} steps of multi-player at {multiplier}x spawns, 4 hands sweeping; "
+          f"the same Game with and without its pools")
+    results = {}
+    gc.callbacks.append(on_gc)
+    ArrayPool._grow = counted_grow
+    try:
+        for name, pooled in (("no pools", False), ("pools", True)):
+            # Timed and GC-watched untraced; tracemalloc would slow both down.
+            gc.collect()
+            pauses.clear()
+            start = time.perf_counter()
+            result, _, game = session(pooled)
+            elapsed = time.perf_counter() - start
+            made = arrays[0]
+            per_gen = [sum(1 for g, _ in pauses if g == gen) for gen in range(3)]
+            total = sum(p for _, p in pauses) * 1000
+            worst = max((p for _, p in pauses), default=0) * 1000
+
+            tracemalloc.start()
+            _, churn, _ = session(pooled, trace=True)
+            tracemalloc.stop()
+            results[name] = result
+            print(f"  {name:>8}: {elapsed * 1000 / steps:6.3f} ms/step, {made / steps:6.2f} pool arrays made "
+                  f"per step, tracemalloc peak per step {churn.mean() / 1024:5.1f} KiB mean / "
+                  f"{churn.max() / 1024:5.1f} KiB max, GC runs gen0/1/2 {per_gen[0]}/{per_gen[1]}/{per_gen[2]}, "
+                  f"pauses {total:.1f} ms total, {worst:.2f} ms worst")
+            if pooled:
+                for pool, row in game.pool_stats().items():
+                    print(f"  {'':>8}  {pool:>13}: peak {row['peak']:5d} / capacity {row['capacity']:5d}, "
+                          f"{row['acquired']} acquired, {row['grows']} grows")
+    finally:
+        gc.callbacks.remove(on_gc)
+        ArrayPool._grow = grow
+    same = results["no pools"] == results["pools"]
+    print(f"  same outcome: {same} ({results['pools']['scores']})")
+    print("  (tracemalloc peak: the most memory allocated at once during a step, above its starting level;"
+          " NumPy arrays aren't tracked by the GC, so neither version triggers collections)")
+
+
+# -------------------------
+# Startup Asset Loading
+# -------------------------
+GAME_IMAGES = ([("images/bg.jpg", (win_width, win_height))]
+               + [(f"images/{fruit}{i}.png", (80, 80)) for fruit in ("watermelon", "berry", "orange") for i in (1, 2, 3)]
+               + [("images/bomb.png", (80, 80)), ("images/star1.png", (40, 40)), ("images/explosion.png", (80, 80))]
+               # The mode-selection icons ask for some of the fruit sprites again.
+               + [("images/berry1.png", (80, 80)), ("images/orange1.png", (80, 80)),
+                  ("images/watermelon1.png", (80, 80)), ("images/bomb.png", (80, 80))])
+
+
+def bench_assets(args):
+    import tempfile
+
+    from assets import AssetLoader
+
+    win = init_display()
+
+    def serial():
+        # The old load_image(): every call decodes and scales, nothing converted.
+        surfaces = []
+        for path, size in GAME_IMAGES:
+            try:
+                surfaces.append(pygame.transform.scale(pygame.image.load(path), size))
+            except Exception:
+                surfaces.append(pygame.Surface(size))
+        return surfaces
+
+    def pooled(cache_dir=None):
+        loader = AssetLoader(cache_dir=cache_dir)
+        loader.preload(GAME_IMAGES)
+        surfaces = [loader.get(path, size) for path, size in GAME_IMAGES]
+        loader.shutdown()
+        return surfaces, loader
+
+    def best_of(fn, runs=5):
+        best = None
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = fn()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best * 1000, result
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        ms, raw = best_of(serial)
+        print(f"   serial: {ms:7.2f} ms for {len(GAME_IMAGES)} load_image() calls")
+        ms, (converted, loader) = best_of(pooled)
+        print(f"   pooled: {ms:7.2f} ms, {len(loader)} distinct images, converted to the display format")
+        pooled(cache_dir)  # fill the cache
+        ms, (_, loader) = best_of(lambda: pooled(cache_dir))
+        print(f"   cached: {ms:7.2f} ms, {loader.cache_hits} of {len(loader)} images from {cache_dir}")
+
+    # Blitting the sprites the way the main loop does, before and after conversion.
+    sprites = list(zip(raw[1:13], converted[1:13]))
+    positions = [((i * 53) % (win_width - 80), (i * 97) % (win_height - 80)) for i in range(args.objects)]
+    for name, index in (("unconverted", 0), ("converted", 1)):
+        def blit(frame):
+            for i, (x, y) in enumerate(positions):
+                win.blit(sprites[i % len(sprites)][index], (x, y))
+        ms, _ = timed(blit, args.frames)
+        print(f"{name:>11}: {ms:7.3f} ms/frame for {args.objects} sprite blits")
+
+
+# -------------------------
+# Audio Triggers
+# -------------------------
+def bench_audio(args):
+    from audio import MIXER_BUFFER, MIXER_FREQUENCY, AudioEngine, configure_mixer
+    from gameplay import BOMB_HIT
+
+    configure_mixer()
+    init_display()
+    pygame.mixer.init()
+    frequency, _, _ = pygame.mixer.get_init()
+    sounds = {name: pygame.mixer.Sound(f"sounds/{name}.wav") for name in ("slash", "bomb")}
+
+    # Which sounds a frenzy game asks for each frame, one simulation step per
+    # rendered frame.
+    frames = [["slash"] * len(events) + ["bomb"] * sum(kind == BOMB_HIT for kind, *_ in events)
+              for events in frenzy_events(args.frames * 10, args.objects)]
+    triggers = sum(len(f) for f in frames)
+    busiest = max(len(f) for f in frames)
+    print(f"{len(frames)} frames, {triggers} sound triggers, up to {busiest} in one frame")
+
+    start = time.perf_counter()
+    for names in frames:
+        for name in names:
+            sounds[name].play()
+    elapsed = time.perf_counter() - start
+    pygame.mixer.stop()
+    print(f"   direct: {triggers:6d} Sound.play() calls, {elapsed * 1e6 / len(frames):6.1f} us/frame")
+
+    frame = [0]
+    audio = AudioEngine(clock=lambda: frame[0] / 30)
+    for name, sound in sounds.items():
+        audio.add(name, sound, name)
+    start = time.perf_counter()
+    for frame[0], names in enumerate(frames):
+        for name in names:
+            audio.play(name)
+        audio.flush()
+    elapsed = time.perf_counter() - start
+    pygame.mixer.stop()
+    stats = audio.stats()
+    played = sum(c["played"] for c in stats["categories"].values())
+    print(f"   engine: {played:6d} sounds started, {elapsed * 1e6 / len(frames):6.1f} us/frame, "
+          f"{stats['deduped']} duplicate triggers merged")
+    for name, row in stats["categories"].items():
+        print(f"   {'':>7}{name:>6}: {row['played']:5d} played on {row['channels']} channels, {row['stolen']} stolen")
+    print(f"   mixer buffer {MIXER_BUFFER} samples at {frequency} Hz = {MIXER_BUFFER * 1000 / frequency:.1f} ms "
+          f"(pygame default 512 = {512 * 1000 / MIXER_FREQUENCY:.1f} ms)")
+
+
+# -------------------------
+# Gameplay Video
+# -------------------------
+def bench_video(args):
+    import tempfile
+
+    from clips import ClipRecorder
+
+    win = init_display()
+    size = (win_width // 2, win_height // 2)
+    frame_time = 1 / 60
+
+    def draw(i):
+        win.fill((30, 60, 90))
+        for k in range(args.objects):
+            pygame.draw.circle(win, (200, 40 * (k % 6), 0), ((i * 7 + k * 53) % win_width, (k * 97) % win_height), 40)
+
+    def run(name, record):
+        # A 60 fps loop: draw, hand the frame over, sleep out the rest of the
+        # frame as clock.tick() would.
+        costs = []
+        for i in range(args.frames):
+            start = time.perf_counter()
+            draw(i)
+            drawn = time.perf_counter()
+            record(i)
+            costs.append(time.perf_counter() - drawn)
+            time.sleep(max(0.0, frame_time - (time.perf_counter() - start)))
+        p50, p99 = np.percentile(np.array(costs) * 1000, (50, 99))
+        print(f"{name:>7}: {p50:6.2f} ms p50, {p99:6.2f} ms p99, {max(costs) * 1000:6.2f} ms max added to the frame")
+
+    with tempfile.TemporaryDirectory() as out:
+        small = pygame.Surface(size, 0, win)
+        writer = cv2.VideoWriter(os.path.join(out, "sync.mp4"), cv2.VideoWriter_fourcc(*"mp4v"), 30, size)
+
+        def inline(i):
+            # Encoding on the game loop, every other frame for 30 fps.
+            if i % 2 == 0:
+                pygame.transform.scale(win, size, small)
+                rgb = np.frombuffer(pygame.image.tobytes(small, "RGB"), np.uint8).reshape(size[1], size[0], 3)
+                writer.write(cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR))
+
+        run("inline", inline)
+        writer.release()
+        for name, rolling in (("thread", None), ("rolling", 10)):
+            recorder = ClipRecorder(os.path.join(out, f"{name}.mp4"), (win_width, win_height), rolling=rolling)
+            run(name, lambda i: recorder.offer(win))
+            recorder.close()
+            stats = recorder.stats()
+            print(f"{'':>9}{stats['written']} frames encoded ({stats['encode_ms']:.2f} ms each), "
+                  f"{stats['dropped']} dropped, {stats['decimated']} decimated, "
+                  f"peak queue depth {stats['peak_queue_depth']}")
+
+
+# -------------------------
+# Juice Particles
+# -------------------------
+def bench_particles(args):
+    import random
+
+    from particles import JUICE_COLORS, ParticleSystem
+
+    win = init_display()
+    frames = frenzy_events(args.frames, args.objects)
+    slices = sum(len(f) for f in frames)
+    print(f"{len(frames)} frames of 4-player frenzy ({args.objects // 10}x spawns), {slices} slices, 24 drops each")
+
+    class Drop:
+        # The naive version: one object per particle, drawn with draw.circle().
+        def __init__(self, x, y, color):
+            angle, speed = random.uniform(0, 2 * np.pi), random.uniform(120, 520)
+            self.x, self.y = x, y
+            self.vx, self.vy = np.cos(angle) * speed, np.sin(angle) * speed - 250
+            self.age, self.life, self.color = 0.0, random.uniform(0.3, 0.7), color
+
+    def objects_session():
+        drops, live = [], 0
+        costs = []
+        for events in frames:
+            start = time.perf_counter()
+            for _, x, y, sprite in events:
+                drops.extend(Drop(x, y, JUICE_COLORS.get(sprite, (255, 0, 0))) for _ in range(24))
+            kept = []
+            for d in drops:
+                d.vy += 1400 / 60
+                d.x += d.vx / 60
+                d.y += d.vy / 60
+                d.age += 1 / 60
+                if d.age < d.life and 0 <= d.x < win_width and d.y < win_height:
+                    kept.append(d)
+                    pygame.draw.circle(win, d.color, (int(d.x), int(d.y)), 2)
+            drops = kept
+            costs.append(time.perf_counter() - start)
+            live += len(drops)
+        return costs, live / len(frames)
+
+    def pooled_session(budget):
+        particles = ParticleSystem((win_width, win_height), budget=budget, seed=1)
+        costs, live = [], 0
+        for events in frames:
+            start = time.perf_counter()
+            for _, x, y, sprite in events:
+                particles.burst(x, y, sprite)
+            particles.update(1 / 60)
+            particles.draw(win)
+            costs.append(time.perf_counter() - start)
+            live += particles.count
+        return costs, live / len(frames), particles.stats()
+
+    runs = [("objects", objects_session, None)]
+    runs += [(f"budget {budget}", pooled_session, budget) for budget in (1000, 2000, 4000, 100000)]
+    for name, session, budget in runs:
+        result = session() if budget is None else session(budget)
+        costs, live = result[:2]
+        p50, p99 = np.percentile(np.array(costs) * 1000, (50, 99))
+        line = f"{name:>13}: {p50:6.2f} ms p50, {p99:6.2f} ms p99 per frame, {live:7.1f} live on average"
+        if budget is not None:
+            line += f", {result[2]['trimmed']} trimmed by the budget"
+        print(line)
+
+
+# -------------------------
+# Render Queue
+# -------------------------
+def bench_render(args):
+    from render import EFFECTS, HUD, SLICED, SPRITES, RenderQueue
+    from sprites import RotationCache
+
+    win = init_display()
+    sprites = []
+    for i in range(10):
+        sprite = pygame.Surface((80, 80), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, (25 * i, 200, 100, 255), (40, 40), 38)
+        sprites.append(sprite.convert_alpha())
+    text = [pygame.font.SysFont("monospace", 24).render(f"Score: {i}", True, (255, 255, 255)) for i in range(4)]
+    cache = RotationCache()
+    rng = np.random.default_rng(5)
+    # Fruits, halves and explosions as the game draws them, positions in NumPy
+    # arrays (as in EntityStore) and every sprite through the rotation cache.
+    # "spread" puts about half of them off screen, like a frenzy wave that has
+    # just been thrown up from below.
+    n = args.objects
+    kinds = np.arange(n) % len(sprites)
+    layers = [SPRITES, SLICED, EFFECTS]
+    scenes = {
+        "on screen": rng.uniform((0, 0), (win_width - 80, win_height - 80), (n, 2)),
+        "spread": rng.uniform((-200, -100), (win_width + 120, 2 * win_height), (n, 2)),
+    }
+
+    def ms_per_frame(fn, repeats=5):
+        # Best of a few runs, plainly timed: tracemalloc (see timed()) would
+        # charge the queue's tuples far more than they cost.
+        fn(0)
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for frame in range(args.frames):
+                fn(frame)
+            best = min(best, time.perf_counter() - start)
+        return best * 1000 / args.frames
+
+    print(f"{n} rotated sprites in 3 layers + 4 HUD strings per frame")
+    for scene, positions in scenes.items():
+        x, y = positions[:, 0], positions[:, 1]
+        queue = RenderQueue((win_width, win_height))
+
+        def per_object(frame):
+            angle = frame * 3
+            for kind, sx, sy in zip(kinds.tolist(), x.tolist(), y.tolist()):
+                cache.blit(win, sprites[kind], angle, sx, sy)
+            for i, surface in enumerate(text):
+                win.blit(surface, (20, 10 + 30 * i))
+
+        def queued(frame):
+            angle = frame * 3
+            shown = queue.cull(x - 17, y - 17, 114, 114)
+            for i, kind, sx, sy in zip(np.flatnonzero(shown).tolist(), kinds[shown].tolist(),
+                                       x[shown].tolist(), y[shown].tolist()):
+                queue.blit(layers[i % 3], *cache.place(sprites[kind], angle, sx, sy))
+            for i, surface in enumerate(text):
+                queue.blit(HUD, surface, (20, 10 + 30 * i))
+            queue.flush(win)
+
+        for name, fn in (("per-object blit", per_object), ("render queue", queued)):
+            print(f"  {scene:>9}, {name:>15}: {ms_per_frame(fn):7.3f} ms/frame")
+        stats = queue.stats()
+        print(f"  {scene:>9}: {stats['culled'] / stats['frames']:.0f} sprites culled and "
+              f"{stats['batches'] / stats['frames']:.0f} blits() calls per frame")
+
+
+# -------------------------
+# Blade Trails
+# -------------------------
+def bench_trails(args):
+    from tracker import HandTracker
+    from trails import BladeTrails
+
+    win = init_display()
+    tracker = HandTracker()
+    trails = BladeTrails()
+    step = 1 / 30
+
+    def hands_at(i):
+        t = i * step
+        return [(640 + 560 * np.sin(4.2 * t + k), 360 + 300 * np.sin(6.6 * t + 2 * k)) for k in range(4)]
+
+    # Draw cost and memory should not depend on how long the session has been
+    # running.
+    print(f"4 hands, one camera snapshot per frame, {trails.span}s trails")
+    frame = 0
+    for minutes in (0, 1, 10):
+        while frame < minutes * 60 * 30:
+            tracker.update(hands_at(frame), frame * step)
+            frame += 1
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            tracker.update(hands_at(frame), frame * step)
+            trails.draw(win, tracker.tracks, frame * step, lambda track: 0)
+            frame += 1
+        ms = (time.perf_counter() - start) * 1000 / args.frames
+        print(f"  after {minutes:2d} min: {ms:6.3f} ms/frame (track + draw), "
+              f"{sys.getallocatedblocks()} allocated blocks, {len(tracker.tracks)} tracks x {tracker.history} samples")
+
+
+# -------------------------
+# Quality Governor
+# -------------------------
+def bench_governor(args):
+    import contextlib
+    import io
+
+    from governor import QualityGovernor, quality_levels
+
+    # A synthetic load: 60 fps target, work that needs 12 ms a frame, then an
+    # overload at 22 ms, then a quiet 9 ms, with +-20% per-frame jitter. Each
+    # quality level is assumed to make frames cheaper by the given factor; the
+    # point is the control policy, not the exact savings of each lever.
+    cost_factor = [1.0, 0.93, 0.88, 0.84, 0.76, 0.73, 0.62, 0.55, 0.5, 0.47]
+    phases = [(20, 0.012), (20, 0.022), (20, 0.009)]
+    rng = np.random.default_rng(3)
+    levels = quality_levels(dict(landmarks=True, camera_scale=1.0, infer_scale=1.0, rotation_step=4,
+                                 particle_budget=2000, trail_span=0.2, max_hands=None))
+    policies = {
+        "naive": dict(restore_at=1.0, cooldown=0.0, settle=0.0, window=30),
+        "hysteresis": dict(),
+    }
+    print(f"{sum(p[0] for p in phases)} s at 60 fps: 12 ms -> 22 ms -> 9 ms of work per frame")
+    for name, options in policies.items():
+        now = [0.0]
+        governor = QualityGovernor(levels, lambda settings: None, target_fps=60, clock=lambda: now[0], **options)
+        jitter = rng.uniform(0.8, 1.2, sum(seconds * 60 for seconds, _ in phases))
+        over, frames, visited = 0, 0, []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for seconds, work in phases:
+                for _ in range(seconds * 60):
+                    cost = work * cost_factor[governor.level] * jitter[frames]
+                    over += cost > governor.budget
+                    governor.observe(cost)
+                    now[0] += max(cost, governor.budget)
+                    frames += 1
+                visited.append(governor.level)
+        print(f"  {name:>10}: {len(governor.decisions):3d} level changes, {over * 100 / frames:5.1f}% of frames over "
+              f"budget, level at the end of each phase {visited}")
+
+
+# -------------------------
+# Motion to Photon
+# -------------------------
+def bench_latency(args):
+    import mediapipe as mp
+    from background import BackgroundUploader
+    from capture import SyncCapture, ThreadedCapture
+    from inference import AdaptiveInference, MarkerInference
+    from latency import MotionToPhoton
+    from sources import SyntheticSource
+
+    # The game loop's skeleton at 60 fps on 30 fps synthetic footage: pick up
+    # the newest snapshot, draw the camera frame, display.update(). MediaPipe
+    # runs on every frame as in the game; the fingertip comes from the marker,
+    # so "motion" is measured from where the blade ends up, not from stamps.
+    win = init_display()
+    mp_hands = mp.solutions.hands
+    mp_draw = mp.solutions.drawing_utils
+
+    def make_hands(max_num_hands, static_image_mode=False):
+        return mp_hands.Hands(static_image_mode=static_image_mode, max_num_hands=max_num_hands,
+                              min_detection_confidence=0.7, min_tracking_confidence=0.7)
+
+    print(f"{args.frames} frames at 60 fps of 30 fps synthetic footage; ms from capture")
+    print(f"{'':>10} {'stage':>10} {'p50':>7} {'p95':>7} {'p99':>7}")
+    for name, capture_cls in (("sync", SyncCapture), ("threaded", ThreadedCapture)):
+        cam = SyntheticSource(30.0)
+        inference = AdaptiveInference(make_hands, mp_hands.HandLandmark.INDEX_FINGER_TIP)
+        inference.preload(4)  # load the model outside the timing
+        capture = capture_cls(cam, MarkerInference(inference), mp_hands, mp_draw, (win_width, win_height)).start()
+        background = BackgroundUploader((win_width, win_height))
+        probe = MotionToPhoton()
+        clock = pygame.time.Clock()
+        last = 0
+        for _ in range(args.frames):
+            snapshot = capture.read()
+            if snapshot.frame_id != last:
+                last = snapshot.frame_id
+                probe.pick(snapshot, time.perf_counter())
+            background.upload(snapshot.frame, win)
+            probe.mark("drawn", time.perf_counter())
+            pygame.display.update()
+            shown_at = time.perf_counter()
+            tips = snapshot.hand_positions
+            probe.shown(shown_at, shown_at - cam.time_at(tips[0][0] / win_width, shown_at) if tips else None)
+            pygame.event.pump()
+            clock.tick(60)
+        capture.stop()
+        inference.close()
+        stages = probe.summary()["stages"]
+        for stage in ("inferred", "picked", "shown", "motion"):
+            row = stages[stage]
+            print(f"{name if stage == 'inferred' else '':>10} {stage:>10} "
+                  f"{row['p50_ms']:7.1f} {row['p95_ms']:7.1f} {row['p99_ms']:7.1f}")
+        print(probe.format_histogram())
+
+
+# -------------------------
+# Session Telemetry
+# -------------------------
+def bench_telemetry(args):
+    import sqlite3
+    import tempfile
+
+    from telemetry import _SCHEMA, _STATEMENTS, TelemetryStore, top_scores
+
+    # Frenzy slices, one list of (kind, x, y, sprite) events per frame, logged
+    # from a loop paced at 60 fps: how long each logging call holds up the
+    # loop, inline SQLite (a commit per frame, as the obvious implementation
+    # would) vs. the TelemetryStore queue. Then the store's ingestion rate
+    # with nothing pacing the producer.
+    frames = frenzy_events(args.frames, args.objects)
+    print(f"{args.frames} frames of frenzy play, {sum(map(len, frames))} slices; main-loop time per frame at 60 fps")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = sqlite3.connect(os.path.join(tmp, "inline.db"))
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(_SCHEMA)
+
+        def inline(events):
+            with db:
+                db.executemany(_STATEMENTS["slice"], [("s", 0.0, *event) for event in events])
+
+        store = TelemetryStore(os.path.join(tmp, "store.db"))
+        session = store.session_started("multi-player", "frenzy", 1)
+        for name, log in (("inline sqlite", inline), ("TelemetryStore", lambda e: store.slices(session, 0.0, e))):
+            times = []
+            for events in frames:
+                start = time.perf_counter()
+                log(events)
+                times.append(time.perf_counter() - start)
+                time.sleep(max(1 / 60 - times[-1], 0))  # the rest of the frame
+            ms = np.array(times) * 1000
+            print(f"  {name:>15}: mean {ms.mean():7.3f}  p99 {np.percentile(ms, 99):7.3f}  max {ms.max():7.3f} ms")
+        db.close()
+        store.close()
+
+        # Ingestion: whole sessions, as fast as the producer can go, with a
+        # queue big enough that nothing is dropped.
+        sessions = 200
+        store = TelemetryStore(os.path.join(tmp, "ingest.db"), queue_size=sessions * (len(frames) + 2))
+        start = time.perf_counter()
+        for i in range(sessions):
+            session = store.session_started("multi-player", "frenzy", i)
+            for step, events in enumerate(frames):
+                store.slices(session, step / 30, events)
+            store.session_ended(session, {"steps": len(frames), "game_over": True, "scores": {"score": i},
+                                          "lives": {"lives": 0}})
+        queued = time.perf_counter() - start
+        store.close()
+        elapsed = time.perf_counter() - start
+        stats = store.stats()
+        print(f"  ingestion: {stats['rows']} rows from {sessions} sessions in {elapsed:.2f} s = "
+              f"{stats['rows'] / elapsed:,.0f} rows/s ({queued:.2f} s to queue), {stats['transactions']} "
+              f"transactions, longest {stats['max_commit_ms']:.1f} ms, {stats['dropped']} rows dropped")
+        start = time.perf_counter()
+        best = top_scores(os.path.join(tmp, "ingest.db"), "multi-player", 10)
+        print(f"  top_scores(): {(time.perf_counter() - start) * 1000:.2f} ms, best {best[0]['score']}")
+
+
+# -------------------------
+# Entry Point
+# -------------------------
+BENCHMARKS = {
+    "assets": bench_assets,
+    "audio": bench_audio,
+    "collision": bench_collision,
+    "entities": bench_entities,
+    "governor": bench_governor,
+    "inference": bench_inference,
+    "latency": bench_latency,
+    "menu": bench_menu,
+    "particles": bench_particles,
+    "pools": bench_pools,
+    "render": bench_render,
+    "rotation": bench_rotation,
+    "telemetry": bench_telemetry,
+    "tracker": bench_tracker,
+    "trails": bench_trails,
+    "upload": bench_upload,
+    "video": bench_video,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AR Fruit Ninja micro-benchmarks")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--objects", type=int, default=60, help="sprites/entities per frame")
+    parser.add_argument("--video", help="recorded camera footage (inference)")
+    parser.add_argument("--max-hands", type=int, default=4, help="max_num_hands (inference)")
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    main()
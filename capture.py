@@ -0,0 +1,459 @@
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+from inference import DEFAULT_MAX_HANDS, hands_worker
+from profiler import FrameProfiler
+
+# -------------------------
+# Hand Snapshots
+# -------------------------
+# One processed camera frame as seen by the game loop. `frame` is the mirrored
+# RGB image (with landmarks drawn on it) that was also fed to MediaPipe. The
+# frame's trip through the pipeline is stamped with time.perf_counter():
+#
+#   captured_at   when the frame was taken (read_at less the source's frame_age())
+#   read_at       when cam.read() returned it
+#   inferred_at   when hand inference on it finished
+#   processed_at  when landmarks were drawn and the snapshot was published
+HandSnapshot = namedtuple(
+    "HandSnapshot",
+    ["frame_id", "captured_at", "read_at", "inferred_at", "processed_at", "frame", "hand_positions"],
+)
+
+
+class LatestSlot:
+    # Single-slot buffer where a newer item always replaces the older one, so a
+    # slow consumer never works through a backlog of stale frames.
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._version = 0
+        self._closed = False
+
+    def put(self, item):
+        with self._cond:
+            self._item = item
+            self._version += 1
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def peek(self):
+        with self._cond:
+            return self._version, self._item
+
+    def wait_newer(self, version, timeout=None):
+        # Block until an item newer than `version` is published (or the slot is
+        # closed / the timeout expires) and return (version, item).
+        with self._cond:
+            self._cond.wait_for(lambda: self._version > version or self._closed, timeout)
+            return self._version, self._item
+
+
+class FrameBufferRing:
+    # A few reusable RGB frame buffers shared by the writer (inference) and the
+    # reader (game loop). The writer never reuses the buffer that is currently
+    # published or the one the reader is still uploading from, so three buffers
+    # are always enough and no frame is allocated after warm-up.
+    def __init__(self, count=3):
+        self._lock = threading.Lock()
+        self._buffers = [None] * count
+        self._published = None
+        self._held = None
+
+    def acquire(self, shape):
+        with self._lock:
+            for i, buf in enumerate(self._buffers):
+                if buf is not None and (buf is self._published or buf is self._held):
+                    continue
+                if buf is None or buf.shape != shape:
+                    buf = self._buffers[i] = np.empty(shape, np.uint8)
+                return buf
+        raise RuntimeError("no free frame buffer")
+
+    def publish(self, buf):
+        with self._lock:
+            self._published = buf
+
+    def hold(self, buf):
+        with self._lock:
+            self._held = buf
+
+
+# -------------------------
+# Capture Pipelines
+# -------------------------
+class SyncCapture:
+    # Reads, flips and runs hand inference inline on the caller's thread. This is
+    # the original behaviour of the main loop, kept for comparison. `inference`
+    # is an AdaptiveInference that decides how MediaPipe is run on each frame.
+    def __init__(self, cam, inference, mp_hands, mp_draw, size):
+        self.cam = cam
+        self.inference = inference
+        self.mp_hands = mp_hands
+        self.mp_draw = mp_draw
+        self.width, self.height = size
+        # In classic mode only the first detected hand is tracked.
+        self.first_hand_only = False
+        self.max_hands = DEFAULT_MAX_HANDS
+        # Quality levers (see governor.py). draw_landmarks skips the MediaPipe
+        # skeleton overlay; camera_scale asks the camera for that fraction of
+        # the resolution it started with, applied by the thread that reads it.
+        self.draw_landmarks = True
+        self.camera_scale = 1.0
+        self._camera_scale = 1.0
+        self._native_size = None
+        self._frame_id = 0
+        self._buffers = FrameBufferRing()
+        self._flipped = None
+        # Landmarks are drawn on the RGB frame, so swap the default BGR red.
+        self._landmark_spec = mp_draw.DrawingSpec(color=(255, 0, 0), thickness=2, circle_radius=2)
+        # Per-stage timings; replace with the game's profiler to collect them.
+        self.profiler = FrameProfiler(enabled=False)
+
+    def start(self):
+        return self
+
+    def stop(self):
+        pass
+
+    def _resize_camera(self):
+        self._camera_scale = scale = self.camera_scale
+        w, h = self._native_size
+        self.cam.set(cv2.CAP_PROP_FRAME_WIDTH, int(w * scale))
+        self.cam.set(cv2.CAP_PROP_FRAME_HEIGHT, int(h * scale))
+
+    def _grab(self):
+        if self.camera_scale != self._camera_scale and self._native_size:
+            self._resize_camera()
+        start = time.perf_counter()
+        ret, frame = self.cam.read()
+        read_at = time.perf_counter()
+        if not ret:
+            return None
+        if self._native_size is None:
+            self._native_size = (frame.shape[1], frame.shape[0])
+        self.profiler.record("capture", read_at - start)
+        self._frame_id += 1
+        # Back-date to when the source says the frame was taken, so frames that
+        # sat in a driver buffer show up as older (see sources.py).
+        return self._frame_id, read_at - self.cam.frame_age(), read_at, frame
+
+    def _convert(self, frame, rgb_frame):
+        # Mirror and convert the camera's BGR frame into `rgb_frame`.
+        start = time.perf_counter()
+        if self._flipped is None or self._flipped.shape != frame.shape:
+            self._flipped = np.empty_like(frame)
+        cv2.flip(frame, 1, dst=self._flipped)
+        cv2.cvtColor(self._flipped, cv2.COLOR_BGR2RGB, dst=rgb_frame)
+        self.profiler.record("flip/convert", time.perf_counter() - start)
+
+    def _finish(self, frame_id, captured_at, read_at, inferred_at, rgb_frame, hand_landmarks_list, tips):
+        # Draw the landmarks onto the frame and publish it as a snapshot.
+        start = time.perf_counter()
+        if self.first_hand_only:
+            hand_landmarks_list, tips = hand_landmarks_list[:1], tips[:1]
+        for hand_landmarks in hand_landmarks_list if self.draw_landmarks else ():
+            self.mp_draw.draw_landmarks(rgb_frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS,
+                                        landmark_drawing_spec=self._landmark_spec)
+        hand_positions = [(int(x * self.width), int(y * self.height)) for x, y in tips]
+        self.profiler.record("landmarks", time.perf_counter() - start)
+
+        self._buffers.publish(rgb_frame)
+        return HandSnapshot(frame_id, captured_at, read_at, inferred_at, time.perf_counter(), rgb_frame,
+                            tuple(hand_positions))
+
+    def _process(self, frame_id, captured_at, read_at, frame):
+        # Convert into a reused buffer; the same RGB image is used for inference
+        # and for the on-screen background.
+        rgb_frame = self._buffers.acquire(frame.shape)
+        self._convert(frame, rgb_frame)
+        start = time.perf_counter()
+        hand_landmarks_list, tips = self.inference.process(rgb_frame, captured_at, self.max_hands)
+        inferred_at = time.perf_counter()
+        self.profiler.record("hands.process", inferred_at - start)
+        return self._finish(frame_id, captured_at, read_at, inferred_at, rgb_frame, hand_landmarks_list, tips)
+
+    def read(self):
+        grabbed = self._grab()
+        if grabbed is None:
+            return None
+        snapshot = self._process(*grabbed)
+        self._buffers.hold(snapshot.frame)
+        return snapshot
+
+
+class ThreadedCapture(SyncCapture):
+    # Runs capture and inference on two producer threads. The capture thread keeps
+    # the camera drained into a latest-frame-wins slot; the inference thread always
+    # picks up the newest raw frame and publishes a HandSnapshot. read() never
+    # blocks on MediaPipe: it returns the newest snapshot, which may be the same
+    # one as the previous call (compare frame_id to detect fresh results).
+    def __init__(self, cam, inference, mp_hands, mp_draw, size, first_frame_timeout=5.0):
+        super().__init__(cam, inference, mp_hands, mp_draw, size)
+        self.first_frame_timeout = first_frame_timeout
+        self._raw = LatestSlot()
+        self._snapshots = LatestSlot()
+        self._stop = threading.Event()
+        self._finished = threading.Event()
+        self._threads = []
+        self.dropped_frames = 0
+
+    def start(self):
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="hand-inference", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._raw.close()
+        self._snapshots.close()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads = []
+
+    def _capture_loop(self):
+        while not self._stop.is_set():
+            grabbed = self._grab()
+            if grabbed is None:
+                break
+            self._raw.put(grabbed)
+        self._raw.close()
+
+    def _inference_loop(self):
+        version = 0
+        while not self._stop.is_set():
+            newest, grabbed = self._raw.wait_newer(version)
+            if newest == version:
+                break  # Capture ended and every frame has been processed.
+            self.dropped_frames += newest - version - 1
+            version = newest
+            self._snapshots.put(self._process(*grabbed))
+        self._finished.set()
+        self._snapshots.close()
+
+    def read(self):
+        if self._finished.is_set():
+            return None  # The camera stopped delivering frames.
+        version, snapshot = self._snapshots.peek()
+        if snapshot is None:
+            version, snapshot = self._snapshots.wait_newer(version, self.first_frame_timeout)
+        while snapshot is not None:
+            # Keep the inference thread off this buffer until the next read(). If a
+            # newer snapshot was published meanwhile the buffer may already be
+            # recycled, so take the newer one instead.
+            self._buffers.hold(snapshot.frame)
+            newest, latest = self._snapshots.peek()
+            if newest == version:
+                break
+            version, snapshot = newest, latest
+        return snapshot
+
+
+class PooledCapture(ThreadedCapture):
+    # Runs MediaPipe in `workers` separate processes so several cores share the
+    # inference load. Converted frames are written straight into shared memory
+    # and workers only receive a small job tuple, so no image is ever pickled.
+    #
+    # split="frames" pipelines whole frames: each idle worker takes the newest
+    # camera frame, so up to `workers` frames are in flight at once.
+    # split="zones" cuts every frame into `workers` overlapping vertical strips
+    # (one per player area) that are processed in parallel and merged.
+    #
+    # Results are published strictly in frame order: a frame that finishes early
+    # waits for the older ones still in flight. Workers only ever pick up the
+    # newest frame when they become free, so a snapshot is never more than about
+    # one inference behind the camera.
+    #
+    # `infer_scale` is AdaptiveInference's `scale` for the workers: each job
+    # carries it, so the governor can change it between frames.
+    def __init__(self, cam, workers, mp_hands, mp_draw, size, split="frames", hands_options=None,
+                 zone_overlap=0.1, first_frame_timeout=30.0, infer_scale=1.0):
+        super().__init__(cam, None, mp_hands, mp_draw, size, first_frame_timeout)
+        self.workers = workers
+        self.infer_scale = infer_scale
+        self.split = split
+        self.hands_options = hands_options or {}
+        self.zone_overlap = zone_overlap
+        self._tip_index = int(mp_hands.HandLandmark.INDEX_FINGER_TIP)
+        # A group of workers handles one frame: one worker each when pipelining
+        # frames, all of them when splitting into zones.
+        if split == "zones":
+            self._groups = [list(range(workers))]
+        else:
+            self._groups = [[w] for w in range(workers)]
+        self._idle = queue.Queue()
+        self._slots = [None] * len(self._groups)  # (SharedMemory, ndarray) per group
+        self._in_flight = {}  # frame_id -> _Job
+        self._order = deque()
+        self._lock = threading.Lock()
+        self._processes = []
+        self._jobs = []
+        self._results = None
+
+    def start(self):
+        context = multiprocessing.get_context("spawn")
+        self._results = context.Queue()
+        for worker in range(self.workers):
+            jobs = context.Queue()
+            process = context.Process(target=hands_worker, name=f"hands-{worker}", daemon=True,
+                                      args=(worker, jobs, self._results, self.hands_options))
+            process.start()
+            self._jobs.append(jobs)
+            self._processes.append(process)
+        for group in range(len(self._groups)):
+            self._idle.put(group)
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._dispatch_loop, name="hands-dispatch", daemon=True),
+            threading.Thread(target=self._collect_loop, name="hands-collect", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._raw.close()
+        self._results.put(("end", None))
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads = []
+        self._snapshots.close()
+        for jobs in self._jobs:
+            jobs.put(None)
+        for process in self._processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        self._processes, self._jobs = [], []
+        for slot in self._slots:
+            if slot is not None:
+                shm, _ = slot
+                shm.close()
+                shm.unlink()
+        self._slots = [None] * len(self._groups)
+
+    def _slot(self, group, shape):
+        slot = self._slots[group]
+        if slot is None or slot[1].shape != shape:
+            if slot is not None:
+                slot[0].close()
+                slot[0].unlink()
+            shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+            slot = self._slots[group] = (shm, np.ndarray(shape, np.uint8, buffer=shm.buf))
+        return slot
+
+    def _zones(self, group, width):
+        workers = self._groups[group]
+        if len(workers) == 1:
+            return [(0, width)]
+        zones = []
+        for k in range(len(workers)):
+            x0 = max(k / len(workers) - self.zone_overlap, 0.0)
+            x1 = min((k + 1) / len(workers) + self.zone_overlap, 1.0)
+            zones.append((int(x0 * width), int(x1 * width)))
+        return zones
+
+    def _dispatch_loop(self):
+        version = 0
+        while not self._stop.is_set():
+            try:
+                group = self._idle.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            # Only look for a frame once a worker is free, so it gets the newest.
+            newest, grabbed = self._raw.wait_newer(version)
+            if newest == version:
+                break  # Capture ended.
+            self.dropped_frames += newest - version - 1
+            version = newest
+            frame_id, captured_at, read_at, frame = grabbed
+            shm, rgb = self._slot(group, frame.shape)
+            self._convert(frame, rgb)
+            zones = self._zones(group, frame.shape[1])
+            with self._lock:
+                self._in_flight[frame_id] = _Job(group, captured_at, read_at, len(zones))
+                self._order.append(frame_id)
+            for worker, zone in zip(self._groups[group], zones):
+                self._jobs[worker].put((frame_id, shm.name, frame.shape, zone, self.max_hands, self.infer_scale))
+        self._results.put(("end", None))
+
+    def _collect_loop(self):
+        ending = False
+        while True:
+            message = self._results.get()
+            if message[0] == "end":
+                ending = True
+            elif message[0] == "result":
+                _, frame_id, _, landmarks, seconds = message
+                self.profiler.record("hands.process", seconds)
+                with self._lock:
+                    job = self._in_flight[frame_id]
+                job.parts.append(landmarks)
+                job.remaining -= 1
+                job.inferred_at = time.perf_counter()
+            while True:
+                with self._lock:
+                    if not self._order or self._in_flight[self._order[0]].remaining:
+                        break
+                    frame_id = self._order.popleft()
+                    job = self._in_flight.pop(frame_id)
+                self._snapshots.put(self._publish(frame_id, job))
+            if ending and (self._stop.is_set() or not self._order):
+                break
+        self._finished.set()
+        self._snapshots.close()
+
+    def _publish(self, frame_id, job):
+        _, shared = self._slots[job.group]
+        rgb_frame = self._buffers.acquire(shared.shape)
+        np.copyto(rgb_frame, shared)
+        self._idle.put(job.group)  # The shared slot can be reused from here on.
+
+        hands = np.concatenate(job.parts) if job.parts else np.zeros((0, 21, 3), np.float32)
+        if len(job.parts) > 1:
+            # Hands inside the zone overlap are found twice; keep the first copy.
+            kept = []
+            for hand in hands:
+                if all(np.abs(hand[self._tip_index, :2] - other[self._tip_index, :2]).max() > 0.03
+                       for other in kept):
+                    kept.append(hand)
+            hands = kept
+        hands = hands[:self.max_hands]
+        tips = [(float(hand[self._tip_index, 0]), float(hand[self._tip_index, 1])) for hand in hands]
+        return self._finish(frame_id, job.captured_at, job.read_at, job.inferred_at, rgb_frame,
+                            [_landmark_list(hand) for hand in hands], tips)
+
+
+class _Job:
+    def __init__(self, group, captured_at, read_at, remaining):
+        self.group = group
+        self.captured_at = captured_at
+        self.read_at = read_at
+        self.inferred_at = None  # when the last part came back
+        self.remaining = remaining
+        self.parts = []
+
+
+def _landmark_list(hand):
+    # float32 (21, 3) array -> the protobuf that mp_draw.draw_landmarks() expects.
+    landmarks = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z in hand.tolist():
+        landmarks.landmark.add(x=x, y=y, z=z)
+    return landmarks
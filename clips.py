@@ -0,0 +1,136 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+import pygame
+
+# -------------------------
+# Gameplay Clip Recorder
+# -------------------------
+class ClipRecorder:
+    # Records what the window shows without holding up the frame loop.
+    #
+    # offer() runs on the game loop once per frame, after everything is drawn:
+    # it scales the window into a small preallocated surface (`scale` of the
+    # window size) and copies its pixels into a free buffer, about half a
+    # millisecond for a 1280x720 window at scale 0.5. A worker thread does
+    # everything slow: colour conversion, cv2.VideoWriter encoding to `path`,
+    # and, with `rolling` set, JPEG-compressing the frame into a ring that holds
+    # the last `rolling` seconds, written out by save() when there is a
+    # highlight worth keeping. Either or both can be used.
+    #
+    # offer() never blocks. Frames come in at the render rate and are decimated
+    # to `fps`; when the worker falls behind the queue fills up, and further
+    # frames are dropped until it catches up (counted in `dropped`). The clip
+    # then skips ahead over the dropped frames instead of the game slowing down.
+    # save() and close() never wait either: only frames count against
+    # `queue_size`, so a save request always gets in behind them.
+    def __init__(self, path, size, fps=30, scale=0.5, queue_size=8, rolling=None, fourcc="mp4v"):
+        self.path = path
+        self.fps = fps
+        self.queue_size = queue_size
+        self.rolling = rolling
+        self.fourcc = fourcc
+        self.size = (int(size[0] * scale) // 2 * 2, int(size[1] * scale) // 2 * 2)
+        self._small = None
+        self._free = queue.SimpleQueue()
+        for _ in range(queue_size + 1):
+            self._free.put(np.empty((self.size[1], self.size[0], 4), np.uint8))
+        self._jobs = queue.SimpleQueue()
+        self._ring = deque(maxlen=int(rolling * fps)) if rolling else None
+        self._writer = None
+        self._next_at = None
+        self._red_first = False
+        self.offered = 0
+        self.accepted = 0
+        self.decimated = 0
+        self.dropped = 0
+        self.written = 0
+        self.saved = 0
+        self.peak_depth = 0
+        self.encode_seconds = 0.0
+        self._thread = threading.Thread(target=self._run, name="clip-recorder", daemon=True)
+        self._thread.start()
+
+    def offer(self, surface, timestamp=None):
+        # Called from the game loop with the finished frame; returns whether
+        # the frame was queued.
+        now = time.perf_counter() if timestamp is None else timestamp
+        self.offered += 1
+        if self._next_at is not None and now < self._next_at:
+            self.decimated += 1
+            return False
+        # Keep to the clip's frame rate on average, without drifting when
+        # render frames don't line up with clip frames.
+        self._next_at = now + 1 / self.fps if self._next_at is None else max(self._next_at + 1 / self.fps, now)
+        if self._jobs.qsize() >= self.queue_size or self._free.empty():
+            self.dropped += 1
+            return False
+        if self._small is None:
+            self._small = pygame.Surface(self.size, 0, surface)
+            self._red_first = self._small.get_masks()[0] == 0xFF
+        pygame.transform.scale(surface, self.size, self._small)
+        w, h = self.size
+        pixels = np.frombuffer(self._small.get_buffer(), np.uint8).reshape(h, self._small.get_pitch() // 4, 4)
+        buf = self._free.get()
+        buf[:] = pixels[:, :w]
+        self._jobs.put(("frame", buf))
+        self.accepted += 1
+        self.peak_depth = max(self.peak_depth, self._jobs.qsize())
+        return True
+
+    def save(self, path):
+        # Writes the rolling buffer's frames to `path` on the worker thread.
+        # Recording carries on meanwhile.
+        if self._ring is not None:
+            self._jobs.put(("save", path))
+
+    def close(self):
+        # Finishes the frames already queued and closes the file.
+        self._jobs.put(("close", None))
+        self._thread.join()
+
+    def _open(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        return cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, self.size)
+
+    def _run(self):
+        bgr = np.empty((self.size[1], self.size[0], 3), np.uint8)
+        while True:
+            kind, item = self._jobs.get()
+            if kind == "close":
+                break
+            start = time.perf_counter()
+            if kind == "save":
+                writer = self._open(item)
+                for jpeg in list(self._ring):
+                    writer.write(cv2.imdecode(jpeg, cv2.IMREAD_COLOR))
+                writer.release()
+                self.saved += 1
+                print(f"Saved the last {len(self._ring) / self.fps:.1f} s of play to {item}")
+                continue
+            # The pixel order is known once the first offer() has run, which
+            # is before any frame gets here.
+            code = cv2.COLOR_RGBA2BGR if self._red_first else cv2.COLOR_BGRA2BGR
+            cv2.cvtColor(item, code, dst=bgr)
+            self._free.put(item)
+            if self._ring is not None:
+                self._ring.append(cv2.imencode(".jpg", bgr, [cv2.IMWRITE_JPEG_QUALITY, 85])[1])
+            if self.path:
+                if self._writer is None:
+                    self._writer = self._open(self.path)
+                self._writer.write(bgr)
+            self.written += 1
+            self.encode_seconds += time.perf_counter() - start
+        if self._writer is not None:
+            self._writer.release()
+
+    def stats(self):
+        return {"offered": self.offered, "accepted": self.accepted, "decimated": self.decimated,
+                "dropped": self.dropped, "written": self.written, "saved_clips": self.saved,
+                "queue_depth": self._jobs.qsize(), "peak_queue_depth": self.peak_depth,
+                "encode_ms": self.encode_seconds * 1000 / max(self.written, 1)}
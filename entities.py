@@ -0,0 +1,104 @@
+from random import uniform
+
+import numpy as np
+
+from pools import ArrayPool
+
+# Entity flags.
+BOMB = 1
+CLAMP = 2  # Snap back inside [lo, hi] when bouncing (single-court modes).
+
+# Owners.
+NO_OWNER, P1, P2 = 0, 1, 2
+
+# x, y, px, py must stay the first float fields, in that order: update()
+# copies the positions into px, py as one block.
+_FIELDS = {
+    "x": np.float64,
+    "y": np.float64,
+    "px": np.float64,          # position before the last update(), for interpolation
+    "py": np.float64,
+    "vx": np.float64,
+    "u": np.float64,           # upward velocity
+    "g": np.float64,           # gravitational constant
+    "lo": np.float64,          # left wall
+    "hi": np.float64,          # right wall
+    "w": np.float64,           # sprite size
+    "h": np.float64,
+    "spawn_time": np.float64,
+    "sprite": np.int16,        # index into EntityStore.sprites
+    "owner": np.int8,
+    "flags": np.uint8,
+}
+
+
+# -------------------------
+# Entity Store
+# -------------------------
+class EntityStore(ArrayPool):
+    # Struct-of-arrays storage for fruits, bombs and sliced halves.
+    #
+    # Every field is a NumPy array and live entities occupy indices [0, count).
+    # update() integrates and bounces everything in a handful of vector ops,
+    # and release() fills holes by swapping survivors down from the end, so
+    # culling costs O(removed) instead of list.remove()'s O(n) per item. Entity
+    # order is therefore not stable; don't hold on to indices across releases.
+    def __init__(self, sprites, capacity=64):
+        self.sprites = sprites
+        super().__init__(_FIELDS, capacity)
+
+    def spawn(self, x, y, sprite, u=12, g=0.4, vx=None, owner=NO_OWNER, flags=0,
+              lo=-np.inf, hi=np.inf, spawn_time=0.0):
+        i = self.acquire()
+        self.x[i] = self.px[i] = x
+        self.y[i] = self.py[i] = y
+        self.vx[i] = uniform(-2, 2) if vx is None else vx
+        self.u[i] = u
+        self.g[i] = g
+        self.lo[i] = lo
+        self.hi[i] = hi
+        self.w[i], self.h[i] = self.sprites[sprite].get_size()
+        self.spawn_time[i] = spawn_time
+        self.sprite[i] = sprite
+        self.owner[i] = owner
+        self.flags[i] = flags
+        return i
+
+    def update(self):
+        # One simulation step (the old per-frame Img.update()) for all entities.
+        n = self.count
+        if n == 0:
+            return
+        floats = self._blocks[np.dtype(np.float64)]
+        floats[2:4, :n] = floats[:2, :n]
+        x, vx, u = self.x[:n], self.vx[:n], self.u[:n]
+        x += vx
+        self.y[:n] -= u
+        u -= self.g[:n]
+
+        lo, hi, w = self.lo[:n], self.hi[:n], self.w[:n]
+        left = x < lo
+        right = x + w > hi
+        # Usually nothing is at a wall, and the rest is a dozen more array ops.
+        if not (left.any() or right.any()):
+            return
+        right &= ~left
+        clamp = (self.flags[:n] & CLAMP) != 0
+        np.copyto(x, lo, where=left & clamp)
+        np.copyto(x, hi - w, where=right & clamp)
+        np.copyto(vx, np.abs(vx), where=left)
+        np.copyto(vx, -np.abs(vx), where=right)
+
+    def positions(self, alpha=1.0):
+        # Draw positions `alpha` of the way from the previous step to the current.
+        n = self.count
+        if alpha >= 1.0:
+            return self.x[:n], self.y[:n]
+        px, py = self.px[:n], self.py[:n]
+        return px + (self.x[:n] - px) * alpha, py + (self.y[:n] - py) * alpha
+
+    def below(self, limit):
+        return self.y[: self.count] >= limit
+
+    def older_than(self, now, age):
+        return now - self.spawn_time[: self.count] > age
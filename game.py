@@ -1,579 +1,731 @@
 import pygame
-import cv2
-import numpy as np
-from random import randint, uniform
 import mediapipe as mp
 import math
 import time
 import os
-
-# -------------------------
-# Initialization
-# -------------------------
-cam = cv2.VideoCapture(0)
-
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(
-    max_num_hands=4,  # Up to 4 hands can be detected.
-    min_detection_confidence=0.7,
-    min_tracking_confidence=0.7
-)
-mp_draw = mp.solutions.drawing_utils
-
-pygame.init()
-pygame.mixer.init()  # Initialize sound mixer
-
-clock = pygame.time.Clock()
-
-myfont = pygame.font.SysFont("monospace", 24)
-title_font = pygame.font.SysFont("monospace", 48, bold=True)
-intro_font = pygame.font.SysFont("monospace", 28)
-mode_font = pygame.font.SysFont("monospace", 36, bold=True)
-
-win_width, win_height = 1280, 720
-win = pygame.display.set_mode((win_width, win_height), pygame.FULLSCREEN)
-
-# Helper function to load images.
-def load_image(path, size):
-    try:
-        return pygame.transform.scale(pygame.image.load(path), size)
-    except Exception as e:
-        print(f"Error loading image {path}: {e}")
-        return pygame.Surface(size)  # Return a blank surface if error occurs
-
-# Load images.
-bg = load_image('images/bg.jpg', (win_width, win_height))
-watermelon = [load_image(f'images/watermelon{i}.png', (80, 80)) for i in range(1, 4)]
-berry = [load_image(f'images/berry{i}.png', (80, 80)) for i in range(1, 4)]
-orange = [load_image(f'images/orange{i}.png', (80, 80)) for i in range(1, 4)]
-bomb = load_image('images/bomb.png', (80, 80))
-
-blade_path = 'images/star1.png'
-star = load_image(blade_path, (40, 40)) if os.path.exists(blade_path) else pygame.Surface((40, 40)).fill((255, 0, 0))
-
-# Helper function to load sounds.
-def load_sound(path):
-    try:
-        return pygame.mixer.Sound(path)
-    except Exception as e:
-        print(f"Error loading sound {path}: {e}")
-        return None
-
-slash_sound = load_sound('sounds/slash.wav')
-bomb_sound = load_sound('sounds/bomb.wav')
-game_start_sound = load_sound('sounds/game_start.wav')
-game_end_sound = load_sound('sounds/game_end.wav')
-
-explosion_img = load_image('images/explosion.png', (80, 80))
-
-# -------------------------
-# Mode Selection Assets & Positions
-# -------------------------
-# Arrange the three modes horizontally and place "Quit Game" right below Dual Mode.
-# Each icon is 80x80.
-# Increase the horizontal gap further (e.g., 120 pixels) to avoid overlapping text labels for "Dual Mode" and "Multi-Player Mode".
-icon_width, icon_height = 80, 80
-horizontal_gap = 120  # Increased gap to ensure the mode text labels don't overlap
-
-group_width = 3 * icon_width + 2 * horizontal_gap
-start_x = (win_width - group_width) // 2
-base_y = win_height // 2 - icon_height // 2
-
-# Horizontal mode positions.
-classic_fruit_pos = (start_x, base_y)                        # Classic Mode on the left.
-dual_fruit_pos = (start_x + icon_width + horizontal_gap, base_y)  # Dual Mode in the center.
-multi_fruit_pos = (start_x + 2 * (icon_width + horizontal_gap), base_y)  # Multi-Player Mode on the right.
-
-# "Quit Game" positioned just below Dual Mode.
-quit_game_pos = (dual_fruit_pos[0], base_y + icon_height + 20)
-
-# Load images for mode selection.
-classic_fruit = load_image('images/berry1.png', (icon_width, icon_height))
-duel_fruit = load_image('images/orange1.png', (icon_width, icon_height))
-multi_fruit = load_image('images/watermelon1.png', (icon_width, icon_height))
-quit_game_image = load_image('images/bomb.png', (icon_width, icon_height))
-
-# -------------------------
-# Class Definitions
-# -------------------------
-class Img:
-    def __init__(self, x, y, pic, u=12, g=0.4, is_bomb=False):
-        self.x = x
-        self.y = y
-        self.pic = pic
-        self.u = u                # initial upward velocity
-        self.vx = uniform(-2, 2)  # horizontal velocity
-        self.g = g                # gravitational constant
-        self.is_bomb = is_bomb
-        self.explosion_start_time = None
-
-    def show(self, win, angle):
-        rotated_pic = pygame.transform.rotate(self.pic, angle)
-        win.blit(rotated_pic, (self.x, self.y))
-
-    def update(self):
-        self.x += self.vx
-        self.y -= self.u
-        self.u -= self.g
-        if selected_mode != "duel":
-            if self.x < 0:
-                self.x = 0
-                self.vx = -self.vx
-            elif self.x + self.pic.get_width() > win_width:
-                self.x = win_width - self.pic.get_width()
-                self.vx = -self.vx
-
-    def show_explosion(self, win):
-        if self.explosion_start_time is None:
-            self.explosion_start_time = time.time()
-        win.blit(explosion_img, (self.x, self.y))
-
-    def explosion_finished(self):
-        return self.explosion_start_time is not None and (time.time() - self.explosion_start_time) > 2
-
-# -------------------------
-# Global Variables
-# -------------------------
-hand_positions = []           
-prev_hand_positions = []      
-run = True
-angle = 0
-
-score_p1, lives_p1 = 0, 5
-score_p2, lives_p2 = 0, 5
-
-score_mp, lives_mp = 0, 5
-score_classic, lives_classic = 0, 5
-
-game_started, game_over, game_end_sound_played = False, False, False
-mode_selected = False
-selected_mode = None
-
-timer_start = 0
-game_time = 90
-
-go_again_fruit = orange[0]
-go_again_pos = [win_width // 2 - 120, win_height // 2 + 60]
-quit_game_fruit = berry[0]
-quit_game_over_pos = [win_width // 2 + 40, win_height // 2 + 60]
-
-a_dual, a_multi, a_classic = [], [], []
-sliced_fruits = []
-slashes, explosions = [], []
-
-spawn_timer_dual = 0
-spawn_timer_multi = 0
-spawn_timer_classic = 0
-
-# -------------------------
-# Utility Functions
-# -------------------------
-def reset_game():
-    global a_dual, a_multi, a_classic, sliced_fruits
-    global score_p1, score_p2, lives_p1, lives_p2
-    global score_mp, lives_mp, score_classic, lives_classic
-    global game_started, game_over, game_end_sound_played, timer_start
-    a_dual, a_multi, a_classic, sliced_fruits = [], [], [], []
-    if selected_mode == "duel":
-        score_p1, score_p2, lives_p1, lives_p2 = 0, 0, 5, 5
-    elif selected_mode == "multi-player":
-        score_mp, lives_mp = 0, 5
-    elif selected_mode == "classic":
-        score_classic, lives_classic = 0, 5
-    game_started, game_over, game_end_sound_played = True, False, False
-    timer_start = time.time()
-
-def is_slashing(prev_pos, curr_pos):
-    dx = curr_pos[0] - prev_pos[0]
-    dy = curr_pos[1] - prev_pos[1]
-    return (dx * dx + dy * dy) > (40 * 40)
-
-def create_slashing_effect(x, y):
-    slashes.append([(x, y), (x + 20, y + 20), 5])
-
-def spawn_sliced_fruits(fruit_obj):
-    if fruit_obj.pic == watermelon[0]:
-        left_img = Img(fruit_obj.x - 10, fruit_obj.y, watermelon[1], u=fruit_obj.u, g=fruit_obj.g)
-        right_img = Img(fruit_obj.x + 10, fruit_obj.y, watermelon[2], u=fruit_obj.u, g=fruit_obj.g)
-    elif fruit_obj.pic == berry[0]:
-        left_img = Img(fruit_obj.x - 10, fruit_obj.y, berry[1], u=fruit_obj.u, g=fruit_obj.g)
-        right_img = Img(fruit_obj.x + 10, fruit_obj.y, berry[2], u=fruit_obj.u, g=fruit_obj.g)
-    elif fruit_obj.pic == orange[0]:
-        left_img = Img(fruit_obj.x - 10, fruit_obj.y, orange[1], u=fruit_obj.u, g=fruit_obj.g)
-        right_img = Img(fruit_obj.x + 10, fruit_obj.y, orange[2], u=fruit_obj.u, g=fruit_obj.g)
-    else:
-        return
-    sliced_fruits.append((left_img, time.time()))
-    sliced_fruits.append((right_img, time.time()))
-
-def check_mode_selection(hand_positions):
-    global selected_mode, mode_selected
-    for hx, hy in hand_positions:
-        # Check Classic Mode option.
-        if pygame.Rect(classic_fruit_pos, (icon_width, icon_height)).collidepoint(hx, hy):
-            selected_mode = "classic"
-            mode_selected = True
-        # Check Dual Mode option.
-        elif pygame.Rect(dual_fruit_pos, (icon_width, icon_height)).collidepoint(hx, hy):
-            selected_mode = "duel"
-            mode_selected = True
-        # Check Multi-Player Mode option.
-        elif pygame.Rect(multi_fruit_pos, (icon_width, icon_height)).collidepoint(hx, hy):
-            selected_mode = "multi-player"
-            mode_selected = True
-        # Check Quit Game option.
-        elif pygame.Rect(quit_game_pos, (icon_width, icon_height)).collidepoint(hx, hy):
-            pygame.quit()
-            os._exit(0)
-
-# -------------------------
-# Main Loop
-# -------------------------
-while run:
-    ret, frame = cam.read()
-    if not ret:
-        break
-
-    frame = cv2.flip(frame, 1)
-    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = hands.process(rgb_frame)
-
-    prev_hand_positions = hand_positions.copy()
-    hand_positions.clear()
-
-    if results.multi_hand_landmarks:
-        # In classic mode, track only the first hand.
-        if selected_mode == "classic":
-            hand_landmarks_list = [results.multi_hand_landmarks[0]]
-        else:
-            hand_landmarks_list = results.multi_hand_landmarks
-        for hand_landmarks in hand_landmarks_list:
-            mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-            index_tip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
-            h, w, _ = frame.shape
-            fx, fy = int(index_tip.x * win_width), int(index_tip.y * win_height)
-            hand_positions.append((fx, fy))
-            win.blit(star, (fx - star.get_width() // 2, fy - star.get_height() // 2))
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            run = False
-
-    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    frame = np.rot90(frame)
-    frame = np.flipud(frame)
-    frame = pygame.surfarray.make_surface(frame)
-    frame = pygame.transform.scale(frame, (win_width, win_height))
-    win.blit(frame, (0, 0))
-
-    if not mode_selected:
-        # Draw title and introduction text.
+import sys
+import argparse
+
+from assets import AssetLoader
+from audio import MIXER_BUFFER, AudioEngine, configure_mixer
+from background import BackgroundUploader
+from capture import PooledCapture, SyncCapture, ThreadedCapture
+from clips import ClipRecorder
+from gameplay import BOMB_HIT, Game
+from governor import QualityGovernor, quality_levels
+from hud import StaticLayer, TextCache
+from inference import DEFAULT_MAX_HANDS, MODE_MAX_HANDS, PREDICTORS, AdaptiveInference, MarkerInference
+from particles import ParticleSystem
+from latency import MotionToPhoton
+from profiler import FrameProfiler, ProfilerOverlay, StageTally
+from render import CURSOR, EFFECTS, HUD, PARTICLES, SLICED, SPRITES, TRAILS, RenderQueue
+from replay import Recorder, Recording, replay
+from sources import CameraSource, SyntheticSource, open_source
+from sprites import RotationCache
+from telemetry import TelemetryStore, top_scores
+from timestep import FixedTimestep
+from trails import BladeTrails
+
+if __name__ == "__main__":
+    startup_began = time.perf_counter()
+
+    # -------------------------
+    # Command Line Options
+    # -------------------------
+    parser = argparse.ArgumentParser(description="AR Fruit Ninja")
+    parser.add_argument("--source", default="0",
+                        help="camera index, video file, directory / glob of images, or 'synthetic' (a marker "
+                             "moving on a known path, to measure latency)")
+    parser.add_argument("--camera-size", metavar="WxH",
+                        help="camera resolution to ask for (e.g. 1280x720); default: the driver's")
+    parser.add_argument("--source-fps", type=float,
+                        help="camera frame rate to ask for, or the rate files and images are played at")
+    parser.add_argument("--fourcc", default="MJPG",
+                        help="camera pixel format to ask for ('' = the driver's default, often YUYV)")
+    parser.add_argument("--camera-buffer", type=int, default=1, metavar="N",
+                        help="frames the camera driver may buffer (1 = always read the newest)")
+    parser.add_argument("--loop-source", action="store_true",
+                        help="start a video file or image sequence over when it ends")
+    parser.add_argument("--latency-out", metavar="PATH",
+                        help="write every camera frame's age at each stage to PATH (.csv), or the latency "
+                             "percentiles and histogram (.json)")
+    parser.add_argument("--sync-capture", action="store_true",
+                        help="run camera capture and hand inference on the main loop (no background threads)")
+    parser.add_argument("--rotation-step", type=float, default=4,
+                        help="angular resolution in degrees of the cached sprite rotations")
+    parser.add_argument("--warm-rotations", action="store_true",
+                        help="pre-render every sprite rotation at startup instead of on first use")
+    parser.add_argument("--difficulty", choices=["normal", "frenzy"], default="normal",
+                        help="frenzy spawns twenty times as many fruits and bombs per wave")
+    parser.add_argument("--fps", type=int, default=60,
+                        help="render frame-rate cap (0 = uncapped); gameplay always simulates at 30 steps/s")
+    parser.add_argument("--headless", action="store_true",
+                        help="use SDL's dummy video and audio drivers (no window or sound device)")
+    parser.add_argument("--record", metavar="PATH",
+                        help="save the hand snapshots and RNG seed of the last game played to PATH (.npz)")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="replay a recorded game headless and as fast as possible, then print the result")
+    parser.add_argument("--replay-render", action="store_true",
+                        help="draw every replayed step, to include rendering in the throughput")
+    parser.add_argument("--infer-scale", type=float, default=1.0,
+                        help="run hand inference on the camera frame scaled by this factor (e.g. 0.5)")
+    parser.add_argument("--roi", action="store_true",
+                        help="when looking for one hand (classic), run hand inference only on the region around "
+                             "the hand tracked last frame")
+    parser.add_argument("--infer-every", type=int, default=1, metavar="N",
+                        help="run hand inference on one camera frame in N and predict fingertips in between")
+    parser.add_argument("--predict", choices=sorted(PREDICTORS), default="velocity",
+                        help="fingertip prediction on frames skipped by --infer-every")
+    parser.add_argument("--inference-workers", type=int, default=0, metavar="N",
+                        help="run hand inference in N worker processes (0 = in-process)")
+    parser.add_argument("--inference-split", choices=["frames", "zones"], default="frames",
+                        help="workers take alternate whole frames, or one vertical strip of every frame each")
+    parser.add_argument("--profile", action="store_true",
+                        help="show the per-stage timing overlay from the start (F3 toggles it)")
+    parser.add_argument("--profile-out", metavar="PATH",
+                        help="write per-stage timing percentiles to PATH on exit (.json, or .csv)")
+    parser.add_argument("--audio-buffer", type=int, default=MIXER_BUFFER, metavar="SAMPLES",
+                        help="mixer buffer size; smaller plays sounds sooner but may crackle on slow machines")
+    parser.add_argument("--asset-cache", metavar="DIR",
+                        help="keep pre-scaled images in DIR so later launches skip decoding and scaling")
+    parser.add_argument("--particle-budget", type=int, default=2000, metavar="N",
+                        help="most juice particles alive at once (0 = no juice)")
+    parser.add_argument("--target-fps", type=int, metavar="FPS",
+                        help="frame rate the quality governor holds (default: --fps, or 60 when uncapped)")
+    parser.add_argument("--no-governor", action="store_true",
+                        help="keep full quality even when frames take longer than the target allows")
+    parser.add_argument("--governor-log", metavar="PATH",
+                        help="append every quality change, with the frame times behind it, to PATH (JSON lines)")
+    parser.add_argument("--record-video", metavar="PATH",
+                        help="encode what the window shows to PATH (e.g. session.mp4) on a background thread")
+    parser.add_argument("--instant-replay", type=float, metavar="SECONDS",
+                        help="keep the last SECONDS of play in memory; F9 and every game over save them to --clip-dir")
+    parser.add_argument("--clip-dir", default="clips",
+                        help="where --instant-replay clips are saved")
+    parser.add_argument("--telemetry", metavar="PATH",
+                        help="log every session's result, slices and frame times to the SQLite database PATH")
+    parser.add_argument("--leaderboard", action="store_true",
+                        help="print the top scores of each mode from the --telemetry database and exit")
+    args = parser.parse_args()
+    if args.leaderboard:
+        if not args.telemetry:
+            parser.error("--leaderboard needs --telemetry PATH")
+        for mode in ("classic", "duel", "multi-player"):
+            print(f"{mode}:")
+            for rank, row in enumerate(top_scores(args.telemetry, mode), 1):
+                ended = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["ended_at"]))
+                print(f"  {rank:2d}. {row['score']:5d}  {ended}  {row['difficulty']}")
+        sys.exit(0)
+    if args.source == "synthetic" and args.inference_workers:
+        parser.error("--source synthetic needs in-process inference (no --inference-workers)")
+
+    # -------------------------
+    # Initialization
+    # -------------------------
+    if args.headless or args.replay:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+    configure_mixer(buffer=args.audio_buffer)  # low-latency mixer, see audio.py
+    pygame.init()
+    pygame.mixer.init()  # Initialize sound mixer
+
+    win_width, win_height = 1280, 720
+    icon_width, icon_height = 80, 80
+
+    # -------------------------
+    # Camera & Hand Model
+    # -------------------------
+    # Opening the camera and building the MediaPipe graph both take a while, so
+    # they run on the asset loader's thread pool, queued ahead of the pictures;
+    # nothing waits for them until the capture pipeline starts. A replay needs
+    # neither.
+    assets = AssetLoader(cache_dir=args.asset_cache)
+    mp_hands = mp.solutions.hands
+
+    hands_options = dict(
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.7
+    )
+
+    def make_hands(max_num_hands, static_image_mode=False):
+        # Up to 4 hands can be detected (see MODE_MAX_HANDS).
+        return mp_hands.Hands(static_image_mode=static_image_mode, max_num_hands=max_num_hands, **hands_options)
+
+    inference = AdaptiveInference(make_hands, mp_hands.HandLandmark.INDEX_FINGER_TIP,
+                                  scale=args.infer_scale, roi=args.roi, every=args.infer_every,
+                                  predict=args.predict)
+    if not args.replay:
+        camera_size = tuple(int(v) for v in args.camera_size.split("x")) if args.camera_size else None
+        cam_ready = assets.submit(open_source, args.source, camera_size, args.source_fps, args.fourcc,
+                                  args.camera_buffer, args.loop_source)
+        # Worker processes build their own models.
+        model_ready = assets.submit(inference.preload, DEFAULT_MAX_HANDS) if args.inference_workers == 0 else None
+
+    # Decode and scale every picture in the meantime; load_image() below picks up
+    # the finished ones.
+    assets.preload([('images/bg.jpg', (win_width, win_height))]
+                   + [(f'images/{fruit}{i}.png', (80, 80)) for fruit in ('watermelon', 'berry', 'orange') for i in range(1, 4)]
+                   + [('images/bomb.png', (80, 80)), ('images/star1.png', (40, 40)), ('images/explosion.png', (80, 80))])
+    slash_sound, bomb_sound, game_start_sound, game_end_sound = [
+        assets.sound(f'sounds/{name}.wav') for name in ('slash', 'bomb', 'game_start', 'game_end')]
+
+    clock = pygame.time.Clock()
+
+    myfont = pygame.font.SysFont("monospace", 24)
+    title_font = pygame.font.SysFont("monospace", 48, bold=True)
+    intro_font = pygame.font.SysFont("monospace", 28)
+    mode_font = pygame.font.SysFont("monospace", 36, bold=True)
+    # Rendered HUD strings are reused until their value changes.
+    text_cache = TextCache()
+
+    # Rolling timings of every stage of the main loop; F3 shows them on screen.
+    profiler = FrameProfiler()
+    profiler_overlay = ProfilerOverlay(profiler, pygame.font.SysFont("monospace", 16), visible=args.profile)
+
+    win = pygame.display.set_mode((win_width, win_height), 0 if args.headless or args.replay else pygame.FULLSCREEN)
+
+    # Helper function to load images. Pictures come back converted to the display
+    # format, and asking for the same path and size twice returns the same Surface.
+    def load_image(path, size):
+        return assets.get(path, size)
+
+    # Load images.
+    bg = load_image('images/bg.jpg', (win_width, win_height))
+    watermelon = [load_image(f'images/watermelon{i}.png', (80, 80)) for i in range(1, 4)]
+    berry = [load_image(f'images/berry{i}.png', (80, 80)) for i in range(1, 4)]
+    orange = [load_image(f'images/orange{i}.png', (80, 80)) for i in range(1, 4)]
+    bomb = load_image('images/bomb.png', (80, 80))
+
+    blade_path = 'images/star1.png'
+    star = load_image(blade_path, (40, 40)) if os.path.exists(blade_path) else pygame.Surface((40, 40)).fill((255, 0, 0))
+
+    # Sounds were queued next to the images; None if one failed to load. They are
+    # played through the audio engine, which starts each sound at most once per
+    # frame on channels reserved for its category.
+    audio = AudioEngine()
+    audio.add("slash", slash_sound.result(), "slash")
+    audio.add("bomb", bomb_sound.result(), "bomb")
+    audio.add("game_start", game_start_sound.result(), "ui")
+    audio.add("game_end", game_end_sound.result(), "ui")
+
+    explosion_img = load_image('images/explosion.png', (80, 80))
+
+    # Rotated sprites are cached per (sprite, angle) instead of rotating every frame.
+    rotation_cache = RotationCache(step=args.rotation_step)
+    if args.warm_rotations:
+        rotation_cache.warm(watermelon + berry + orange + [bomb])
+
+    # -------------------------
+    # Mode Selection Assets & Positions
+    # -------------------------
+    # Arrange the three modes horizontally and place "Quit Game" right below Dual Mode.
+    # Each icon is 80x80.
+    # Increase the horizontal gap further (e.g., 120 pixels) to avoid overlapping text labels for "Dual Mode" and "Multi-Player Mode".
+    horizontal_gap = 120  # Increased gap to ensure the mode text labels don't overlap
+
+    group_width = 3 * icon_width + 2 * horizontal_gap
+    start_x = (win_width - group_width) // 2
+    base_y = win_height // 2 - icon_height // 2
+
+    # Horizontal mode positions.
+    classic_fruit_pos = (start_x, base_y)                        # Classic Mode on the left.
+    dual_fruit_pos = (start_x + icon_width + horizontal_gap, base_y)  # Dual Mode in the center.
+    multi_fruit_pos = (start_x + 2 * (icon_width + horizontal_gap), base_y)  # Multi-Player Mode on the right.
+
+    # "Quit Game" positioned just below Dual Mode.
+    quit_game_pos = (dual_fruit_pos[0], base_y + icon_height + 20)
+
+    # Load images for mode selection.
+    classic_fruit = load_image('images/berry1.png', (icon_width, icon_height))
+    duel_fruit = load_image('images/orange1.png', (icon_width, icon_height))
+    multi_fruit = load_image('images/watermelon1.png', (icon_width, icon_height))
+    quit_game_image = load_image('images/bomb.png', (icon_width, icon_height))
+
+    # -------------------------
+    # Entity Sprites
+    # -------------------------
+    # Entities refer to their picture by index into this table (see gameplay.py).
+    sprites = watermelon + berry + orange + [bomb]
+    # How far a rotated sprite can reach past its unrotated box, for culling.
+    sprite_size = max(max(s.get_size()) for s in sprites)
+    rotated_margin = math.ceil(sprite_size * (math.sqrt(2) - 1) / 2)
+
+    # -------------------------
+    # Global Variables
+    # -------------------------
+    hand_positions = []           
+    run = True
+
+    game_started, game_end_sound_played = False, False
+    mode_selected = False
+    selected_mode = None
+
+    go_again_fruit = orange[0]
+    go_again_pos = [win_width // 2 - 120, win_height // 2 + 60]
+    quit_game_fruit = berry[0]
+    quit_game_over_pos = [win_width // 2 + 40, win_height // 2 + 60]
+
+    spawn_multiplier = 20 if args.difficulty == "frenzy" else 1
+    # Spawning, movement, slicing and scoring; see gameplay.py.
+    game = Game(sprites, (win_width, win_height), spawn_multiplier, profiler=profiler)
+    recorder = None
+    # Session results, slices and frame times go to SQLite on a background thread.
+    telemetry = TelemetryStore(args.telemetry) if args.telemetry and not args.replay else None
+    session = None
+    # Frame times of the game being played, for its telemetry; the profiler's
+    # own window only covers the last few seconds.
+    session_frames = StageTally()
+    if telemetry:
+        profiler.listeners.append(session_frames.add_frame)
+    # Juice splashes; cosmetic only, so they run on render time outside Game.
+    particles = ParticleSystem((win_width, win_height), budget=args.particle_budget)
+    # A fading blade behind every tracked fingertip, drawn from the tracker's own
+    # history so it is the same path the slashes are detected along.
+    trails = BladeTrails()
+
+    # Everything drawn over the camera frame is queued while the frame is worked
+    # out and drawn afterwards in layer order, one Surface.blits() per layer.
+    render_queue = RenderQueue((win_width, win_height))
+
+    # Gameplay advances in fixed 1/30 s steps (the old frame rate), independent of
+    # how fast frames are rendered. Spawns and effect lifetimes use simulated time.
+    timestep = FixedTimestep(step=1 / 30)
+
+    # -------------------------
+    # Utility Functions
+    # -------------------------
+    def reset_game():
+        global game_started, game_end_sound_played, recorder, session
+        game.reset(selected_mode, hands=hand_positions)
+        timestep.reset()
+        game_started, game_end_sound_played = True, False
+        if args.record:
+            recorder = Recorder(game, args.difficulty, timestep.step)
+        if telemetry:
+            session = telemetry.session_started(game.mode, args.difficulty, game.seed)
+            session_frames.reset()
+
+    def end_session():
+        # Logs the result and frame times of the session being played, if any.
+        global session
+        if telemetry and session:
+            telemetry.session_ended(session, game.result(), session_frames.summary())
+            session = None
+
+    def draw_entities(store, alpha, layer):
+        x, y = store.positions(alpha)
+        reach = sprite_size + 2 * rotated_margin
+        shown = render_queue.cull(x - rotated_margin, y - rotated_margin, reach, reach)
+        for sprite, x, y in zip(store.sprite[:store.count][shown].tolist(), x[shown].tolist(), y[shown].tolist()):
+            render_queue.blit(layer, *rotation_cache.place(sprites[sprite], game.angle, x, y))
+
+    def play_events():
+        # Sounds and juice for everything sliced since the last frame.
+        events = game.events
+        n = events.count
+        records = list(zip(events.kind[:n].tolist(), events.x[:n].tolist(), events.y[:n].tolist(),
+                           events.sprite[:n].tolist()))
+        for kind, x, y, sprite in records:
+            audio.play("slash")
+            particles.burst(x, y, sprite)
+            if kind == BOMB_HIT:
+                audio.play("bomb")
+        events.clear()
+        if session:
+            telemetry.slices(session, game.sim_time, records)
+
+    def draw_hud():
+        if game.mode == "duel":
+            render_queue.call(HUD, pygame.draw.line, (255, 255, 255), (win_width // 2, 0),
+                              (win_width // 2, win_height), 4)
+            timer_text = text_cache.render(myfont, f"Time: {game.remaining}s", (255, 255, 255))
+            render_queue.blit(HUD, timer_text, (win_width // 2 - timer_text.get_width() // 2, 10))
+
+            score_text_p1 = text_cache.render(myfont, f"P1 Score: {game.score_p1}", (255, 255, 255))
+            lives_text_p1 = text_cache.render(myfont, f"P1 Lives: {game.lives_p1}", (255, 0, 0))
+            render_queue.blit(HUD, score_text_p1, (20, 10))
+            render_queue.blit(HUD, lives_text_p1, (20, 40))
+
+            score_text_p2 = text_cache.render(myfont, f"P2 Score: {game.score_p2}", (255, 255, 255))
+            lives_text_p2 = text_cache.render(myfont, f"P2 Lives: {game.lives_p2}", (255, 0, 0))
+            render_queue.blit(HUD, score_text_p2, (win_width - score_text_p2.get_width() - 20, 10))
+            render_queue.blit(HUD, lives_text_p2, (win_width - lives_text_p2.get_width() - 20, 40))
+
+        elif game.mode == "multi-player":
+            score_text_mp = text_cache.render(myfont, f"Score: {game.score_mp}", (255, 255, 255))
+            lives_text_mp = text_cache.render(myfont, f"Lives: {game.lives_mp}", (255, 0, 0))
+            render_queue.blit(HUD, score_text_mp, (20, 10))
+            render_queue.blit(HUD, lives_text_mp, (20, 40))
+
+        elif game.mode == "classic":
+            score_text_classic = text_cache.render(myfont, f"Score: {game.score_classic}", (255, 255, 255))
+            lives_text_classic = text_cache.render(myfont, f"Lives: {game.lives_classic}", (255, 0, 0))
+            render_queue.blit(HUD, score_text_classic, (20, 10))
+            render_queue.blit(HUD, lives_text_classic, (20, 40))
+
+    def draw_game(alpha, dt):
+        # Queues the game's layers; they are drawn by render_queue.flush().
+        with profiler.stage("queue"):
+            draw_hud()
+
+            draw_entities(game.fruits, alpha, SPRITES)
+
+            # Sliced fruits.
+            draw_entities(game.sliced_fruits, alpha, SLICED)
+
+            # Explosions.
+            explosions = game.explosions
+            n = explosions.count
+            x, y = explosions.x[:n], explosions.y[:n]
+            shown = render_queue.cull(x, y, explosion_img.get_width(), explosion_img.get_height())
+            for ex, ey in zip(x[shown].tolist(), y[shown].tolist()):
+                render_queue.blit(EFFECTS, explosion_img, (ex, ey))
+
+            render_queue.call(TRAILS, trails.draw, game.tracker.tracks, game.sim_time, game.owner_of)
+
+        with profiler.stage("particles"):
+            particles.update(dt)
+        render_queue.call(PARTICLES, particles.draw)
+
+    def check_mode_selection(hand_positions):
+        global selected_mode, mode_selected, run
+        for hx, hy in hand_positions:
+            # Check Classic Mode option.
+            if pygame.Rect(classic_fruit_pos, (icon_width, icon_height)).collidepoint(hx, hy):
+                selected_mode = "classic"
+                mode_selected = True
+            # Check Dual Mode option.
+            elif pygame.Rect(dual_fruit_pos, (icon_width, icon_height)).collidepoint(hx, hy):
+                selected_mode = "duel"
+                mode_selected = True
+            # Check Multi-Player Mode option.
+            elif pygame.Rect(multi_fruit_pos, (icon_width, icon_height)).collidepoint(hx, hy):
+                selected_mode = "multi-player"
+                mode_selected = True
+            # Check Quit Game option. Leave through the end of the main loop, so the
+            # exit reports are written and the capture threads are shut down.
+            elif pygame.Rect(quit_game_pos, (icon_width, icon_height)).collidepoint(hx, hy):
+                run = False
+
+    # -------------------------
+    # Static Screens
+    # -------------------------
+    def draw_menu(surface):
+        # Mode-selection screen, composed once into menu_layer.
+        # Title and introduction text.
         title_text = title_font.render("AR FRUITNINJA", True, (0, 0, 0))
         intro_text1 = intro_font.render("Welcome to AR Fruit Ninja!", True, (255, 255, 255))
         intro_text2 = intro_font.render("Use your hand to slice fruits in mid-air while avoiding bombs.", True, (255, 255, 255))
         intro_text3 = intro_font.render("Slice a fruit to select a mode!", True, (255, 255, 255))
-        
-        win.blit(title_text, (win_width // 2 - title_text.get_width() // 2, win_height // 2 - 300))
-        win.blit(intro_text1, (win_width // 2 - intro_text1.get_width() // 2, win_height // 2 - 250))
-        win.blit(intro_text2, (win_width // 2 - intro_text2.get_width() // 2, win_height // 2 - 210))
-        win.blit(intro_text3, (win_width // 2 - intro_text3.get_width() // 2, win_height // 2 - 170))
-        
+
+        surface.blit(title_text, (win_width // 2 - title_text.get_width() // 2, win_height // 2 - 300))
+        surface.blit(intro_text1, (win_width // 2 - intro_text1.get_width() // 2, win_height // 2 - 250))
+        surface.blit(intro_text2, (win_width // 2 - intro_text2.get_width() // 2, win_height // 2 - 210))
+        surface.blit(intro_text3, (win_width // 2 - intro_text3.get_width() // 2, win_height // 2 - 170))
+
         # Define an extra vertical gap between each icon and its label text.
         label_gap = 10
-        
+
         # Classic Mode.
-        win.blit(classic_fruit, classic_fruit_pos)
+        surface.blit(classic_fruit, classic_fruit_pos)
         classic_label = myfont.render("Classic Mode", True, (255, 255, 255))
-        win.blit(classic_label, (classic_fruit_pos[0] + (icon_width - classic_label.get_width()) // 2,
-                                 classic_fruit_pos[1] + icon_height + label_gap))
-        
+        surface.blit(classic_label, (classic_fruit_pos[0] + (icon_width - classic_label.get_width()) // 2,
+                                     classic_fruit_pos[1] + icon_height + label_gap))
+
         # Dual Mode.
-        win.blit(duel_fruit, dual_fruit_pos)
+        surface.blit(duel_fruit, dual_fruit_pos)
         duel_label = myfont.render("Dual Mode", True, (255, 255, 255))
-        win.blit(duel_label, (dual_fruit_pos[0] + (icon_width - duel_label.get_width()) // 2,
-                              dual_fruit_pos[1] + icon_height + label_gap))
-        
+        surface.blit(duel_label, (dual_fruit_pos[0] + (icon_width - duel_label.get_width()) // 2,
+                                  dual_fruit_pos[1] + icon_height + label_gap))
+
         # Multi-Player Mode.
-        win.blit(multi_fruit, multi_fruit_pos)
+        surface.blit(multi_fruit, multi_fruit_pos)
         multi_label = myfont.render("Multi-Player Mode", True, (255, 255, 255))
-        win.blit(multi_label, (multi_fruit_pos[0] + (icon_width - multi_label.get_width()) // 2,
-                               multi_fruit_pos[1] + icon_height + label_gap))
-        
+        surface.blit(multi_label, (multi_fruit_pos[0] + (icon_width - multi_label.get_width()) // 2,
+                                   multi_fruit_pos[1] + icon_height + label_gap))
+
         # Quit Game placed right below Dual Mode.
-        win.blit(quit_game_image, quit_game_pos)
+        surface.blit(quit_game_image, quit_game_pos)
         quit_label = myfont.render("Quit Game", True, (255, 255, 255))
-        win.blit(quit_label, (quit_game_pos[0] + (icon_width - quit_label.get_width()) // 2,
-                              quit_game_pos[1] + icon_height + label_gap))
-        
-        check_mode_selection(hand_positions)
-        
-    elif game_over:
-        if not game_end_sound_played:
-            if game_end_sound:
-                game_end_sound.play()
-            game_end_sound_played = True
+        surface.blit(quit_label, (quit_game_pos[0] + (icon_width - quit_label.get_width()) // 2,
+                                  quit_game_pos[1] + icon_height + label_gap))
+
+
+    def draw_game_over(surface):
+        # Game-over screen, recomposed into game_over_layer when the scores change.
         game_over_text = myfont.render("Game Over!", True, (255, 0, 0))
-        win.blit(game_over_text, (win_width // 2 - 50, win_height // 2 - 100))
-        
-        if selected_mode == "duel":
-            winner_text = myfont.render("Player 1 Wins!" if score_p1 > score_p2 
-                                         else "Player 2 Wins!" if score_p2 > score_p1 
-                                         else "It's a Tie!", True, (255, 255, 255))
-            win.blit(winner_text, (win_width // 2 - winner_text.get_width() // 2, win_height // 2 - 70))
-            final_score_text = myfont.render(f"P1: {score_p1}  P2: {score_p2}", True, (255, 255, 255))
-        elif selected_mode == "multi-player":
-            final_score_text = myfont.render("Score: " + str(score_mp), True, (255, 255, 255))
+        surface.blit(game_over_text, (win_width // 2 - 50, win_height // 2 - 100))
+
+        if game.mode == "duel":
+            winner_text = myfont.render("Player 1 Wins!" if game.score_p1 > game.score_p2
+                                        else "Player 2 Wins!" if game.score_p2 > game.score_p1
+                                        else "It's a Tie!", True, (255, 255, 255))
+            surface.blit(winner_text, (win_width // 2 - winner_text.get_width() // 2, win_height // 2 - 70))
+            final_score_text = myfont.render(f"P1: {game.score_p1}  P2: {game.score_p2}", True, (255, 255, 255))
+        elif game.mode == "multi-player":
+            final_score_text = myfont.render("Score: " + str(game.score_mp), True, (255, 255, 255))
         else:
-            final_score_text = myfont.render("Score: " + str(score_classic), True, (255, 255, 255))
-        win.blit(final_score_text, (win_width // 2 - final_score_text.get_width() // 2, win_height // 2 - 40))
-        
-        win.blit(go_again_fruit, go_again_pos)
+            final_score_text = myfont.render("Score: " + str(game.score_classic), True, (255, 255, 255))
+        surface.blit(final_score_text, (win_width // 2 - final_score_text.get_width() // 2, win_height // 2 - 40))
+
+        surface.blit(go_again_fruit, go_again_pos)
         go_again_text = myfont.render("Go Again?", True, (255, 255, 255))
-        win.blit(go_again_text, (go_again_pos[0] - 20, go_again_pos[1] + 60))
-        
-        win.blit(quit_game_fruit, quit_game_over_pos)
+        surface.blit(go_again_text, (go_again_pos[0] - 20, go_again_pos[1] + 60))
+
+        surface.blit(quit_game_fruit, quit_game_over_pos)
         quit_game_text = myfont.render("Quit Game", True, (255, 255, 255))
-        win.blit(quit_game_text, (quit_game_over_pos[0] - 20, quit_game_over_pos[1] + 60))
-        
-        if any(pygame.Rect(go_again_pos, (icon_width, icon_height)).collidepoint(hx, hy) for hx, hy in hand_positions):
-            mode_selected = False
-            reset_game()
-        if any(pygame.Rect(quit_game_over_pos, (icon_width, icon_height)).collidepoint(hx, hy) for hx, hy in hand_positions):
-            run = False
+        surface.blit(quit_game_text, (quit_game_over_pos[0] - 20, quit_game_over_pos[1] + 60))
+
+
+    menu_layer = StaticLayer((win_width, win_height), draw_menu)
+    game_over_layer = StaticLayer((win_width, win_height), draw_game_over)
+
+    # -------------------------
+    # Replay
+    # -------------------------
+    # --replay runs a recorded game through the same Game logic without a camera,
+    # as fast as the CPU allows, and exits non-zero if the outcome differs from the
+    # one that was recorded.
+    if args.replay:
+        recording = Recording.load(args.replay)
+        meta = recording.meta
+        game = Game(sprites, tuple(meta["size"]), 20 if meta["difficulty"] == "frenzy" else 1, profiler=profiler)
+
+        def render_step(game):
+            win.fill((0, 0, 0))
+            play_events()
+            audio.flush()
+            draw_game(1.0, meta["step"])
+            render_queue.flush(win, profiler)
+            with profiler.stage("display.update"):
+                pygame.display.update()
+            profiler.end_frame()
+
+        result = replay(recording, game, render_step if args.replay_render else None)
+        print(f"replay {args.replay}: {result['mode']} ({meta['difficulty']}), seed {result['seed']}")
+        print(f"  scores {result['scores']}  lives {result['lives']}  game over: {result['game_over']}")
+        print(f"  {result['steps']} steps in {result['seconds']:.3f} s = {result['steps_per_second']:.0f} steps/s "
+              f"({result['steps_per_second'] * meta['step']:.1f}x real time)")
+        print("  matches recording" if result["matches"] else f"  MISMATCH, recorded {meta['result']}")
+        if args.profile_out:
+            profiler.dump(args.profile_out, pools=dict(game.pool_stats(), particles=particles.stats()), audio=audio.stats(),
+                          render=render_queue.stats())
+        assets.shutdown()
+        pygame.quit()
+        sys.exit(0 if result["matches"] else 1)
+
+    cam = cam_ready.result()
+    if isinstance(cam, CameraSource):
+        print(f"Camera: {cam.settings()}")
+    if model_ready:
+        model_ready.result()
+    mp_draw = mp.solutions.drawing_utils
+
+    # -------------------------
+    # Capture Pipeline
+    # -------------------------
+    # By default the camera and MediaPipe run on background threads and the loop
+    # below only picks up the newest snapshot; --sync-capture restores the old
+    # read-then-infer-then-draw behaviour for comparison. --inference-workers moves
+    # MediaPipe into separate processes instead.
+    if args.inference_workers > 0:
+        capture = PooledCapture(cam, args.inference_workers, mp_hands, mp_draw, (win_width, win_height),
+                                split=args.inference_split, hands_options=hands_options,
+                                infer_scale=args.infer_scale)
     else:
-        if selected_mode == "duel":
-            pygame.draw.line(win, (255, 255, 255), (win_width // 2, 0), (win_width // 2, win_height), 4)
-            if not game_started:
-                reset_game()
-                timer_start = time.time()
-                game_started = True
-                if game_start_sound:
-                    game_start_sound.play()
-            elapsed = int(time.time() - timer_start)
-            remaining = game_time - elapsed
-            timer_text = myfont.render(f"Time: {remaining}s", True, (255, 255, 255))
-            win.blit(timer_text, (win_width // 2 - timer_text.get_width() // 2, 10))
-            if remaining <= 0:
-                game_over = True
-
-            score_text_p1 = myfont.render(f"P1 Score: {score_p1}", True, (255, 255, 255))
-            lives_text_p1 = myfont.render(f"P1 Lives: {lives_p1}", True, (255, 0, 0))
-            win.blit(score_text_p1, (20, 10))
-            win.blit(lives_text_p1, (20, 40))
-
-            score_text_p2 = myfont.render(f"P2 Score: {score_p2}", True, (255, 255, 255))
-            lives_text_p2 = myfont.render(f"P2 Lives: {lives_p2}", True, (255, 0, 0))
-            win.blit(score_text_p2, (win_width - score_text_p2.get_width() - 20, 10))
-            win.blit(lives_text_p2, (win_width - lives_text_p2.get_width() - 20, 40))
-
-            spawn_timer_dual += 1
-            if spawn_timer_dual > 60:
-                spawn_timer_dual = 0
-                num = randint(1, 3)
-                is_bomb = (randint(0, 3) == 0)
-                if not is_bomb:
-                    fruit = [watermelon[0], berry[0], orange[0]][randint(0, 2)]
-                else:
-                    fruit = bomb
-                for _ in range(num):
-                    pos_p1 = randint(50, win_width // 2 - 80)
-                    pos_p2 = randint(win_width // 2 + 50, win_width - 80)
-                    a_dual.append((Img(pos_p1, win_height, fruit, u=randint(15, 25), is_bomb=is_bomb), "P1"))
-                    a_dual.append((Img(pos_p2, win_height, fruit, u=randint(15, 25), is_bomb=is_bomb), "P2"))
-
-            remove_list = []
-            for fruit_obj, player in a_dual:
-                fruit_obj.update()
-                width = fruit_obj.pic.get_width()
-                if player == "P1":
-                    if fruit_obj.x < 50:
-                        fruit_obj.vx = abs(fruit_obj.vx)
-                    if fruit_obj.x + width > win_width // 2 - 10:
-                        fruit_obj.vx = -abs(fruit_obj.vx)
-                else:
-                    if fruit_obj.x < win_width // 2 + 10:
-                        fruit_obj.vx = abs(fruit_obj.vx)
-                    if fruit_obj.x + width > win_width - 50:
-                        fruit_obj.vx = -abs(fruit_obj.vx)
-                fruit_obj.show(win, angle)
-                fruit_rect = pygame.Rect(fruit_obj.x, fruit_obj.y, width, fruit_obj.pic.get_height())
-                for prev_pos, curr_pos in zip(prev_hand_positions, hand_positions):
-                    if is_slashing(prev_pos, curr_pos) and fruit_rect.colliderect(pygame.Rect(curr_pos[0], curr_pos[1], 40, 40)):
-                        if slash_sound:
-                            slash_sound.play()
-                        create_slashing_effect(curr_pos[0], curr_pos[1])
-                        if fruit_obj.is_bomb:
-                            if bomb_sound:
-                                bomb_sound.play()
-                            explosions.append(fruit_obj)
-                            if player == "P1":
-                                lives_p1 -= 1
-                            else:
-                                lives_p2 -= 1
-                            if lives_p1 <= 0 or lives_p2 <= 0:
-                                game_over = True
-                                a_dual.clear()
-                                break
-                            remove_list.append((fruit_obj, player))
-                        else:
-                            if player == "P1":
-                                score_p1 += 1
-                            else:
-                                score_p2 += 1
-                            spawn_sliced_fruits(fruit_obj)
-                            remove_list.append((fruit_obj, player))
-                if fruit_obj.y >= win_height:
-                    if not fruit_obj.is_bomb:
-                        if player == "P1":
-                            lives_p1 -= 1
-                        else:
-                            lives_p2 -= 1
-                        if lives_p1 <= 0 or lives_p2 <= 0:
-                            game_over = True
-                            a_dual.clear()
-                            break
-                    remove_list.append((fruit_obj, player))
-            for item in remove_list:
-                if item in a_dual:
-                    a_dual.remove(item)
-
-        elif selected_mode == "multi-player":
-            score_text_mp = myfont.render(f"Score: {score_mp}", True, (255, 255, 255))
-            lives_text_mp = myfont.render(f"Lives: {lives_mp}", True, (255, 0, 0))
-            win.blit(score_text_mp, (20, 10))
-            win.blit(lives_text_mp, (20, 40))
-            if not game_started:
-                reset_game()
-                if game_start_sound:
-                    game_start_sound.play()
-                game_started = True
-            spawn_timer_multi += 1
-            if spawn_timer_multi > 30:
-                spawn_timer_multi = 0
-                num = randint(2, 4)
-                for _ in range(num):
-                    pos = randint(50, win_width - 80)
-                    is_bomb = (randint(0, 3) == 0)
-                    if is_bomb:
-                        a_multi.append(Img(pos, win_height, bomb, u=randint(15, 25), is_bomb=True))
-                    else:
-                        fruit = [watermelon[0], berry[0], orange[0]][randint(0, 2)]
-                        a_multi.append(Img(pos, win_height, fruit, u=randint(15, 25)))
-            remove_list = []
-            for fruit_obj in a_multi:
-                fruit_obj.update()
-                fruit_obj.show(win, angle)
-                fruit_rect = pygame.Rect(fruit_obj.x, fruit_obj.y, fruit_obj.pic.get_width(), fruit_obj.pic.get_height())
-                for prev_pos, curr_pos in zip(prev_hand_positions, hand_positions):
-                    if is_slashing(prev_pos, curr_pos) and fruit_rect.colliderect(pygame.Rect(curr_pos[0], curr_pos[1], 40, 40)):
-                        if slash_sound:
-                            slash_sound.play()
-                        create_slashing_effect(curr_pos[0], curr_pos[1])
-                        if fruit_obj.is_bomb:
-                            if bomb_sound:
-                                bomb_sound.play()
-                            explosions.append(fruit_obj)
-                            lives_mp -= 1
-                            if lives_mp <= 0:
-                                game_over = True
-                                a_multi.clear()
-                                break
-                            remove_list.append(fruit_obj)
-                        else:
-                            score_mp += 1
-                            spawn_sliced_fruits(fruit_obj)
-                            remove_list.append(fruit_obj)
-                if fruit_obj.y >= win_height:
-                    if not fruit_obj.is_bomb:
-                        lives_mp -= 1
-                        if lives_mp <= 0:
-                            game_over = True
-                            a_multi.clear()
-                            break
-                    remove_list.append(fruit_obj)
-            for item in remove_list:
-                if item in a_multi:
-                    a_multi.remove(item)
-
-        elif selected_mode == "classic":
-            score_text_classic = myfont.render(f"Score: {score_classic}", True, (255, 255, 255))
-            lives_text_classic = myfont.render(f"Lives: {lives_classic}", True, (255, 0, 0))
-            win.blit(score_text_classic, (20, 10))
-            win.blit(lives_text_classic, (20, 40))
+        capture_cls = SyncCapture if args.sync_capture else ThreadedCapture
+        capture = capture_cls(cam, inference, mp_hands, mp_draw, (win_width, win_height))
+    if isinstance(cam, SyntheticSource):
+        # MediaPipe still runs, but the fingertip is the source's marker.
+        capture.inference = MarkerInference(inference)
+    capture.profiler = profiler
+    capture.start()
+    background = BackgroundUploader((win_width, win_height))
+
+    # -------------------------
+    # Quality Governor
+    # -------------------------
+    # When frames take longer than the target frame rate allows, quality is given
+    # up one lever at a time (landmark drawing, particles, rotation steps,
+    # inference and camera resolution, hand count; see governor.py), and restored
+    # once there is headroom again.
+    max_hands_cap = None
+
+    def apply_quality(settings):
+        global max_hands_cap
+        capture.draw_landmarks = settings["landmarks"]
+        capture.camera_scale = settings["camera_scale"]
+        # Pooled workers don't use `inference`; the scale goes out with each job.
+        if args.inference_workers > 0:
+            capture.infer_scale = settings["infer_scale"]
+        else:
+            inference.scale = settings["infer_scale"]
+        rotation_cache.set_step(settings["rotation_step"])
+        particles.budget = settings["particle_budget"]
+        trails.span = settings["trail_span"]
+        max_hands_cap = settings["max_hands"]
+
+    governor = None
+    if not args.no_governor:
+        governor = QualityGovernor(
+            quality_levels(dict(landmarks=True, camera_scale=1.0, infer_scale=args.infer_scale,
+                                rotation_step=args.rotation_step, particle_budget=args.particle_budget,
+                                trail_span=trails.span, max_hands=None)),
+            apply_quality, target_fps=args.target_fps or args.fps or 60, log_path=args.governor_log)
+
+    # Gameplay video: the finished window is handed to a worker thread that
+    # encodes it; frames are dropped rather than ever making the loop wait.
+    clip_recorder = None
+    if args.record_video or args.instant_replay:
+        clip_recorder = ClipRecorder(args.record_video, (win_width, win_height), rolling=args.instant_replay)
+
+    def save_clip():
+        if clip_recorder and args.instant_replay:
+            clip_recorder.save(os.path.join(args.clip_dir, time.strftime("clip-%Y%m%d-%H%M%S.mp4")))
+    last_frame_id = 0
+    # How old every camera frame is at each stage on its way to the screen.
+    latency = MotionToPhoton()
+    first_frame_shown = False
+
+    # -------------------------
+    # Main Loop
+    # -------------------------
+    while run:
+        # In classic mode, track only the first hand.
+        capture.first_hand_only = selected_mode == "classic"
+        capture.max_hands = min(MODE_MAX_HANDS.get(selected_mode, 4), max_hands_cap or 4)
+        frame_started = time.perf_counter()
+        with profiler.stage("capture.read"):
+            snapshot = capture.read()
+        if snapshot is None:
+            break
+        frame = snapshot.frame
+
+        # Slashes compare consecutive inference results, so only advance the hand
+        # history when a new snapshot has been published.
+        if snapshot.frame_id != last_frame_id:
+            last_frame_id = snapshot.frame_id
+            latency.pick(snapshot, time.perf_counter())
+            hand_positions = list(snapshot.hand_positions)
+            if mode_selected and game_started and not game.game_over:
+                if recorder:
+                    recorder.hands(hand_positions)
+                game.add_hands(hand_positions)
+
+        for fx, fy in hand_positions:
+            render_queue.blit_centered(CURSOR, star, fx, fy)
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                run = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler_overlay.toggle()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F9:
+                save_clip()
+
+        # Scale the camera frame straight into the window.
+        with profiler.stage("background"):
+            background.upload(frame, win)
+
+        if not mode_selected:
+            render_queue.call(HUD, menu_layer.draw)
+            check_mode_selection(hand_positions)
+
+        elif game.game_over:
+            if not game_end_sound_played:
+                audio.play("game_end")
+                game_end_sound_played = True
+                save_clip()
+                if recorder:
+                    recorder.save(args.record)
+                end_session()
+            # Final scores are baked into the layer, so rebuild it when they change.
+            render_queue.call(HUD, game_over_layer.draw,
+                              (game.mode, game.score_p1, game.score_p2, game.score_mp, game.score_classic))
+
+            if any(pygame.Rect(go_again_pos, (icon_width, icon_height)).collidepoint(hx, hy) for hx, hy in hand_positions):
+                # Back to the menu; the next game starts fresh in whichever mode is picked.
+                mode_selected = False
+                game_started = False
+            if any(pygame.Rect(quit_game_over_pos, (icon_width, icon_height)).collidepoint(hx, hy) for hx, hy in hand_positions):
+                run = False
+        else:
             if not game_started:
                 reset_game()
-                if game_start_sound:
-                    game_start_sound.play()
-                game_started = True
-            spawn_timer_classic += 1
-            if spawn_timer_classic > 60:
-                spawn_timer_classic = 0
-                num = randint(1, 2)
-                for _ in range(num):
-                    pos = randint(50, win_width - 80)
-                    is_bomb = (randint(0, 3) == 0)
-                    if is_bomb:
-                        a_classic.append(Img(pos, win_height, bomb, u=randint(15, 25), is_bomb=True))
-                    else:
-                        fruit = [watermelon[0], berry[0], orange[0]][randint(0, 2)]
-                        a_classic.append(Img(pos, win_height, fruit, u=randint(15, 25)))
-            remove_list = []
-            for fruit_obj in a_classic:
-                fruit_obj.update()
-                fruit_obj.show(win, angle)
-                fruit_rect = pygame.Rect(fruit_obj.x, fruit_obj.y, fruit_obj.pic.get_width(), fruit_obj.pic.get_height())
-                for prev_pos, curr_pos in zip(prev_hand_positions, hand_positions):
-                    if is_slashing(prev_pos, curr_pos) and fruit_rect.colliderect(pygame.Rect(curr_pos[0], curr_pos[1], 40, 40)):
-                        if slash_sound:
-                            slash_sound.play()
-                        create_slashing_effect(curr_pos[0], curr_pos[1])
-                        if fruit_obj.is_bomb:
-                            if bomb_sound:
-                                bomb_sound.play()
-                            explosions.append(fruit_obj)
-                            lives_classic -= 1
-                            if lives_classic <= 0:
-                                game_over = True
-                                a_classic.clear()
-                                break
-                            remove_list.append(fruit_obj)
-                        else:
-                            score_classic += 1
-                            spawn_sliced_fruits(fruit_obj)
-                            remove_list.append(fruit_obj)
-                if fruit_obj.y >= win_height:
-                    if not fruit_obj.is_bomb:
-                        lives_classic -= 1
-                        if lives_classic <= 0:
-                            game_over = True
-                            a_classic.clear()
-                            break
-                    remove_list.append(fruit_obj)
-            for item in remove_list:
-                if item in a_classic:
-                    a_classic.remove(item)
-
-        # Display sliced fruits.
-        for sliced_obj, spawn_time in sliced_fruits:
-            if time.time() - spawn_time > 2:
-                continue
-            sliced_obj.update()
-            sliced_obj.show(win, angle)
-        sliced_fruits = [(obj, t) for (obj, t) in sliced_fruits if time.time() - t <= 2]
-
-        # Display explosions.
-        for explosion in explosions:
-            explosion.show_explosion(win)
-        explosions = [e for e in explosions if not e.explosion_finished()]
-
-        # Display slashing effects.
-        for s in slashes:
-            pygame.draw.line(win, (255, 0, 0), s[0], s[1], s[2])
-        slashes.clear()
-
-    angle = (angle + 1) % 360
-    pygame.display.update()
-    clock.tick(30)
-
-cam.release()
-pygame.quit()
+                audio.play("game_start")
+
+            # Run however many fixed steps real time calls for, then draw the state
+            # interpolated between the last two steps.
+            with profiler.stage("simulate"):
+                steps = timestep.advance()
+                for _ in range(steps):
+                    game.step(timestep.step)
+            if steps:
+                latency.mark("simulated", time.perf_counter())
+            play_events()
+            # Particles move by the real time the last frame took (capped, so a
+            # hitch doesn't teleport them).
+            draw_game(timestep.alpha, min(clock.get_time() / 1000, 0.1))
+
+        render_queue.flush(win, profiler)
+        audio.flush()
+        if clip_recorder:
+            # Before the overlay, so clips only show the game.
+            with profiler.stage("video"):
+                clip_recorder.offer(win)
+        profiler_overlay.draw(win)
+        latency.mark("drawn", time.perf_counter())
+        with profiler.stage("display.update"):
+            pygame.display.update()
+        shown_at = time.perf_counter()
+        motion = None
+        if isinstance(cam, SyntheticSource) and hand_positions:
+            # Where the blade is says which frame it came from (see SyntheticSource).
+            motion = shown_at - cam.time_at(hand_positions[0][0] / win_width, shown_at)
+        age = latency.shown(shown_at, motion)
+        if age is not None:
+            profiler.record("motion>photon", age)
+        if governor:
+            governor.observe(time.perf_counter() - frame_started)
+        if not first_frame_shown:
+            first_frame_shown = True
+            print(f"First frame after {time.perf_counter() - startup_began:.2f} s "
+                  f"({len(assets)} images, {assets.cache_hits} from the asset cache)")
+        with profiler.stage("idle"):
+            clock.tick(args.fps)
+        profiler.end_frame()
+
+    if recorder:
+        recorder.save(args.record)
+    if telemetry:
+        end_session()  # a game quit before it was over
+        telemetry.close()
+        stats = telemetry.stats()
+        print(f"Telemetry: {stats['rows']} rows in {stats['transactions']} transactions, {stats['dropped']} dropped, "
+              f"peak queue depth {stats['peak_queue_depth']}")
+    if clip_recorder:
+        clip_recorder.close()
+        stats = clip_recorder.stats()
+        print(f"Video: {stats['written']} frames encoded, {stats['dropped']} dropped under backpressure, "
+              f"{stats['decimated']} skipped to keep {clip_recorder.fps} fps, "
+              f"peak queue depth {stats['peak_queue_depth']}")
+    ages = latency.summary()
+    if ages:
+        print(f"Frame age after capture over {ages['frames']} camera frames (ms):")
+        for stage, row in ages["stages"].items():
+            print(f"  {stage:<10} p50 {row['p50_ms']:6.1f}  p95 {row['p95_ms']:6.1f}  p99 {row['p99_ms']:6.1f}")
+        print("Motion to photon:")
+        print(latency.format_histogram())
+    if args.latency_out:
+        latency.dump(args.latency_out)
+    if args.profile_out:
+        profiler.dump(args.profile_out, pools=dict(game.pool_stats(), particles=particles.stats()),
+                      audio=audio.stats(), render=render_queue.stats(),
+                      video=clip_recorder.stats() if clip_recorder else None,
+                      quality=governor.stats() if governor else None, latency=ages)
+    capture.stop()
+    inference.close()
+    assets.shutdown()
+    cam.release()
+    pygame.quit()
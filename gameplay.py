@@ -0,0 +1,250 @@
+import random
+
+import numpy as np
+
+from collision import SweptCollider
+from entities import BOMB, CLAMP, NO_OWNER, P1, P2, EntityStore
+from pools import ArrayPool
+from profiler import FrameProfiler
+from timestep import Every
+from tracker import HandTracker
+
+# Layout of the sprite table passed to Game: three pictures per fruit (whole,
+# left half, right half) followed by the bomb.
+WATERMELON, BERRY, ORANGE, BOMB_SPRITE = 0, 3, 6, 9
+FRUITS = [WATERMELON, BERRY, ORANGE]
+# Whole fruit -> (left half, right half).
+SLICED_HALVES = {WATERMELON: (1, 2), BERRY: (4, 5), ORANGE: (7, 8)}
+
+MODES = ("classic", "duel", "multi-player")
+
+# Event kinds.
+SLICE, BOMB_HIT = 0, 1
+
+
+def is_slashing(prev_pos, curr_pos):
+    dx = curr_pos[0] - prev_pos[0]
+    dy = curr_pos[1] - prev_pos[1]
+    return (dx * dx + dy * dy) > (40 * 40)
+
+
+# -------------------------
+# Gameplay
+# -------------------------
+class Game:
+    # Spawning, movement, slicing and scoring for one game, with no drawing,
+    # sound or camera. It is driven by hand snapshots (add_hands) and fixed
+    # simulation steps (step), so a live session and a replay of it go through
+    # exactly the same code. All randomness comes from a per-game seeded RNG.
+    #
+    # Things the front end should react to (sounds, slash effects, juice) are
+    # added to the `events` pool as (kind, x, y, sprite) records with kind SLICE
+    # or BOMB_HIT and the sprite of what was hit; the caller drains it with
+    # events.clear().
+    #
+    # Everything that comes and goes during play lives in preallocated pools
+    # (see pools.py), sized so that even frenzy rarely has to grow them.
+    def __init__(self, sprites, size, spawn_multiplier=1, game_time=90, profiler=None):
+        self.width, self.height = size
+        self.profiler = profiler or FrameProfiler(enabled=False)
+        self.spawn_multiplier = spawn_multiplier
+        self.game_time = game_time
+        # Fruits and bombs of the current game (all modes), and the sliced halves.
+        self.fruits = EntityStore(sprites, capacity=64 * spawn_multiplier)
+        self.sliced_fruits = EntityStore(sprites, capacity=128 * spawn_multiplier)
+        self.collider = SweptCollider()
+        self.tracker = HandTracker()
+        self.spawn_timers = {"duel": Every(2.0), "multi-player": Every(1.0), "classic": Every(2.0)}
+        self.events = ArrayPool({"kind": np.uint8, "x": np.int32, "y": np.int32, "sprite": np.int16}, capacity=32)
+        self.explosions = ArrayPool({"x": np.float64, "y": np.float64, "start": np.float64}, capacity=16)
+        self.mode = None
+        self.reset("classic")
+
+    def reset(self, mode, seed=None, hands=()):
+        self.mode = mode
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.fruits.clear()
+        self.sliced_fruits.clear()
+        self.explosions.clear()
+        self.events.clear()
+        for timer in self.spawn_timers.values():
+            timer.reset()
+        self.score_p1, self.lives_p1 = 0, 5
+        self.score_p2, self.lives_p2 = 0, 5
+        self.score_mp, self.lives_mp = 0, 5
+        self.score_classic, self.lives_classic = 0, 5
+        self.game_over = False
+        self.sim_time = 0.0
+        self.steps = 0
+        self.angle = 0
+        self.hands = list(hands)
+        # Hands keep their IDs from the menu into the game.
+        self.tracker.reset()
+        self.tracker.update(self.hands, self.sim_time)
+        # Slash segments seen since the last simulation step.
+        self.pending_segments = []
+
+    @property
+    def remaining(self):
+        # Seconds left on the duel clock.
+        return self.game_time - int(self.sim_time)
+
+    def result(self):
+        if self.mode == "duel":
+            scores = {"p1": self.score_p1, "p2": self.score_p2}
+            lives = {"p1": self.lives_p1, "p2": self.lives_p2}
+        elif self.mode == "multi-player":
+            scores, lives = {"score": self.score_mp}, {"lives": self.lives_mp}
+        else:
+            scores, lives = {"score": self.score_classic}, {"lives": self.lives_classic}
+        return {"mode": self.mode, "seed": self.seed, "steps": self.steps,
+                "game_over": self.game_over, "scores": scores, "lives": lives}
+
+    def pool_stats(self):
+        return {name: getattr(self, name).stats()
+                for name in ("fruits", "sliced_fruits", "explosions", "events")}
+
+    def owner_of(self, track):
+        # In duel mode a hand belongs to the player on whose side it appeared.
+        if self.mode != "duel":
+            return NO_OWNER
+        return P1 if track.origin[0] < self.width // 2 else P2
+
+    def add_hands(self, positions):
+        # A new hand snapshot: every tracked fingertip that moved fast enough
+        # since it was last seen becomes a slash segment for the next step.
+        self.hands = list(positions)
+        for track in self.tracker.update(self.hands, self.sim_time):
+            if is_slashing(track.previous, track.position):
+                self.pending_segments.append((track.previous, track.position, self.owner_of(track)))
+
+    def step(self, dt):
+        # One fixed gameplay step: spawn, move, slice and expire everything.
+        if self.game_over:
+            return
+        self.sim_time += dt
+        self.steps += 1
+        if self.spawn_timers[self.mode].tick(dt):
+            self.spawn_wave()
+        self.update_fruits(self.pending_segments)
+        self.pending_segments = []
+        with self.profiler.stage("entity update"):
+            self.sliced_fruits.release(self.sliced_fruits.older_than(self.sim_time, 2))
+            self.sliced_fruits.update()
+        explosions = self.explosions
+        explosions.release(self.sim_time - explosions.start[:explosions.count] > 2)
+        self.angle = (self.angle + 1) % 360
+        if self.mode == "duel" and self.remaining <= 0:
+            self.game_over = True
+
+    def spawn_wave(self):
+        rng = self.rng
+        width, height = self.width, self.height
+        num_range = {"duel": (1, 3), "multi-player": (2, 4), "classic": (1, 2)}[self.mode]
+        num = rng.randint(*num_range) * self.spawn_multiplier
+        if self.mode == "duel":
+            is_bomb = (rng.randint(0, 3) == 0)
+            if not is_bomb:
+                fruit = FRUITS[rng.randint(0, 2)]
+            else:
+                fruit = BOMB_SPRITE
+            flags = BOMB if is_bomb else 0
+            for _ in range(num):
+                pos_p1 = rng.randint(50, width // 2 - 80)
+                pos_p2 = rng.randint(width // 2 + 50, width - 80)
+                # Each player's fruits bounce inside their own half of the screen.
+                self.fruits.spawn(pos_p1, height, fruit, u=rng.randint(15, 25), vx=rng.uniform(-2, 2),
+                                  owner=P1, flags=flags, lo=50, hi=width // 2 - 10)
+                self.fruits.spawn(pos_p2, height, fruit, u=rng.randint(15, 25), vx=rng.uniform(-2, 2),
+                                  owner=P2, flags=flags, lo=width // 2 + 10, hi=width - 50)
+        else:
+            for _ in range(num):
+                pos = rng.randint(50, width - 80)
+                is_bomb = (rng.randint(0, 3) == 0)
+                if is_bomb:
+                    self.fruits.spawn(pos, height, BOMB_SPRITE, u=rng.randint(15, 25), vx=rng.uniform(-2, 2),
+                                      flags=BOMB | CLAMP, lo=0, hi=width)
+                else:
+                    fruit = FRUITS[rng.randint(0, 2)]
+                    self.fruits.spawn(pos, height, fruit, u=rng.randint(15, 25), vx=rng.uniform(-2, 2),
+                                      flags=CLAMP, lo=0, hi=width)
+
+    def spawn_sliced_fruits(self, i):
+        fruits = self.fruits
+        halves = SLICED_HALVES.get(int(fruits.sprite[i]))
+        if halves is None:
+            return
+        x, y, u, g = fruits.x[i], fruits.y[i], fruits.u[i], fruits.g[i]
+        # Halves only bounce off the screen edges outside of duel mode.
+        walls = {} if self.mode == "duel" else dict(flags=CLAMP, lo=0, hi=self.width)
+        for dx, half in zip((-10, 10), halves):
+            self.sliced_fruits.spawn(x + dx, y, half, u=u, g=g, vx=self.rng.uniform(-2, 2),
+                                     spawn_time=self.sim_time, **walls)
+
+    def lose_life(self, owner):
+        # Returns True when losing this life ends the game.
+        if self.mode == "duel":
+            if owner == P1:
+                self.lives_p1 -= 1
+            else:
+                self.lives_p2 -= 1
+            return self.lives_p1 <= 0 or self.lives_p2 <= 0
+        elif self.mode == "multi-player":
+            self.lives_mp -= 1
+            return self.lives_mp <= 0
+        else:
+            self.lives_classic -= 1
+            return self.lives_classic <= 0
+
+    def add_point(self, owner):
+        if self.mode == "duel":
+            if owner == P1:
+                self.score_p1 += 1
+            else:
+                self.score_p2 += 1
+        elif self.mode == "multi-player":
+            self.score_mp += 1
+        else:
+            self.score_classic += 1
+
+    def update_fruits(self, segments):
+        # Moves and slices every fruit and bomb, then culls the ones that were
+        # sliced or fell off the bottom of the screen.
+        fruits = self.fruits
+        with self.profiler.stage("entity update"):
+            fruits.update()
+
+        # Test the whole fingertip path since the last camera frame, not just the
+        # current position, so fast swipes can't skip over a fruit.
+        n = fruits.count
+        with self.profiler.stage("collision"):
+            hit_by, contact = self.collider.hits(fruits, segments)
+        hit = hit_by >= 0
+
+        ended = False
+        for i in np.flatnonzero(hit).tolist():
+            x, y = int(contact[i, 0]), int(contact[i, 1])
+            if fruits.flags[i] & BOMB:
+                self.events.acquire(kind=BOMB_HIT, x=x, y=y, sprite=fruits.sprite[i])
+                self.explosions.acquire(x=fruits.x[i], y=fruits.y[i], start=self.sim_time)
+                if self.lose_life(fruits.owner[i]):
+                    ended = True
+                    break
+            else:
+                self.events.acquire(kind=SLICE, x=x, y=y, sprite=fruits.sprite[i])
+                self.add_point(fruits.owner[i])
+                self.spawn_sliced_fruits(i)
+
+        fallen = fruits.below(self.height) & ~hit
+        if not ended:
+            for i in np.flatnonzero(fallen & ((fruits.flags[:n] & BOMB) == 0)).tolist():
+                if self.lose_life(fruits.owner[i]):
+                    ended = True
+                    break
+
+        if ended:
+            self.game_over = True
+            fruits.clear()
+        else:
+            fruits.release(hit | fallen)
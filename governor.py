@@ -0,0 +1,125 @@
+import json
+import time
+
+import numpy as np
+
+# -------------------------
+# Quality Levels
+# -------------------------
+def quality_levels(base):
+    # [(name, settings)] from full quality (`base`, the command-line settings)
+    # down. Each level keeps everything the one before it gave up and gives up
+    # one more thing, cheapest-to-lose first. Settings:
+    #
+    #   landmarks        draw the MediaPipe skeleton on the camera frame
+    #   particle_budget  most live juice particles
+    #   rotation_step    degrees between cached sprite rotations
+    #   infer_scale      hand inference input scale
+    #   trail_span       seconds of blade trail
+    #   camera_scale     fraction of the camera's starting resolution
+    #   max_hands        cap on hands per frame (None = the mode's own limit)
+    steps = [
+        ("no hand landmarks", dict(landmarks=False)),
+        ("half the juice particles", dict(particle_budget=base["particle_budget"] // 2)),
+        ("coarser sprite rotation", dict(rotation_step=base["rotation_step"] * 2)),
+        ("hand inference at 3/4 size", dict(infer_scale=base["infer_scale"] * 0.75)),
+        ("shorter blade trails", dict(trail_span=base["trail_span"] / 2)),
+        ("hand inference at 1/2 size", dict(infer_scale=base["infer_scale"] * 0.5)),
+        ("camera at half resolution", dict(camera_scale=0.5)),
+        ("at most 2 hands", dict(max_hands=2)),
+        ("no juice particles", dict(particle_budget=0)),
+    ]
+    levels = [("full quality", dict(base))]
+    for name, changes in steps:
+        levels.append((name, dict(levels[-1][1], **changes)))
+    return levels
+
+
+# -------------------------
+# Quality Governor
+# -------------------------
+class QualityGovernor:
+    # Holds a target frame rate by moving one quality level at a time.
+    #
+    # observe() is fed how long each frame's work took (excluding the sleep that
+    # caps the frame rate). Once a full `window` of frames has been seen, their
+    # 90th percentile is compared with the frame budget (1 / target_fps):
+    #
+    # - above `degrade_at` of the budget, quality drops a level, at most once
+    #   every `cooldown` seconds;
+    # - below `restore_at` of the budget for `settle` seconds straight, it goes
+    #   back up a level.
+    #
+    # The gap between the two thresholds and the longer settle time are the
+    # hysteresis: a level is only restored when there is clear headroom, so the
+    # governor doesn't flap between two levels that sit either side of the
+    # budget. Every change starts a fresh window, is passed to `apply(settings)`
+    # and is logged with the measurement behind it (printed, kept in
+    # `decisions`, and appended to `log_path` as JSON lines if given).
+    def __init__(self, levels, apply, target_fps=60, window=90, degrade_at=1.0, restore_at=0.6,
+                 cooldown=2.0, settle=5.0, log_path=None, clock=time.perf_counter):
+        self.levels = levels
+        self.apply = apply
+        self.budget = 1 / target_fps
+        self.window = window
+        self.degrade_at = degrade_at
+        self.restore_at = restore_at
+        self.cooldown = cooldown
+        self.settle = settle
+        self.log_path = log_path
+        self.clock = clock
+        self.level = 0
+        self.decisions = []
+        self._samples = np.zeros(window)
+        self._count = 0
+        self._changed_at = clock()
+        self._calm_since = None
+
+    @property
+    def settings(self):
+        return self.levels[self.level][1]
+
+    def observe(self, seconds):
+        self._samples[self._count % self.window] = seconds
+        self._count += 1
+        if self._count < self.window:
+            return
+        now = self.clock()
+        p90 = float(np.percentile(self._samples, 90))
+        if p90 > self.budget * self.degrade_at:
+            self._calm_since = None
+            if self.level + 1 < len(self.levels) and now - self._changed_at >= self.cooldown:
+                self._change(self.level + 1, now, p90)
+        elif p90 < self.budget * self.restore_at:
+            if self._calm_since is None:
+                self._calm_since = now
+            elif self.level > 0 and now - max(self._calm_since, self._changed_at) >= self.settle:
+                self._change(self.level - 1, now, p90)
+        else:
+            self._calm_since = None
+
+    def _change(self, level, now, p90):
+        # Going down names what was given up; going up names what came back.
+        if level > self.level:
+            action = self.levels[level][0]
+        else:
+            action = f"back from {self.levels[self.level][0]}"
+        decision = {
+            "at": time.strftime("%Y-%m-%d %H:%M:%S"), "from": self.level, "to": level, "action": action,
+            "p90_ms": round(p90 * 1000, 2), "budget_ms": round(self.budget * 1000, 2),
+        }
+        self.level = level
+        self.apply(self.settings)
+        self._count = 0
+        self._changed_at = now
+        self._calm_since = None
+        self.decisions.append(decision)
+        print(f"Quality {decision['from']} -> {decision['to']} ({action}): "
+              f"p90 frame {decision['p90_ms']:.1f} ms vs. {decision['budget_ms']:.1f} ms budget")
+        if self.log_path:
+            with open(self.log_path, "a") as f:
+                f.write(json.dumps(dict(decision, settings=self.settings)) + "\n")
+
+    def stats(self):
+        return {"level": self.level, "name": self.levels[self.level][0], "settings": self.settings,
+                "decisions": self.decisions}
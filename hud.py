@@ -0,0 +1,87 @@
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+# -------------------------
+# Text Surface Cache
+# -------------------------
+class TextCache:
+    # Caches font.render() results keyed by (font, text, antialias, color). HUD
+    # values such as the score only change a few times per second, so almost
+    # every frame is a cache hit. The least recently used entries are dropped once
+    # more than `max_entries` strings are cached (e.g. an ever-changing timer).
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, antialias, tuple(color))
+        surface = self._cache.get(key)
+        if surface is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._cache[key] = surface
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return surface
+
+
+# -------------------------
+# Static Screen Layers
+# -------------------------
+def _runs(mask, max_gap):
+    # (start, stop) index ranges of True values, merging runs separated by fewer
+    # than `max_gap` False values.
+    idx = np.flatnonzero(mask)
+    if len(idx) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(idx) > max_gap)
+    starts = np.concatenate(([idx[0]], idx[breaks + 1]))
+    stops = np.concatenate((idx[breaks], [idx[-1]])) + 1
+    return list(zip(starts.tolist(), stops.tolist()))
+
+
+class StaticLayer:
+    # A screen overlay (menu, game-over screen) that is composed once and then
+    # redrawn from that single composed surface. `build(surface)` draws the layer
+    # onto a transparent window-sized surface; it is only called again when `key`
+    # changes, e.g. when the final scores shown on the game-over screen differ.
+    #
+    # Blitting the whole overlay would alpha-blend every empty pixel between the
+    # items, so after composing, the surface is cut into tight pieces around the
+    # drawn content and those are submitted with a single Surface.blits() call.
+    def __init__(self, size, build, max_gap=16):
+        self.size = size
+        self.build = build
+        self.max_gap = max_gap
+        self._key = object()
+        self._pieces = None
+
+    def invalidate(self):
+        self._key = object()
+
+    def _compose(self):
+        layer = pygame.Surface(self.size, pygame.SRCALPHA)
+        self.build(layer)
+        alpha = pygame.surfarray.array_alpha(layer)  # indexed [x, y]
+        pieces = []
+        for y0, y1 in _runs(alpha.any(axis=0), self.max_gap):
+            for x0, x1 in _runs(alpha[:, y0:y1].any(axis=1), self.max_gap):
+                rect = pygame.Rect(x0, y0, x1 - x0, y1 - y0)
+                pieces.append((layer.subsurface(rect).copy(), rect.topleft))
+        return pieces
+
+    def draw(self, win, key=None):
+        if self._pieces is None or key != self._key:
+            self._pieces = self._compose()
+            self._key = key
+        win.blits(self._pieces, doreturn=False)
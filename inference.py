@@ -0,0 +1,277 @@
+import cv2
+import numpy as np
+
+# How many hands MediaPipe looks for in each game mode; classic only ever uses
+# the first hand, so there is no point searching for four.
+MODE_MAX_HANDS = {"classic": 1, "duel": 4, "multi-player": 4}
+DEFAULT_MAX_HANDS = 4
+
+
+# -------------------------
+# Fingertip Prediction
+# -------------------------
+class ConstantVelocity:
+    # Extrapolates fingertips from the last two inference results. Hands are
+    # paired by detection order (as the slash test does), so when the number of
+    # hands changes the positions are simply held.
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._prev = self._last = None
+
+    def update(self, timestamp, tips):
+        self._prev = self._last
+        self._last = (timestamp, tips)
+
+    def predict(self, timestamp):
+        if self._last is None:
+            return []
+        t1, tips = self._last
+        if self._prev is None or len(self._prev[1]) != len(tips) or t1 <= self._prev[0]:
+            return tips
+        t0, before = self._prev
+        k = (timestamp - t1) / (t1 - t0)
+        return [(min(max(x + (x - px) * k, 0.0), 1.0), min(max(y + (y - py) * k, 0.0), 1.0))
+                for (x, y), (px, py) in zip(tips, before)]
+
+
+class Hold:
+    # Repeats the last inference result.
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._tips = []
+
+    def update(self, timestamp, tips):
+        self._tips = tips
+
+    def predict(self, timestamp):
+        return self._tips
+
+
+PREDICTORS = {"velocity": ConstantVelocity, "hold": Hold}
+
+
+# -------------------------
+# Inference Scheduler
+# -------------------------
+class AdaptiveInference:
+    # Decides how (and whether) MediaPipe runs on each camera frame:
+    #
+    # - scale:  run on a downscaled copy of the frame (landmarks are normalised,
+    #           so nothing needs rescaling afterwards).
+    # - roi:    once a hand is tracked, only look at the box around last frame's
+    #           landmarks, grown by `roi_margin` of its size on every side. A full
+    #           frame is searched again every `redetect_every` inferences, and
+    #           whenever the crop loses the hand, so it is still found. Only used
+    #           when looking for a single hand: a box around several hands was
+    #           less accurate than MediaPipe's own per-hand tracking on full
+    #           frames (see bench.py inference).
+    # - every:  run inference on one frame out of `every`; in between fingertips
+    #           are predicted from the last results and no landmarks are drawn.
+    #           Frames are only skipped while at least one hand is tracked.
+    #
+    # `make_hands(max_num_hands, static_image_mode)` builds a MediaPipe Hands
+    # instance; one is kept per max_num_hands value so switching game modes
+    # doesn't reload the model. Crops get their own instance in static image
+    # mode: in video mode Hands tracks from the last frame's landmarks in that
+    # frame's coordinates, which a crop that moved (or a switch between crop
+    # and full frame) would put in the wrong place. Full frames keep the
+    # tracking instance.
+    # The defaults (scale 1, no ROI, every frame) behave like calling
+    # hands.process() on the full frame.
+    def __init__(self, make_hands, tip_index, scale=1.0, roi=False, roi_margin=0.5, min_roi=0.3,
+                 redetect_every=15, every=1, predict="velocity"):
+        self.make_hands = make_hands
+        self.tip_index = tip_index
+        self.scale = scale
+        self.roi = roi
+        self.roi_margin = roi_margin
+        self.min_roi = min_roi  # smallest crop, as a fraction of each frame dimension
+        self.redetect_every = redetect_every
+        self.every = max(1, every)
+        self.predictor = PREDICTORS[predict]()
+        self._hands = {}
+        self._box = None  # normalised (x0, y0, x1, y1) of the last landmarks
+        self._since_full = 0
+        self._found = 0
+        self._resized = None
+        # Counters for the frames seen so far.
+        self.frames = 0
+        self.inferences = 0
+        self.roi_inferences = 0
+        self.skipped = 0
+
+    def hands_for(self, max_hands, crop=False):
+        hands = self._hands.get((max_hands, crop))
+        if hands is None:
+            hands = self._hands[max_hands, crop] = self.make_hands(max_hands, crop)
+        return hands
+
+    def preload(self, max_hands):
+        # Builds the models process() will use, so the first frames (or the
+        # first crop) don't wait for one to load.
+        self.hands_for(max_hands)
+        if self.roi and max_hands == 1:
+            self.hands_for(max_hands, crop=True)
+
+    def close(self):
+        for hands in self._hands.values():
+            hands.close()
+        self._hands.clear()
+
+    def _crop(self, width, height, max_hands):
+        # Pixel box to run on, or None for the whole frame.
+        if not self.roi or max_hands > 1 or self._box is None or self._since_full >= self.redetect_every:
+            return None
+        x0, y0, x1, y1 = self._box
+        grow_x = max((x1 - x0) * self.roi_margin, (self.min_roi - (x1 - x0)) / 2, 0)
+        grow_y = max((y1 - y0) * self.roi_margin, (self.min_roi - (y1 - y0)) / 2, 0)
+        box = (int(max(x0 - grow_x, 0) * width), int(max(y0 - grow_y, 0) * height),
+               int(np.ceil(min(x1 + grow_x, 1) * width)), int(np.ceil(min(y1 + grow_y, 1) * height)))
+        if box[2] - box[0] < 16 or box[3] - box[1] < 16:
+            return None
+        return box
+
+    def process(self, rgb, timestamp, max_hands=DEFAULT_MAX_HANDS):
+        # Returns (landmark lists, fingertips): the landmarks (in full-frame
+        # normalised coordinates, empty on skipped frames) and the normalised
+        # (x, y) index fingertip of every hand.
+        self.frames += 1
+        if self.frames % self.every != 1 % self.every and self._found:
+            self.skipped += 1
+            return [], self.predictor.predict(timestamp)
+
+        height, width = rgb.shape[:2]
+        box = self._crop(width, height, max_hands)
+        if box is None:
+            image = rgb
+            self._since_full = 0
+        else:
+            image = rgb[box[1]:box[3], box[0]:box[2]]
+            self._since_full += 1
+            self.roi_inferences += 1
+        if self.scale != 1.0:
+            size = (max(int(image.shape[1] * self.scale), 1), max(int(image.shape[0] * self.scale), 1))
+            shape = (size[1], size[0], 3)
+            if self._resized is None or self._resized.shape != shape:
+                self._resized = np.empty(shape, np.uint8)
+            image = cv2.resize(image, size, dst=self._resized, interpolation=cv2.INTER_AREA)
+        elif box is not None:
+            image = np.ascontiguousarray(image)
+
+        results = self.hands_for(max_hands, box is not None).process(image)
+        self.inferences += 1
+        landmarks = list(results.multi_hand_landmarks or [])
+
+        if box is not None:
+            # Map crop-relative landmarks back to the full frame.
+            sx, sy = (box[2] - box[0]) / width, (box[3] - box[1]) / height
+            ox, oy = box[0] / width, box[1] / height
+            for hand in landmarks:
+                for lm in hand.landmark:
+                    lm.x = ox + lm.x * sx
+                    lm.y = oy + lm.y * sy
+            if len(landmarks) < self._found:
+                self._since_full = self.redetect_every  # lost a hand: search everywhere next time
+
+        if landmarks:
+            xs = [lm.x for hand in landmarks for lm in hand.landmark]
+            ys = [lm.y for hand in landmarks for lm in hand.landmark]
+            self._box = (min(xs), min(ys), max(xs), max(ys))
+        else:
+            self._box = None
+            self.predictor.reset()
+        self._found = len(landmarks)
+
+        tips = [(hand.landmark[self.tip_index].x, hand.landmark[self.tip_index].y) for hand in landmarks]
+        self.predictor.update(timestamp, tips)
+        return landmarks, tips
+
+    def stats(self):
+        return {"frames": self.frames, "inferences": self.inferences,
+                "roi_inferences": self.roi_inferences, "skipped": self.skipped}
+
+
+# -------------------------
+# Synthetic Marker
+# -------------------------
+class MarkerInference:
+    # Finds the green marker of sources.SyntheticSource footage and reports it
+    # as the one fingertip, so the known motion reaches the tracker, slashes
+    # and blade like a real hand would. MediaPipe finds no hand in that
+    # footage, but `inner` (an AdaptiveInference) is still run on every frame
+    # so its cost stays in the measured pipeline. Other attributes, like the
+    # governor's `scale`, are passed through to `inner`.
+    def __init__(self, inner=None, color=(0, 255, 0)):
+        self.inner = inner
+        self._low = np.array([max(c - 60, 0) for c in color], np.uint8)
+        self._high = np.array([min(c + 60, 255) for c in color], np.uint8)
+        self._mask = None
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def process(self, rgb, timestamp, max_hands=DEFAULT_MAX_HANDS):
+        landmarks = self.inner.process(rgb, timestamp, max_hands)[0] if self.inner else []
+        height, width = rgb.shape[:2]
+        if self._mask is None or self._mask.shape != (height, width):
+            self._mask = np.empty((height, width), np.uint8)
+        cv2.inRange(rgb, self._low, self._high, dst=self._mask)
+        m = cv2.moments(self._mask, binaryImage=True)
+        if not m["m00"]:
+            return landmarks, []
+        # Centroid in pixel indices; pixel i covers [i, i + 1) of the frame.
+        return landmarks, [((m["m10"] / m["m00"] + 0.5) / width, (m["m01"] / m["m00"] + 0.5) / height)]
+
+
+# -------------------------
+# Worker Processes
+# -------------------------
+def hands_worker(worker, jobs, results, hands_options):
+    # Entry point of a PooledCapture worker process. Frames arrive in shared
+    # memory; a job is (frame_id, shm name, shape, (x0, x1) zone, max_hands,
+    # scale) and only that small tuple is pickled. `scale` downscales the zone
+    # before inference, as AdaptiveInference.scale does. The reply is (frame_id, worker, landmarks,
+    # seconds) with landmarks as a float32 (hands, 21, 3) array in full-frame
+    # normalised coordinates.
+    from multiprocessing import shared_memory
+    import time
+
+    import mediapipe as mp
+
+    hands_by_max = {}
+    attached = {}
+    results.put(("ready", worker))
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        frame_id, shm_name, shape, (x0, x1), max_hands, scale = job
+        shm = attached.get(shm_name)
+        if shm is None:
+            shm = attached[shm_name] = shared_memory.SharedMemory(name=shm_name)
+        frame = np.ndarray(shape, np.uint8, buffer=shm.buf)
+        width = shape[1]
+        image = frame if (x0, x1) == (0, width) else np.ascontiguousarray(frame[:, x0:x1])
+        if scale != 1.0:
+            size = (max(int(image.shape[1] * scale), 1), max(int(image.shape[0] * scale), 1))
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        hands = hands_by_max.get(max_hands)
+        if hands is None:
+            hands = hands_by_max[max_hands] = mp.solutions.hands.Hands(max_num_hands=max_hands, **hands_options)
+
+        start = time.perf_counter()
+        found = hands.process(image).multi_hand_landmarks or []
+        seconds = time.perf_counter() - start
+        landmarks = np.array([[(lm.x, lm.y, lm.z) for lm in hand.landmark] for hand in found],
+                             np.float32).reshape(-1, 21, 3)
+        landmarks[..., 0] = (x0 + landmarks[..., 0] * (x1 - x0)) / width
+        del image, frame
+        results.put(("result", frame_id, worker, landmarks, seconds))
+    for hands in hands_by_max.values():
+        hands.close()
+    for shm in attached.values():
+        shm.close()
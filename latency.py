@@ -0,0 +1,123 @@
+import json
+
+import numpy as np
+
+# Stages a camera frame passes on its way to the screen, in order. The first
+# four are stamped by the capture pipeline (see HandSnapshot in capture.py),
+# the rest by the game loop:
+#
+#   read        cam.read() returned it
+#   inferred    hand inference on it finished
+#   processed   its snapshot was published
+#   picked      the game loop took the snapshot
+#   simulated   a simulation step (spawns, collisions, slicing) ran with its hands
+#   drawn       the frame showing them was composed, just before display.update()
+#   shown       display.update() returned
+#
+# Every age is measured from when the frame was captured. "shown" is as close
+# to the photons as the game can see; the display's own scan-out and the
+# compositor come on top.
+STAGES = ("read", "inferred", "processed", "picked", "simulated", "drawn", "shown")
+
+
+# -------------------------
+# Motion-to-Photon Probe
+# -------------------------
+class MotionToPhoton:
+    # One row per camera frame that reached the screen, holding the frame id,
+    # its capture time and the time it reached each of STAGES (NaN for a stage
+    # it skipped, like "simulated" on the menu). The game loop opens a row with
+    # pick() when a new snapshot arrives, mark()s the stages it passes and
+    # closes it with shown(). Rows live in a preallocated ring of the last
+    # `capacity` frames, so recording is a few array writes per frame.
+    #
+    # `motion` is optional and independent of the timestamps: with footage of
+    # known motion (sources.SyntheticSource) the game loop works out, from
+    # where the blade actually is on screen, when the frame it came from was
+    # captured, and passes shown - that time to shown().
+    def __init__(self, capacity=100000, bin_ms=5, max_ms=250):
+        self.rows = np.full((capacity, 3 + len(STAGES)), np.nan)
+        self.count = 0
+        self.bins = np.arange(0, max_ms + bin_ms, bin_ms)
+        self._columns = {stage: 2 + i for i, stage in enumerate(STAGES)}
+        self._row = None
+
+    def pick(self, snapshot, now):
+        row = self._row = self.rows[self.count % len(self.rows)]
+        row[:] = np.nan
+        row[:6] = (snapshot.frame_id, snapshot.captured_at, snapshot.read_at, snapshot.inferred_at,
+                   snapshot.processed_at, now)
+
+    def mark(self, stage, now):
+        if self._row is not None:
+            self._row[self._columns[stage]] = now
+
+    def shown(self, now, motion=None):
+        # Closes the open row, if any, and returns its end-to-end age.
+        row = self._row
+        if row is None:
+            return None
+        row[self._columns["shown"]] = now
+        if motion is not None:
+            row[-1] = motion
+        self._row = None
+        self.count += 1
+        return now - row[1]
+
+    def recent(self):
+        return self.rows[: min(self.count, len(self.rows))]
+
+    def ages(self):
+        # (frames, stages) ages in milliseconds, plus the known-motion column.
+        rows = self.recent()
+        return np.hstack([(rows[:, 2:-1] - rows[:, 1:2]) * 1000, rows[:, -1:] * 1000])
+
+    def histogram(self, column=None):
+        # Counts of end-to-end ("shown") ages per `bin_ms` bin; the last bin
+        # also holds everything slower than `max_ms`.
+        ages = self.ages()[:, self._columns["shown"] - 2 if column is None else column]
+        ages = ages[~np.isnan(ages)]
+        counts, _ = np.histogram(np.minimum(ages, self.bins[-1] - 1e-9), self.bins)
+        return counts
+
+    def summary(self):
+        # {"frames", "stages": {stage: percentiles}, "histogram": {...}}; the
+        # known-motion estimate is reported as the "motion" stage when present.
+        ages = self.ages()
+        if len(ages) == 0:
+            return {}
+        stages = {}
+        for i, name in enumerate(STAGES + ("motion",)):
+            column = ages[:, i][~np.isnan(ages[:, i])]
+            if len(column) == 0:
+                continue
+            p50, p95, p99 = np.percentile(column, (50, 95, 99))
+            stages[name] = {"frames": len(column), "mean_ms": float(column.mean()), "p50_ms": float(p50),
+                            "p95_ms": float(p95), "p99_ms": float(p99), "max_ms": float(column.max())}
+        return {"frames": self.count, "stages": stages,
+                "histogram": {"bin_ms": float(self.bins[1] - self.bins[0]), "counts": self.histogram().tolist()}}
+
+    def format_histogram(self, width=40):
+        # The end-to-end histogram as text bars, skipping empty bins at either end.
+        counts = self.histogram()
+        filled = np.flatnonzero(counts)
+        if len(filled) == 0:
+            return ""
+        scale = width / counts.max()
+        lines = []
+        for i in range(filled[0], filled[-1] + 1):
+            label = f"{self.bins[i]:4.0f}-{self.bins[i + 1]:<4.0f}" if i + 2 < len(self.bins) else f"{self.bins[i]:4.0f}+   "
+            lines.append(f"  {label} ms {'#' * int(np.ceil(counts[i] * scale))} {counts[i]}")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        # Every row as CSV (ages in seconds from capture, one column per
+        # stage), or the summary and histogram as JSON when `path` ends in .json.
+        if path.lower().endswith(".json"):
+            with open(path, "w") as f:
+                json.dump(self.summary(), f, indent=2)
+            return
+        rows = self.recent()
+        table = np.hstack([rows[:, :1], rows[:, 2:-1] - rows[:, 1:2], rows[:, -1:]])
+        np.savetxt(path, table, fmt=["%d"] + ["%.6f"] * (len(STAGES) + 1), delimiter=",",
+                   header=",".join(["frame_id"] + [f"{s}_s" for s in STAGES] + ["motion_s"]), comments="")
@@ -0,0 +1,114 @@
+import numpy as np
+import pygame
+
+from gameplay import BERRY, BOMB_SPRITE, ORANGE, WATERMELON
+from pools import ArrayPool
+
+# Juice colour per whole-fruit sprite; bombs throw sparks.
+JUICE_COLORS = {
+    WATERMELON: (225, 35, 60),
+    BERRY: (125, 35, 170),
+    ORANGE: (255, 150, 20),
+    BOMB_SPRITE: (255, 220, 90),
+}
+
+_FIELDS = {
+    "x": np.float32,
+    "y": np.float32,
+    "vx": np.float32,          # pixels per second
+    "vy": np.float32,
+    "age": np.float32,         # seconds
+    "life": np.float32,
+    "color": np.uint8,         # index into ParticleSystem.palette
+}
+
+
+# -------------------------
+# Juice Particles
+# -------------------------
+class ParticleSystem(ArrayPool):
+    # Juice splashes as struct-of-arrays particles (see pools.py): a burst is
+    # one acquire_many() with vectorised random velocities, update() integrates,
+    # ages and culls every particle in a few array ops, and draw() writes them
+    # straight into the target's pixels through surfarray, one fancy-indexed
+    # assignment per dot offset instead of a draw call per particle.
+    #
+    # `budget` is a hard cap on live particles, so a frenzy swipe through
+    # dozens of fruits can't add more work per frame than the budget allows:
+    # bursts are cut short once it is reached. Particles are purely cosmetic,
+    # use their own RNG and run on render time, so they never touch gameplay
+    # or replays.
+    def __init__(self, size, budget=2000, per_burst=24, gravity=1400.0, seed=None):
+        self.width, self.height = size
+        self.budget = budget
+        self.per_burst = per_burst
+        self.gravity = gravity
+        self.rng = np.random.default_rng(seed)
+        self.palette = list(JUICE_COLORS.values())
+        self._color_index = {sprite: i for i, sprite in enumerate(JUICE_COLORS)}
+        self._mapped = None
+        self.spawned = 0
+        self.trimmed = 0  # particles a burst wanted but the budget refused
+        super().__init__(_FIELDS, capacity=budget)
+
+    def burst(self, x, y, sprite, count=None):
+        count = self.per_burst if count is None else count
+        n = min(count, self.budget - self.count)
+        self.trimmed += count - n
+        if n <= 0:
+            return
+        rng = self.rng
+        angle = rng.uniform(0, 2 * np.pi, n)
+        speed = rng.uniform(120, 520, n)
+        self.acquire_many(
+            n, x=x, y=y,
+            vx=np.cos(angle) * speed,
+            vy=np.sin(angle) * speed - 250,  # thrown up a little before falling
+            age=0, life=rng.uniform(0.3, 0.7, n),
+            color=self._color_index.get(sprite, self._color_index[WATERMELON]))
+        self.spawned += n
+
+    def update(self, dt):
+        n = self.count
+        if n == 0:
+            return
+        vy = self.vy[:n]
+        vy += self.gravity * dt
+        self.x[:n] += self.vx[:n] * dt
+        self.y[:n] += vy * dt
+        age = self.age[:n]
+        age += dt
+        x = self.x[:n]
+        self.release((age >= self.life[:n]) | (x < 0) | (x >= self.width) | (self.y[:n] >= self.height))
+
+    def draw(self, surface):
+        # Each particle is a square that shrinks from 3x3 to 1x1 pixels as it
+        # ages. Particles above the top of the screen are kept but not drawn.
+        n = self.count
+        if n == 0:
+            return
+        w, h = surface.get_size()
+        x = self.x[:n].astype(np.intp)
+        y = self.y[:n].astype(np.intp)
+        dots = 3 - (2.99 * self.age[:n] / self.life[:n]).astype(np.intp)
+        shown = (x >= 0) & (y >= 0) & (x < w - 2) & (y < h - 2)
+        x, y, dots, color = x[shown], y[shown], dots[shown], self.color[:n][shown]
+        if surface.get_bytesize() == 4:
+            if self._mapped is None:
+                self._mapped = np.array([surface.map_rgb(c) for c in self.palette], np.uint32)
+            pixels = pygame.surfarray.pixels2d(surface)
+            colors = self._mapped[color]
+        else:
+            pixels = pygame.surfarray.pixels3d(surface)
+            colors = np.array(self.palette, np.uint8)[color]
+        for dx in range(3):
+            for dy in range(3):
+                if max(dx, dy) == 0:
+                    pixels[x, y] = colors
+                else:
+                    big = dots > max(dx, dy)
+                    pixels[x[big] + dx, y[big] + dy] = colors[big]
+        del pixels  # unlock the surface
+
+    def stats(self):
+        return dict(super().stats(), budget=self.budget, spawned=self.spawned, trimmed=self.trimmed)
@@ -0,0 +1,102 @@
+import numpy as np
+
+# -------------------------
+# Array-Backed Pools
+# -------------------------
+class ArrayPool:
+    # Preallocated struct-of-arrays records: every field in `fields` (name ->
+    # dtype) is a NumPy array and live records occupy indices [0, count).
+    # acquire() hands out the next free slot and release() returns every slot
+    # where a mask is True by swapping survivors down from the end, so neither
+    # allocates a Python object per record and the hot loop produces no garbage
+    # for the GC to chase. When full the arrays double in size (counted in
+    # `grows`); pick `capacity` so that doesn't happen during play. Record order
+    # is not stable across releases.
+    #
+    # Fields of the same dtype are stored as rows of one 2-D array, so release()
+    # moves one block per dtype however many fields there are; at the few dozen
+    # records of normal play that per-call overhead is most of the cost.
+    def __init__(self, fields, capacity=64):
+        self._fields = dict(fields)
+        groups = {}
+        self._rows = {}
+        for name, dtype in self._fields.items():
+            rows = groups.setdefault(np.dtype(dtype), [])
+            self._rows[name] = (np.dtype(dtype), len(rows))
+            rows.append(name)
+        self._blocks = {dtype: np.zeros((len(rows), 0), dtype) for dtype, rows in groups.items()}
+        self.count = 0
+        self.capacity = 0
+        self.peak = 0
+        self.acquired = 0
+        self.released = 0
+        self.grows = 0
+        self._bind()
+        self._grow(capacity)
+        self.grows = 0
+
+    def __len__(self):
+        return self.count
+
+    def _bind(self):
+        # Points each field attribute at its row of the current blocks.
+        for name, (dtype, row) in self._rows.items():
+            setattr(self, name, self._blocks[dtype][row])
+
+    def _grow(self, capacity):
+        for dtype, old in self._blocks.items():
+            new = np.zeros((len(old), capacity), dtype)
+            new[:, : self.count] = old[:, : self.count]
+            self._blocks[dtype] = new
+        self._bind()
+        self.capacity = capacity
+        self.grows += 1
+
+    def acquire(self, **values):
+        # Index of a fresh record, with the given fields set.
+        if self.count == self.capacity:
+            self._grow(max(self.capacity * 2, 1))
+        i = self.count
+        for name, value in values.items():
+            getattr(self, name)[i] = value
+        self.count += 1
+        self.acquired += 1
+        if self.count > self.peak:
+            self.peak = self.count
+        return i
+
+    def acquire_many(self, n, **values):
+        # Slice of `n` fresh records, with the given fields set (scalars or
+        # arrays of length n).
+        if self.count + n > self.capacity:
+            self._grow(max(self.capacity * 2, self.count + n))
+        block = slice(self.count, self.count + n)
+        for name, value in values.items():
+            getattr(self, name)[block] = value
+        self.count += n
+        self.acquired += n
+        if self.count > self.peak:
+            self.peak = self.count
+        return block
+
+    def release(self, mask):
+        # Return every record where `mask` (length == count) is True.
+        n = self.count
+        keep = n - int(np.count_nonzero(mask))
+        if keep == n:
+            return
+        holes = np.flatnonzero(mask[:keep])
+        movers = np.flatnonzero(~mask[keep:n]) + keep
+        if len(holes):
+            for block in self._blocks.values():
+                block[:, holes] = block[:, movers]
+        self.count = keep
+        self.released += n - keep
+
+    def clear(self):
+        self.released += self.count
+        self.count = 0
+
+    def stats(self):
+        return {"live": self.count, "capacity": self.capacity, "peak": self.peak,
+                "acquired": self.acquired, "released": self.released, "grows": self.grows}
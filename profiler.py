@@ -0,0 +1,215 @@
+import csv
+import json
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pygame
+
+# -------------------------
+# Frame Profiler
+# -------------------------
+class _Samples:
+    # Fixed-size ring of the most recent timings (seconds) of one stage.
+    def __init__(self, window):
+        self.values = np.zeros(window)
+        self.count = 0  # total samples ever recorded
+
+    def add(self, seconds):
+        self.values[self.count % len(self.values)] = seconds
+        self.count += 1
+
+    def recent(self):
+        return self.values[: min(self.count, len(self.values))]
+
+
+class FrameProfiler:
+    # Rolling per-stage timings of the main loop.
+    #
+    #     with profiler.stage("background"):
+    #         background.upload(frame, win)
+    #     ...
+    #     profiler.end_frame()
+    #
+    # stage() adds to the current frame's total for that stage (a stage entered
+    # several times per frame, like one per simulation step, is summed), and
+    # end_frame() files every stage seen this frame as one sample. record() files
+    # a sample directly; the capture threads use it for work that doesn't happen
+    # once per rendered frame. Only the last `window` samples of each stage are
+    # kept, and percentiles are computed on demand, so the hot path is a couple
+    # of perf_counter() calls and a dict update. Each of `listeners` is called
+    # with the frame's {stage: seconds} at end_frame(), for totals that need
+    # more than the rolling window (see StageTally).
+    def __init__(self, window=300, enabled=True):
+        self.window = window
+        self.enabled = enabled
+        self.frames = 0
+        self.listeners = []
+        self._samples = {}
+        self._frame = {}
+        self._frame_start = None
+
+    def _series(self, name):
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = self._samples[name] = _Samples(self.window)
+        return samples
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._frame[name] = self._frame.get(name, 0.0) + time.perf_counter() - start
+
+    def record(self, name, seconds):
+        # Safe to call from another thread as long as each stage name is only
+        # ever recorded from one thread.
+        if self.enabled:
+            self._series(name).add(seconds)
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self._frame["frame"] = now - self._frame_start
+        self._frame_start = now
+        for name, seconds in self._frame.items():
+            self._series(name).add(seconds)
+        for listener in self.listeners:
+            listener(self._frame)
+        self._frame.clear()
+        self.frames += 1
+
+    def summary(self):
+        # {stage: {"samples", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"}}
+        # over each stage's recent window, in first-seen order.
+        stats = {}
+        for name, samples in list(self._samples.items()):
+            recent = samples.recent() * 1000
+            if len(recent) == 0:
+                continue
+            p50, p95, p99 = np.percentile(recent, (50, 95, 99))
+            stats[name] = {
+                "samples": samples.count,
+                "mean_ms": float(recent.mean()),
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+                "max_ms": float(recent.max()),
+            }
+        return stats
+
+    def dump(self, path, **extra):
+        # Writes the summary as JSON, or as CSV when `path` ends in .csv. Any
+        # `extra` sections (e.g. pool sizes) only go into the JSON.
+        stats = self.summary()
+        if path.lower().endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["stage", "samples", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+                for name, row in stats.items():
+                    writer.writerow([name] + [round(v, 4) if isinstance(v, float) else v for v in row.values()])
+        else:
+            with open(path, "w") as f:
+                json.dump(dict({"frames": self.frames, "window": self.window, "stages": stats}, **extra), f, indent=2)
+
+
+# -------------------------
+# Stage Tally
+# -------------------------
+class StageTally:
+    # Per-stage frame times over a stretch of play of any length (one game,
+    # say), as histograms of `resolution`-second bins up to `limit` seconds, so
+    # memory and cost per frame don't grow with its length. Feed it frames
+    # with add_frame() (a FrameProfiler listener) and start over with reset().
+    # Percentiles are bin centres, so they are accurate to `resolution`; the
+    # mean and max are exact.
+    def __init__(self, resolution=0.0001, limit=0.25):
+        self.resolution = resolution
+        self.bins = int(limit / resolution)
+        self.reset()
+
+    def reset(self):
+        self._counts = {}
+        self._sums = {}
+        self._maxes = {}
+
+    def add_frame(self, stages):
+        for name, seconds in stages.items():
+            counts = self._counts.get(name)
+            if counts is None:
+                counts = self._counts[name] = np.zeros(self.bins + 1, np.int64)
+                self._sums[name] = self._maxes[name] = 0.0
+            counts[min(int(seconds / self.resolution), self.bins)] += 1
+            self._sums[name] += seconds
+            if seconds > self._maxes[name]:
+                self._maxes[name] = seconds
+
+    def summary(self):
+        # Same layout as FrameProfiler.summary(), over everything added.
+        stats = {}
+        for name, counts in self._counts.items():
+            samples = int(counts.sum())
+            cumulative = np.cumsum(counts)
+            p50, p95, p99 = ((np.searchsorted(cumulative, samples * q) + 0.5) * self.resolution * 1000
+                             for q in (0.5, 0.95, 0.99))
+            stats[name] = {
+                "samples": samples,
+                "mean_ms": float(self._sums[name] * 1000 / samples),
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+                "max_ms": float(self._maxes[name] * 1000),
+            }
+        return stats
+
+
+# -------------------------
+# On-Screen Overlay
+# -------------------------
+class ProfilerOverlay:
+    # Semi-transparent table of p50/p95/p99 per stage in the top-left corner.
+    # Percentiles are recomputed and the table re-rendered only every `refresh`
+    # seconds; in between the same surface is blitted.
+    def __init__(self, profiler, font, refresh=0.5, visible=False):
+        self.profiler = profiler
+        self.font = font
+        self.refresh = refresh
+        self.visible = visible
+        self._surface = None
+        self._built_at = 0.0
+
+    def toggle(self):
+        self.visible = not self.visible
+        self._surface = None
+
+    def _build(self):
+        stats = self.profiler.summary()
+        frame = stats.get("frame")
+        fps = 1000 / frame["p50_ms"] if frame and frame["p50_ms"] > 0 else 0
+        lines = [f"{'stage':<14}{'p50':>7}{'p95':>7}{'p99':>7}  ms   ({fps:.0f} fps)"]
+        for name, row in stats.items():
+            lines.append(f"{name[:14]:<14}{row['p50_ms']:7.2f}{row['p95_ms']:7.2f}{row['p99_ms']:7.2f}")
+        rendered = [self.font.render(line, True, (255, 255, 255)) for line in lines]
+        line_height = self.font.get_linesize()
+        width = max(s.get_width() for s in rendered) + 16
+        surface = pygame.Surface((width, line_height * len(rendered) + 12), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 160))
+        for i, s in enumerate(rendered):
+            surface.blit(s, (8, 6 + i * line_height))
+        return surface
+
+    def draw(self, win, pos=(10, 80)):
+        if not self.visible:
+            return
+        now = time.perf_counter()
+        if self._surface is None or now - self._built_at >= self.refresh:
+            self._surface = self._build()
+            self._built_at = now
+        win.blit(self._surface, pos)
@@ -0,0 +1,86 @@
+import numpy as np
+
+# Layers of a frame on top of the camera background, bottom to top.
+SPRITES, SLICED, EFFECTS, TRAILS, PARTICLES, HUD, CURSOR = range(7)
+LAYER_NAMES = ("sprites", "sliced", "effects", "trails", "particles", "hud", "cursor")
+
+
+# -------------------------
+# Render Queue
+# -------------------------
+class RenderQueue:
+    # Collects everything drawn over the camera background while the frame is
+    # being worked out, and draws it in one go afterwards with flush():
+    #
+    #     queue.blit(HUD, score_text, (20, 10))
+    #     queue.call(TRAILS, trails.draw, tracks, now, owner_of)
+    #     ...
+    #     queue.flush(win)
+    #
+    # Layers are drawn in order (LAYER_NAMES), so what ends up on top no longer
+    # depends on which part of the loop happened to draw last. Each layer's
+    # sprites go to the target in a single Surface.blits() call; call() queues
+    # drawing that isn't a blit (polygons, pixel writes), which runs with the
+    # target as its first argument just before the layer's sprites, so sprites
+    # such as HUD text stay on top of lines drawn in the same layer.
+    #
+    # cull() finds which of a whole array of sprites are on screen at all, so
+    # the ones entirely outside `size` cost neither a rotation lookup nor a
+    # queue entry; sprites partly on screen are clipped by SDL as usual. The
+    # lists are reused from frame to frame.
+    def __init__(self, size):
+        self.width, self.height = size
+        self._blits = [[] for _ in LAYER_NAMES]
+        self._calls = [[] for _ in LAYER_NAMES]
+        self.queued = 0
+        self.culled = 0
+        self.batches = 0
+        self.frames = 0
+
+    def cull(self, x, y, w, h):
+        # Boolean mask of the (w, h) boxes with top-left corners at the arrays
+        # `x`, `y` that overlap the screen. Counts the rest in `culled`.
+        shown = (x < self.width) & (y < self.height) & (x + w > 0) & (y + h > 0)
+        self.culled += len(shown) - int(np.count_nonzero(shown))
+        return shown
+
+    def blit(self, layer, surface, dest):
+        # `dest` is the top-left corner, as for Surface.blit().
+        self._blits[layer].append((surface, dest))
+        self.queued += 1
+
+    def blit_centered(self, layer, surface, x, y):
+        self.blit(layer, surface, (x - surface.get_width() // 2, y - surface.get_height() // 2))
+
+    def call(self, layer, draw, *args):
+        self._calls[layer].append((draw, args))
+
+    def flush(self, target, profiler=None):
+        # Draws and empties every layer. With a FrameProfiler, each layer's time
+        # is recorded under its name.
+        for layer, (blits, calls) in enumerate(zip(self._blits, self._calls)):
+            if not blits and not calls:
+                continue
+            if profiler is None:
+                self._draw(target, blits, calls)
+            else:
+                with profiler.stage(LAYER_NAMES[layer]):
+                    self._draw(target, blits, calls)
+        self.frames += 1
+
+    def _draw(self, target, blits, calls):
+        for draw, args in calls:
+            draw(target, *args)
+        calls.clear()
+        if blits:
+            target.blits(blits, doreturn=False)
+            blits.clear()
+            self.batches += 1
+
+    def clear(self):
+        for blits, calls in zip(self._blits, self._calls):
+            blits.clear()
+            calls.clear()
+
+    def stats(self):
+        return {"frames": self.frames, "queued": self.queued, "culled": self.culled, "batches": self.batches}
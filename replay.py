@@ -0,0 +1,97 @@
+import json
+import time
+
+import numpy as np
+
+# -------------------------
+# Session Recording
+# -------------------------
+class Recorder:
+    # Records everything needed to replay one game exactly: the mode, the RNG
+    # seed, the fingertips at the moment the game started, and every hand
+    # snapshot together with the simulation step it arrived before. Positions
+    # are stored as int16 pairs in a compressed .npz, so a 90 s game is a few KiB.
+    def __init__(self, game, difficulty="normal", step=1 / 30):
+        self.game = game
+        self.meta = {
+            "version": 1,
+            "mode": game.mode,
+            "seed": game.seed,
+            "difficulty": difficulty,
+            "step": step,
+            "size": [game.width, game.height],
+            "initial_hands": [list(map(int, p)) for p in game.hands],
+        }
+        self._steps = []
+        self._counts = []
+        self._xy = []
+
+    def hands(self, positions):
+        # Call with every new snapshot, just before passing it to game.add_hands().
+        self._steps.append(self.game.steps)
+        self._counts.append(len(positions))
+        for x, y in positions:
+            self._xy.append((x, y))
+
+    def save(self, path):
+        meta = dict(self.meta, result=self.game.result())
+        np.savez_compressed(
+            path,
+            meta=np.array(json.dumps(meta)),
+            steps=np.array(self._steps, np.int32),
+            counts=np.array(self._counts, np.uint8),
+            xy=np.array(self._xy, np.int16).reshape(-1, 2),
+        )
+
+
+class Recording:
+    def __init__(self, meta, steps, counts, xy):
+        self.meta = meta
+        self.steps = steps
+        self.counts = counts
+        self.xy = xy
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(json.loads(str(data["meta"])), data["steps"], data["counts"], data["xy"])
+
+    def snapshots(self):
+        # (step, positions) for every recorded snapshot, in arrival order.
+        ends = np.cumsum(self.counts)
+        starts = ends - self.counts
+        for step, start, end in zip(self.steps.tolist(), starts.tolist(), ends.tolist()):
+            yield step, [tuple(p) for p in self.xy[start:end].tolist()]
+
+
+# -------------------------
+# Replay
+# -------------------------
+def replay(recording, game, on_step=None):
+    # Feeds the recorded snapshots through `game` step by step, as fast as
+    # possible. `on_step(game)` runs after every step (e.g. to draw it) and should
+    # drain game.events itself; otherwise they are discarded. Returns the final
+    # game.result() plus timing.
+    meta = recording.meta
+    game.reset(meta["mode"], seed=meta["seed"], hands=[tuple(p) for p in meta["initial_hands"]])
+    total = meta["result"]["steps"]
+    dt = meta["step"]
+    snapshots = recording.snapshots()
+    pending = next(snapshots, None)
+
+    start = time.perf_counter()
+    while game.steps < total and not game.game_over:
+        while pending is not None and pending[0] <= game.steps:
+            game.add_hands(pending[1])
+            pending = next(snapshots, None)
+        game.step(dt)
+        if on_step is not None:
+            on_step(game)
+        game.events.clear()
+    elapsed = time.perf_counter() - start
+
+    result = game.result()
+    result["seconds"] = elapsed
+    result["steps_per_second"] = game.steps / elapsed if elapsed > 0 else float("inf")
+    result["matches"] = all(result[k] == meta["result"][k] for k in ("steps", "game_over", "scores", "lives"))
+    return result
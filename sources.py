@@ -0,0 +1,265 @@
+import glob
+import math
+import os
+import time
+
+import cv2
+import numpy as np
+
+# -------------------------
+# Video Sources
+# -------------------------
+# Everything the capture pipeline reads frames from. A source has the same
+# read() / set() / get() / release() methods as cv2.VideoCapture, plus
+# frame_age(): how long before read() returned the frame it returned was
+# actually captured (0 when the source can't tell).
+
+
+class CameraSource:
+    # A webcam opened for low latency. OpenCV's defaults leave the driver at
+    # its default mode, often YUYV, whose bandwidth caps 720p at 5-10 fps on
+    # USB 2, with several frames of internal buffering, so read() can return a
+    # frame that is already 100 ms old. This asks for:
+    #
+    # - `fourcc` (MJPG by default): compressed frames, so full frame rate at
+    #   higher resolutions;
+    # - `size` and `fps`, when given;
+    # - `buffer_size` frames of driver buffering (1 = always the newest).
+    #
+    # Drivers are free to ignore any of these; settings() reports what the
+    # camera actually agreed to. On V4L2 (Linux), frames are stamped on the
+    # monotonic clock and frame_age() is how long the frame sat in the driver
+    # before read() picked it up. Other backends report CAP_PROP_POS_MSEC on
+    # clocks of their own, or as a position in the stream, so there it is 0.
+    def __init__(self, index=0, size=None, fps=None, fourcc="MJPG", buffer_size=1):
+        self.cap = cv2.VideoCapture(index)
+        # FOURCC first: some drivers only offer a size or rate in one format.
+        if fourcc:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        if size:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+        if fps:
+            self.cap.set(cv2.CAP_PROP_FPS, fps)
+        if buffer_size:
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+        self._age = 0.0
+        self._stamped = self.cap.isOpened() and self.cap.getBackendName() == "V4L2"
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        ret, frame = self.cap.read()
+        self._age = 0.0
+        if ret and self._stamped:
+            stamp = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000
+            if stamp > 0:
+                self._age = max(time.monotonic() - stamp, 0.0)
+        return ret, frame
+
+    def frame_age(self):
+        return self._age
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def settings(self):
+        code = int(self.cap.get(cv2.CAP_PROP_FOURCC))
+        fourcc = "".join(chr((code >> 8 * i) & 0xFF) for i in range(4)) if code else "?"
+        return {"size": (int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))),
+                "fps": self.cap.get(cv2.CAP_PROP_FPS), "fourcc": fourcc,
+                "buffer_size": int(self.cap.get(cv2.CAP_PROP_BUFFERSIZE))}
+
+    def release(self):
+        self.cap.release()
+
+
+class _PacedSource:
+    # Hands out pre-recorded frames no faster than `fps`, like a camera would,
+    # without ever skipping one, so the same footage gives the same frames to
+    # the pipeline on every run. With `loop` the footage repeats. frame_age()
+    # is how far behind schedule the frame was read (0 while keeping up).
+    # set(CAP_PROP_FRAME_WIDTH / HEIGHT) resizes the frames, standing in for a
+    # camera switching modes.
+    #
+    # Subclasses provide the footage through the three methods below.
+    def __init__(self, fps, loop=False, size=None):
+        self.fps = fps
+        self.loop = loop
+        self.size = size
+        self.frames_read = 0
+        self._started = None
+        self._age = 0.0
+
+    def _next(self):
+        # The next frame (BGR, as cv2.VideoCapture gives), or None at the end.
+        raise NotImplementedError
+
+    def _rewind(self):
+        # Back to the first frame, for `loop`.
+        raise NotImplementedError
+
+    def _native_size(self):
+        # (width, height) of the footage before any set() resizing.
+        raise NotImplementedError
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        frame = self._next()
+        if frame is None and self.loop and self.frames_read:
+            self._rewind()
+            frame = self._next()
+        if frame is None:
+            return False, None
+        now = time.perf_counter()
+        if self._started is None:
+            self._started = now
+        due = self._started + self.frames_read / self.fps
+        if now < due:
+            time.sleep(due - now)
+        self._age = max(now - due, 0.0)
+        self.frames_read += 1
+        if self.size and (frame.shape[1], frame.shape[0]) != self.size:
+            frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        return True, frame
+
+    def frame_age(self):
+        return self._age
+
+    def set(self, prop, value):
+        if prop in (cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT):
+            w, h = self.size or self._native_size()
+            self.size = (int(value), h) if prop == cv2.CAP_PROP_FRAME_WIDTH else (w, int(value))
+            return True
+        return False
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop in (cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT):
+            w, h = self.size or self._native_size()
+            return w if prop == cv2.CAP_PROP_FRAME_WIDTH else h
+        return 0
+
+    def release(self):
+        pass
+
+
+class FileSource(_PacedSource):
+    # A video file, at its own frame rate unless `fps` is given.
+    def __init__(self, path, fps=None, loop=False, size=None):
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise ValueError(f"can't open video {path}")
+        super().__init__(fps or self.cap.get(cv2.CAP_PROP_FPS) or 30.0, loop, size)
+
+    def _next(self):
+        ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def _rewind(self):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def _native_size(self):
+        return int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageSequenceSource(_PacedSource):
+    # Numbered stills (a directory, or a glob such as "frames/*.png"), read
+    # in name order at `fps`.
+    def __init__(self, pattern, fps=30.0, loop=False, size=None):
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "*")
+        self.paths = sorted(p for p in glob.glob(pattern)
+                            if os.path.splitext(p)[1].lower() in (".png", ".jpg", ".jpeg", ".bmp"))
+        if not self.paths:
+            raise ValueError(f"no images match {pattern}")
+        self._index = 0
+        super().__init__(fps, loop, size)
+
+    def _next(self):
+        if self._index >= len(self.paths):
+            return None
+        frame = cv2.imread(self.paths[self._index])
+        self._index += 1
+        return frame
+
+    def _rewind(self):
+        self._index = 0
+
+    def _native_size(self):
+        frame = cv2.imread(self.paths[0])
+        return frame.shape[1], frame.shape[0]
+
+
+class SyntheticSource(_PacedSource):
+    # Generated footage with known motion, for measuring latency without a
+    # hand in front of a camera. A green marker (MARKER_COLOR, which nothing
+    # else in the frame uses) sweeps left to right across the frame once every
+    # `period` seconds while bobbing up and down; frame k shows it where the
+    # path is at k / fps. time_at() inverts the path: given where the marker
+    # was found in the mirrored image the game shows, it returns when that
+    # frame was due, independently of any timestamp the pipeline carried.
+    MARKER_COLOR = (0, 255, 0)  # BGR, the same in RGB
+
+    def __init__(self, fps=30.0, size=(640, 480), period=2.0, radius=14):
+        super().__init__(fps, loop=False, size=None)
+        self.width, self.height = size or (640, 480)
+        self.period = period
+        self.radius = radius
+        # A dim grid, so the background isn't a flat colour.
+        self._background = np.full((self.height, self.width, 3), 40, np.uint8)
+        self._background[::40] = 70
+        self._background[:, ::40] = 70
+
+    def path(self, t):
+        # Normalised (x, y) of the marker, in camera (unmirrored) coordinates,
+        # `t` seconds into the footage.
+        phase = (t / self.period) % 1
+        return 0.1 + 0.8 * phase, 0.5 + 0.25 * math.sin(2 * math.pi * phase)
+
+    def _next(self):
+        # A new array every frame, as a camera gives: the capture thread may
+        # still hold the last one.
+        x, y = self.path(self.frames_read / self.fps)
+        frame = self._background.copy()
+        # Sub-pixel centre (4 fractional bits), pixel i covering [i, i + 1).
+        centre = (round((x * self.width - 0.5) * 16), round((y * self.height - 0.5) * 16))
+        cv2.circle(frame, centre, self.radius * 16, self.MARKER_COLOR, -1, cv2.LINE_AA, shift=4)
+        return frame
+
+    def _native_size(self):
+        return self.width, self.height
+
+    def set(self, prop, value):
+        return False  # always generated at its own size
+
+    def time_at(self, x, now):
+        # perf_counter() time at which the most recent frame (at or before
+        # `now`) showing the marker at mirrored normalised x was due.
+        if self._started is None:
+            return None
+        phase = min(max((1 - x - 0.1) / 0.8, 0.0), 1.0) * self.period
+        return self._started + phase + self.period * math.floor((now - self._started - phase) / self.period)
+
+
+def open_source(spec="0", size=None, fps=None, fourcc="MJPG", buffer_size=1, loop=False):
+    # A camera index ("0"), "synthetic" (see SyntheticSource), a directory or
+    # glob of images, or a video file.
+    if spec == "synthetic":
+        return SyntheticSource(fps or 30.0, size)
+    if spec.isdigit():
+        return CameraSource(int(spec), size, fps, fourcc, buffer_size)
+    if os.path.isdir(spec) or glob.has_magic(spec):
+        return ImageSequenceSource(spec, fps or 30.0, loop, size)
+    return FileSource(spec, fps, loop, size)
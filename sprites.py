@@ -0,0 +1,76 @@
+from collections import OrderedDict
+
+import pygame
+
+# -------------------------
+# Rotated Sprite Cache
+# -------------------------
+class RotationCache:
+    # Caches pygame.transform.rotate results per (sprite, quantized angle).
+    #
+    # Angles are snapped to multiples of `step` degrees, so with the default 4 degree
+    # step every sprite has at most 90 distinct rotations. Entries are filled lazily
+    # (or up front with warm()) and the least recently used ones are evicted once
+    # the cached surfaces exceed `max_bytes`.
+    def __init__(self, step=4, max_bytes=64 * 1024 * 1024):
+        self.step = step
+        self.max_bytes = max_bytes
+        self._cache = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def set_step(self, step):
+        if step != self.step:
+            self.step = step
+            self.clear()
+
+    def clear(self):
+        self._cache.clear()
+        self._bytes = 0
+
+    def _quantize(self, angle):
+        return int(round(angle / self.step)) % max(1, int(round(360 / self.step)))
+
+    def get(self, pic, angle):
+        key = (pic, self._quantize(angle))
+        rotated = self._cache.get(key)
+        if rotated is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return rotated
+        self.misses += 1
+        rotated = pygame.transform.rotate(pic, key[1] * self.step)
+        self._cache[key] = rotated
+        self._bytes += rotated.get_pitch() * rotated.get_height()
+        while self._bytes > self.max_bytes and len(self._cache) > 1:
+            _, evicted = self._cache.popitem(last=False)
+            self._bytes -= evicted.get_pitch() * evicted.get_height()
+        return rotated
+
+    def warm(self, pics):
+        # Pre-render every angle of every sprite (stops early at the memory cap).
+        for pic in pics:
+            for q in range(int(round(360 / self.step))):
+                self.get(pic, q * self.step)
+                if self._bytes >= self.max_bytes:
+                    return
+
+    def place(self, pic, angle, x, y):
+        # (rotated surface, top-left) for `pic` drawn with its top-left at
+        # (x, y) unrotated. Rotated surfaces are larger than the original, so
+        # the sprite's centre stays fixed instead of its top-left corner.
+        rotated = self.get(pic, angle)
+        cx = x + pic.get_width() / 2
+        cy = y + pic.get_height() / 2
+        return rotated, (cx - rotated.get_width() / 2, cy - rotated.get_height() / 2)
+
+    def blit(self, win, pic, angle, x, y):
+        win.blit(*self.place(pic, angle, x, y))
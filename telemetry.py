@@ -0,0 +1,179 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    started_at REAL,      -- Unix time
+    ended_at REAL,
+    mode TEXT,
+    difficulty TEXT,
+    seed INTEGER,
+    steps INTEGER,
+    game_over INTEGER,
+    score INTEGER,        -- best single score, what leaderboards rank by
+    scores TEXT,          -- JSON, as Game.result()
+    lives TEXT
+);
+CREATE INDEX IF NOT EXISTS sessions_by_score ON sessions (mode, score DESC);
+CREATE TABLE IF NOT EXISTS slices (
+    session TEXT,
+    sim_time REAL,
+    kind INTEGER,         -- gameplay.SLICE or BOMB_HIT
+    x INTEGER,
+    y INTEGER,
+    sprite INTEGER
+);
+CREATE TABLE IF NOT EXISTS frame_stats (
+    session TEXT,
+    stage TEXT,
+    samples INTEGER,
+    mean_ms REAL,
+    p50_ms REAL,
+    p95_ms REAL,
+    p99_ms REAL,
+    max_ms REAL
+);
+"""
+
+_STATEMENTS = {
+    "start": "INSERT INTO sessions (id, started_at, mode, difficulty, seed) VALUES (?, ?, ?, ?, ?)",
+    "end": "UPDATE sessions SET ended_at = ?, steps = ?, game_over = ?, score = ?, scores = ?, lives = ? "
+           "WHERE id = ?",
+    "slice": "INSERT INTO slices VALUES (?, ?, ?, ?, ?, ?)",
+    "frames": "INSERT INTO frame_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+}
+
+
+# -------------------------
+# Telemetry Store
+# -------------------------
+class TelemetryStore:
+    # Session results, every slice and per-session frame-time summaries in a
+    # local SQLite database. The game loop never touches the database: each
+    # call turns its data into rows and drops them on a bounded queue, and a
+    # writer thread commits whatever has queued up, at most `batch` rows per
+    # transaction, at least every `interval` seconds while there is anything
+    # to write. A frame's slices go in as one queue item, so a frenzy swipe
+    # costs one put() however many fruits it cut.
+    #
+    # When the writer can't keep up and `queue_size` items are waiting, new
+    # items are dropped and counted in `dropped` (rows) rather than making the
+    # loop wait. The database runs in WAL mode, so top_scores() and other
+    # readers work while a game is being written.
+    def __init__(self, path, queue_size=4096, batch=2000, interval=0.5):
+        self.path = path
+        self.batch = batch
+        self.interval = interval
+        self._queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.peak_depth = 0
+        # Written by the writer thread.
+        self.rows = 0
+        self.transactions = 0
+        self.max_commit = 0.0
+        db = sqlite3.connect(path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(_SCHEMA)
+        db.close()
+        self._thread = threading.Thread(target=self._write_loop, name="telemetry", daemon=True)
+        self._thread.start()
+
+    def _put(self, statement, rows):
+        try:
+            self._queue.put_nowait((statement, rows))
+        except queue.Full:
+            self.dropped += len(rows)
+            return
+        self.peak_depth = max(self.peak_depth, self._queue.qsize())
+
+    def session_started(self, mode, difficulty, seed):
+        # Returns the new session's id, for the calls below.
+        session = uuid.uuid4().hex
+        self._put("start", [(session, time.time(), mode, difficulty, seed)])
+        return session
+
+    def slices(self, session, sim_time, events):
+        # `events` are the (kind, x, y, sprite) records drained from Game.events.
+        if events:
+            self._put("slice", [(session, sim_time, kind, x, y, sprite) for kind, x, y, sprite in events])
+
+    def session_ended(self, session, result, frame_stats=None):
+        # `result` is Game.result(); `frame_stats` a FrameProfiler or
+        # StageTally summary().
+        scores = result["scores"]
+        self._put("end", [(time.time(), result["steps"], int(result["game_over"]), max(scores.values()),
+                           json.dumps(scores), json.dumps(result["lives"]), session)])
+        if frame_stats:
+            self._put("frames", [(session, stage, row["samples"], row["mean_ms"], row["p50_ms"], row["p95_ms"],
+                                  row["p99_ms"], row["max_ms"]) for stage, row in frame_stats.items()])
+
+    def _write_loop(self):
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA synchronous=NORMAL")  # safe with WAL; skips an fsync per commit
+        closing = False
+        while not closing:
+            try:
+                item = self._queue.get(timeout=self.interval)
+            except queue.Empty:
+                continue
+            # Take everything that is waiting, up to a batch, in arrival order.
+            items, count = [], 0
+            while True:
+                if item is None:
+                    closing = True
+                else:
+                    items.append(item)
+                    count += len(item[1])
+                if closing or count >= self.batch:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if not items:
+                continue
+            start = time.perf_counter()
+            with db:  # one transaction
+                for statement, rows in items:
+                    db.executemany(_STATEMENTS[statement], rows)
+            self.max_commit = max(self.max_commit, time.perf_counter() - start)
+            self.rows += count
+            self.transactions += 1
+        db.close()
+
+    def close(self):
+        # Writes everything still queued, then stops the writer.
+        self._queue.put(None)
+        self._thread.join()
+
+    def stats(self):
+        return {"rows": self.rows, "transactions": self.transactions, "dropped": self.dropped,
+                "peak_queue_depth": self.peak_depth, "max_commit_ms": self.max_commit * 1000}
+
+
+# -------------------------
+# Queries
+# -------------------------
+def top_scores(path, mode, limit=10):
+    # The best finished sessions of a mode as [{"score", "scores", "difficulty",
+    # "ended_at"}], highest first. A database no game has been logged to yet
+    # has none, and is left as it is (or not created at all).
+    if not os.path.exists(path):
+        return []
+    db = sqlite3.connect(path)
+    try:
+        if not db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sessions'").fetchone():
+            return []
+        rows = db.execute(
+            "SELECT score, scores, difficulty, ended_at FROM sessions WHERE mode = ? AND ended_at IS NOT NULL "
+            "ORDER BY score DESC, ended_at LIMIT ?", (mode, limit)).fetchall()
+    finally:
+        db.close()
+    return [{"score": score, "scores": json.loads(scores), "difficulty": difficulty, "ended_at": ended_at}
+            for score, scores, difficulty, ended_at in rows]
@@ -0,0 +1,61 @@
+import time
+
+# -------------------------
+# Fixed Timestep
+# -------------------------
+class FixedTimestep:
+    # Accumulates real elapsed time and hands it out in fixed simulation steps,
+    # so gameplay runs at the same speed whatever the render rate or CPU load.
+    #
+    #     for _ in range(timestep.advance()):
+    #         simulate(timestep.step)
+    #     render(timestep.alpha)
+    #
+    # `alpha` is how far the real time has got into the next, not yet simulated,
+    # step (0..1); drawing uses it to interpolate between the last two states.
+    # A single frame never adds more than `max_frame` seconds, so after a long
+    # stall (or time spent in a menu) the game doesn't fast-forward to catch up.
+    def __init__(self, step=1 / 30, max_frame=0.25, clock=time.perf_counter):
+        self.step = step
+        self.max_frame = max_frame
+        self.clock = clock
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self.steps = 0  # total steps simulated
+        self._last = None
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self._last = None
+
+    def advance(self, now=None):
+        if now is None:
+            now = self.clock()
+        if self._last is None:
+            self._last = now
+        frame = min(now - self._last, self.max_frame)
+        self._last = now
+        self.accumulator += frame
+        steps = int(self.accumulator / self.step)
+        self.accumulator -= steps * self.step
+        self.alpha = self.accumulator / self.step
+        self.steps += steps
+        return steps
+
+
+class Every:
+    # Fires once every `interval` seconds of simulated time.
+    def __init__(self, interval):
+        self.interval = interval
+        self.elapsed = 0.0
+
+    def reset(self):
+        self.elapsed = 0.0
+
+    def tick(self, dt):
+        self.elapsed += dt
+        if self.elapsed >= self.interval:
+            self.elapsed -= self.interval
+            return True
+        return False
@@ -0,0 +1,125 @@
+from itertools import permutations
+
+import numpy as np
+
+# -------------------------
+# Hand Tracks
+# -------------------------
+class Track:
+    # One hand followed across snapshots. `position` and `previous` are the raw
+    # fingertip positions of the last two snapshots it was seen in; `smoothed`
+    # and `velocity` (pixels per second) come from an alpha-beta filter. The last
+    # `len(history)` observations are kept as (time, x, y) rows of a ring buffer.
+    def __init__(self, track_id, position, timestamp, history):
+        self.id = track_id
+        self.origin = position  # where the hand was first seen
+        self.position = self.previous = position
+        self.smoothed = np.array(position, np.float64)
+        self.velocity = np.zeros(2)
+        self.updated_at = timestamp
+        self.seen = 1  # snapshots the hand was found in
+        self.missed = 0  # consecutive snapshots it was not found in
+        self.history = np.zeros((history, 3))
+        self.history[0] = (timestamp, *position)
+
+    def recent(self):
+        # History rows oldest first.
+        n = len(self.history)
+        if self.seen <= n:
+            return self.history[: self.seen]
+        start = self.seen % n
+        return np.concatenate((self.history[start:], self.history[:start]))
+
+    def trail(self, since):
+        # History rows observed at or after `since`, oldest first; the blade
+        # trail is drawn through these.
+        rows = self.recent()
+        return rows[np.searchsorted(rows[:, 0], since):]
+
+
+class HandTracker:
+    # Gives every detected hand a persistent ID by matching each new snapshot's
+    # fingertips to the existing tracks with the smallest total distance. Up to
+    # `exhaustive` hands the best assignment is found by trying every pairing
+    # (24 permutations for four hands, a few microseconds), above that greedily
+    # by nearest pair. A hand further than `max_distance` pixels from every
+    # track starts a new one; a track not matched for `max_missed` snapshots in
+    # a row is dropped.
+    def __init__(self, max_distance=400, max_missed=3, history=16, alpha=0.6, beta=0.3, exhaustive=6):
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.history = history
+        self.alpha = alpha
+        self.beta = beta
+        self.exhaustive = exhaustive
+        self.tracks = []
+        self._next_id = 1
+
+    def reset(self):
+        self.tracks = []
+        self._next_id = 1
+
+    def _assign(self, positions, timestamp):
+        # [(track index, position index)] of the matched pairs, comparing each
+        # hand with where every track's velocity says it should be by now. The
+        # matrices are at most a handful of entries, so plain lists beat NumPy.
+        tracks = self.tracks
+        if not tracks or not positions:
+            return []
+        gate = float(self.max_distance) ** 2
+        cost = []
+        for t in tracks:
+            dt = timestamp - t.updated_at
+            px, py = t.position[0] + t.velocity[0] * dt, t.position[1] + t.velocity[1] * dt
+            cost.append([min((px - x) ** 2 + (py - y) ** 2, gate) for x, y in positions])
+        n, m = len(tracks), len(positions)
+        if max(n, m) <= self.exhaustive:
+            # Pad to a square matrix where pairing with a dummy costs the gate.
+            k = max(n, m)
+            rows = [row + [gate] * (k - m) for row in cost] + [[gate] * k] * (k - n)
+            best = min(permutations(range(k)), key=lambda p: sum(row[j] for row, j in zip(rows, p)))
+            pairs = list(enumerate(best))
+        else:
+            pairs = []
+            used_t, used_p = set(), set()
+            for _, i, j in sorted((c, i, j) for i, row in enumerate(cost) for j, c in enumerate(row)):
+                if i not in used_t and j not in used_p:
+                    used_t.add(i)
+                    used_p.add(j)
+                    pairs.append((i, j))
+        return [(i, j) for i, j in pairs if i < n and j < m and cost[i][j] < gate]
+
+    def update(self, positions, timestamp):
+        # Matches a snapshot's fingertips to the tracks and returns the tracks
+        # seen in it, in the order of `positions`.
+        positions = [tuple(p) for p in positions]
+        matched = self._assign(positions, timestamp)
+        seen = [None] * len(positions)
+        for i, j in matched:
+            track = self.tracks[i]
+            position = positions[j]
+            dt = timestamp - track.updated_at
+            # Alpha-beta filter: predict, then correct by the residual.
+            predicted = track.smoothed + track.velocity * dt
+            residual = np.array(position, np.float64) - predicted
+            track.smoothed = predicted + self.alpha * residual
+            if dt > 0:
+                track.velocity = track.velocity + self.beta * residual / dt
+            track.previous, track.position = track.position, position
+            track.updated_at = timestamp
+            track.history[track.seen % self.history] = (timestamp, *position)
+            track.seen += 1
+            track.missed = 0
+            seen[j] = track
+
+        matched_tracks = {i for i, _ in matched}
+        for i, track in enumerate(self.tracks):
+            if i not in matched_tracks:
+                track.missed += 1
+        for j, position in enumerate(positions):
+            if seen[j] is None:
+                seen[j] = Track(self._next_id, position, timestamp, self.history)
+                self._next_id += 1
+                self.tracks.append(seen[j])
+        self.tracks = [t for t in self.tracks if t.missed < self.max_missed]
+        return seen
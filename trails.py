@@ -0,0 +1,56 @@
+import numpy as np
+import pygame
+
+from entities import P1, P2
+
+# Blade colour per owner (see entities.py); the core is always white.
+TRAIL_COLORS = {P1: (80, 170, 255), P2: (255, 90, 70)}
+DEFAULT_TRAIL_COLOR = (120, 230, 255)
+
+# Catmull-Rom basis for the points at t = 0, 1/3 and 2/3 between two samples.
+_T = np.array([0, 1 / 3, 2 / 3])[:, None]
+_BASIS = 0.5 * np.hstack([-_T**3 + 2 * _T**2 - _T, 3 * _T**3 - 5 * _T**2 + 2,
+                          -3 * _T**3 + 4 * _T**2 + _T, _T**3 - _T**2])
+
+
+# -------------------------
+# Blade Trails
+# -------------------------
+class BladeTrails:
+    # Draws a fading, tapered blade behind every tracked fingertip. There is no
+    # trail storage of its own: the points are the rows of each Track's history
+    # ring (tracker.py), the same samples the slash segments are cut from, so
+    # memory and drawing cost are bounded by the ring size and the number of
+    # hands however long a session runs.
+    #
+    # Samples from the last `span` seconds are smoothed into a Catmull-Rom curve
+    # and drawn as two filled polygons (glow and white core) per hand whose width
+    # shrinks to nothing at the oldest end; older samples drop out of the window,
+    # so a resting hand's trail fades away.
+    def __init__(self, span=0.2, width=16):
+        self.span = span
+        self.width = width
+
+    def draw(self, surface, tracks, now, owner_of):
+        for track in tracks:
+            if track.missed:
+                continue
+            rows = track.trail(now - self.span)
+            if len(rows) < 2:
+                continue
+            # Smooth the camera-rate samples, three points per gap.
+            padded = np.concatenate([rows[:1], rows, rows[-1:]])
+            windows = np.stack([padded[i:i + len(rows) - 1] for i in range(4)], axis=1)
+            curve = np.concatenate([(_BASIS @ windows).reshape(-1, 3), rows[-1:]])
+            points = curve[:, 1:]
+            # Offsets to the left edge of the strip: unit normals scaled by the
+            # half-width, which shrinks to zero with age.
+            d = np.gradient(points, axis=0)
+            length = np.hypot(d[:, 0], d[:, 1])
+            length[length == 0] = 1
+            taper = self.width * 0.5 * (1 - np.clip(now - curve[:, 0], 0, self.span) / self.span) / length
+            offset = d[:, ::-1] * np.stack([-taper, taper], axis=1)
+            color = TRAIL_COLORS.get(owner_of(track), DEFAULT_TRAIL_COLOR)
+            for fill, scale in ((color, 1.0), ((255, 255, 255), 0.4)):
+                edge = offset * scale
+                pygame.draw.polygon(surface, fill, np.concatenate([points + edge, (points - edge)[::-1]]).tolist())